@@ -0,0 +1,269 @@
+"""
+Times the hot paths of the backend offline, and saves the results as JSON so runs on different commits can be
+compared.
+
+Run from the root of the repository:
+    python -m benchmarks.hot_paths --output before.json
+    (check out another commit)
+    python -m benchmarks.hot_paths --output after.json --compare before.json
+
+Every API request is answered from a CatalogSnapshot of a synthetic department (made by
+benchmarks.memory.make_department_json and written to a temporary directory), so nothing goes to the network and
+every run times the same data. Each benchmark is run once to warm up, then --repeat times, and reports its fastest
+and median run. With --compare, benchmarks whose median got slower than --threshold times the baseline's are listed
+as regressions and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+from statistics import median
+from time import perf_counter
+
+from benchmarks.memory import load_department, make_department_json
+from flask_app.app import create_app
+from flask_app.backend.catalog import CatalogSnapshot
+from flask_app.backend.courses import APIGet, APIParse, CourseList, RequestProxy
+from flask_app.backend.schedule import MySchedule
+from flask_app.backend.search import CourseIndex
+
+GRADE_COLUMNS = ("A+", "A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D+", "D", "D-", "F", "W", "Other")
+
+
+def time_runs(function, repeat: int) -> dict:
+    """
+    Args:
+        function: Callable[[], any]
+            Code to time, called without arguments
+        repeat: int
+            Number of times to call it
+    Returns:
+        timings: dict
+            Number of runs, and milliseconds of the fastest and the median run
+    """
+    # Untimed, so imports, template compiles and first-use caches don't count in the first run
+    function()
+    run_seconds = []
+    for _ in range(repeat):
+        started_at = perf_counter()
+        function()
+        run_seconds.append(perf_counter() - started_at)
+    return {"runs": repeat, "min_ms": round(min(run_seconds) * 1000, 3),
+            "median_ms": round(median(run_seconds) * 1000, 3)}
+
+
+def make_grades_raw(row_count: int, professor_count: int = 40) -> list:
+    """
+    Args:
+        row_count: int
+            Number of grade rows (one per section and semester, like planetterp's grades endpoint)
+        professor_count: int
+            Number of professors the rows are spread over
+    Returns:
+        grades_raw: list[dict]
+            Made up grade rows, the same on every run
+    """
+    generator = random.Random(0)
+    grades_raw = []
+    for row_index in range(row_count):
+        grade_row = {"course": "BMRK100", "professor": "Professor " + str(row_index % professor_count),
+                     "semester": str(201201 + (row_index // 200) % 10 * 100 + (row_index // 100) % 2 * 7),
+                     "section": str(row_index % 100).zfill(4)}
+        grade_row.update({column: generator.randrange(12) for column in GRADE_COLUMNS})
+        grades_raw.append(grade_row)
+    return grades_raw
+
+
+def make_dense_schedule(sections: list) -> MySchedule:
+    """
+    Returns:
+        schedule: MySchedule
+            Schedule with every section added in order, which skips the ones conflicting with those before
+    """
+    schedule = MySchedule()
+    for section in sections:
+        schedule.add_section(section)
+    return schedule
+
+
+def build_snapshot(path: str, courses_json: list) -> CatalogSnapshot:
+    """
+    Args:
+        path: str
+            SQLite file to write the snapshot to
+        courses_json: list[str]
+            Course json strings made by make_department_json
+    Returns:
+        snapshot: CatalogSnapshot
+            Snapshot with the planetterp and umd.io courses and the sections of the department
+    """
+    umdio_courses = [dict(json.loads(course_json), dept_id="BMRK") for course_json in courses_json]
+    snapshot = CatalogSnapshot(path)
+    snapshot.add_umdio_courses(umdio_courses)
+    snapshot.add_planetterp_courses([{"department": "BMRK", "course_number": course["course_id"][4:],
+                                      "title": course["name"], "credits": int(course["credits"]),
+                                      "average_gpa": 3.0} for course in umdio_courses])
+    return snapshot
+
+
+def run_backend(courses_json: list, repeat: int) -> dict:
+    """
+    Times parsing sections, checking and adding sections to a dense schedule, and averaging grades.
+    """
+    courses = load_department(courses_json)
+    sections_raw_by_course = [(course, json.loads(course_json)["sections"])
+                              for course, course_json in zip(courses, courses_json)]
+    meetings = [(section["meetings"], section["section_id"], course)
+                for course, sections_raw in sections_raw_by_course for section in sections_raw]
+    sections = [section for course in courses for section in course.sections.values()]
+    dense_schedule = make_dense_schedule(sections)
+    grades_raw = make_grades_raw(10000)
+
+    def parse_sections():
+        for course, sections_raw in sections_raw_by_course:
+            APIParse.umd_io_sections_raw_to_section_list(sections_raw, course)
+
+    def check_conflicts():
+        for section in sections:
+            dense_schedule.check_section_no_time_conflicts(section)
+
+    return {
+        "make_meeting_dict": dict(time_runs(lambda: [CourseList.make_meeting_dict(*meeting) for meeting in meetings],
+                                            repeat), sections=len(meetings)),
+        "umd_io_sections_raw_to_section_list": dict(time_runs(parse_sections, repeat), courses=len(courses),
+                                                    sections=len(sections)),
+        "check_section_no_time_conflicts": dict(time_runs(check_conflicts, repeat), sections=len(sections),
+                                                sections_in_schedule=len(dense_schedule.sections_list)),
+        "add_section": dict(time_runs(lambda: make_dense_schedule(sections), repeat), sections=len(sections),
+                            sections_in_schedule=len(dense_schedule.sections_list)),
+        "planetterp_raw_grade_distribution_to_gpa": dict(
+            time_runs(lambda: APIParse.planetterp_raw_grade_distribution_to_gpa(grades_raw), repeat),
+            rows=len(grades_raw)),
+    }
+
+
+def run_snapshot(courses_json: list, repeat: int, snapshot_path: str) -> dict:
+    """
+    Times loading a serialized schedule with many sections and rendering the index page, with every API request
+    answered from a snapshot of the department.
+    """
+    build_snapshot(snapshot_path, courses_json)
+    os.environ["CATALOG_SNAPSHOT"] = snapshot_path
+    try:
+        app = create_app()
+        app.config.update(SECRET_KEY="benchmark", TESTING=True, WTF_CSRF_ENABLED=False, REQUEST_LOG=False)
+
+        serialized_schedule = make_dense_schedule(
+            [section for course in load_department(courses_json) for section in course.sections.values()]
+        ).get_serialized_schedule()
+        serialized_section_count = len(serialized_schedule.split(","))
+
+        empty_client = app.test_client()
+        full_client = app.test_client()
+        full_client.post("/api/schedule/serialized", json={"serialized_schedule": serialized_schedule})
+
+        def get_index(client):
+            assert client.get("/").status_code == 200
+
+        def view_course():
+            assert empty_client.post("/", data={"view_course": "View BMRK100"}).status_code == 200
+
+        return {
+            "load_serialized_schedule": dict(
+                time_runs(lambda: MySchedule().load_serialized_schedule(serialized_schedule), repeat),
+                sections=serialized_section_count),
+            "index_empty_schedule": time_runs(lambda: get_index(empty_client), repeat),
+            "index_full_schedule": dict(time_runs(lambda: get_index(full_client), repeat),
+                                        sections=serialized_section_count),
+            "index_view_course": time_runs(view_course, repeat),
+        }
+    finally:
+        del os.environ["CATALOG_SNAPSHOT"]
+        RequestProxy.snapshot = None
+        APIGet.course_index = CourseIndex()
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(course_count: int, repeat: int) -> dict:
+    """
+    Args:
+        course_count: int
+            Number of courses in the synthetic department
+        repeat: int
+            Number of times each benchmark is run
+    Returns:
+        results: dict
+            The commit and python version the benchmarks ran on, their parameters, and the timings of each
+    """
+    courses_json = make_department_json(course_count)
+    benchmarks = run_backend(courses_json, repeat)
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        benchmarks.update(run_snapshot(courses_json, repeat, os.path.join(snapshot_dir, "catalog.db")))
+
+    return {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "parameters": {"courses": course_count, "repeat": repeat},
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> dict:
+    """
+    Args:
+        results: dict
+            Results of this run
+        baseline: dict
+            Results of an earlier run (e.g. on the previous commit)
+        threshold: float
+            Ratio of the median times above which a benchmark counts as a regression
+    Returns:
+        comparison: dict
+            The baseline's commit, whether both runs had the same parameters (ratios of runs on departments of
+            different sizes mean little), the ratio of the median times of every benchmark in both runs, and the
+            names of the benchmarks that got slower than threshold
+    """
+    ratios = {}
+    for name, timings in results["benchmarks"].items():
+        baseline_timings = baseline["benchmarks"].get(name)
+        if baseline_timings and baseline_timings["median_ms"] > 0:
+            ratios[name] = round(timings["median_ms"] / baseline_timings["median_ms"], 3)
+    return {
+        "baseline_commit": baseline.get("commit"),
+        "same_parameters": results["parameters"] == baseline.get("parameters"),
+        "median_ratios": ratios,
+        "regressions": sorted(name for name, ratio in ratios.items() if ratio > threshold),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the hot paths of the backend offline.")
+    parser.add_argument("--courses", type=int, default=120, help="number of courses in the synthetic department")
+    parser.add_argument("--repeat", type=int, default=20, help="number of runs of each benchmark")
+    parser.add_argument("--output", help="JSON file to save the results to")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare the results with")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="ratio of median times above which a benchmark counts as a regression")
+    arguments = parser.parse_args()
+
+    results = run(arguments.courses, arguments.repeat)
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(results, output_file, indent=4)
+    if arguments.compare:
+        with open(arguments.compare) as baseline_file:
+            results["comparison"] = compare(results, json.load(baseline_file), arguments.threshold)
+    print(json.dumps(results, indent=4))
+    if arguments.compare and results["comparison"]["regressions"]:
+        sys.exit(1)
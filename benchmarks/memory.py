@@ -0,0 +1,104 @@
+"""
+Measures the memory footprint of the course model for a full department load.
+
+Run from the root of the repository:
+    python -m benchmarks.memory --courses 120
+
+The department is made by repeating the courses of tests/data_for_tests.json under new course codes, each parsed
+from its own json string like a real API response, so no strings are shared between courses unless the model
+shares them.
+"""
+import argparse
+import json
+import os
+import tracemalloc
+
+from flask_app.backend.courses import APIParse, Course
+
+TEST_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests",
+                              "data_for_tests.json")
+
+
+def make_department_json(course_count: int) -> list:
+    """
+    Args:
+        course_count: int
+            Number of courses in the department
+    Returns:
+        courses_json: list[str]
+            One umd.io course json string (with its sections) per course
+    """
+    with open(TEST_DATA_PATH) as test_data:
+        template_courses = json.load(test_data)
+
+    courses_json = []
+    for course_index in range(course_count):
+        course_raw = dict(template_courses[course_index % len(template_courses)])
+        course_code = "BMRK" + str(100 + course_index)
+        course_raw["course_id"] = course_code
+        course_raw["sections"] = [dict(section, course=course_code,
+                                       section_id=course_code + "-" + section["number"])
+                                  for section in course_raw["sections"]]
+        courses_json.append(json.dumps(course_raw))
+    return courses_json
+
+
+def load_department(courses_json: list) -> list:
+    """
+    Args:
+        courses_json: list[str]
+            Course json strings made by make_department_json
+    Returns:
+        courses: list[Course]
+            The parsed courses, with their sections
+    """
+    courses = []
+    for course_json in courses_json:
+        course_raw = json.loads(course_json)
+        course = Course(course_raw["course_id"], course_raw["name"], int(course_raw["credits"]), {}, {}, {})
+        course.sections, course.professor_to_sections = \
+            APIParse.umd_io_sections_raw_to_section_list(course_raw["sections"], course)
+        courses.append(course)
+    return courses
+
+
+def measure_allocated_bytes(function, *args) -> tuple:
+    """
+    Returns:
+        (result, allocated_bytes): tuple
+            What function returned, and the bytes still allocated by the call while the result is alive
+    """
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = function(*args)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+def run(course_count: int) -> dict:
+    """
+    Args:
+        course_count: int
+            Number of courses in the department
+    Returns:
+        results: dict
+            Number of courses and sections loaded, and their footprint in total and per course
+    """
+    courses_json = make_department_json(course_count)
+    courses, model_bytes = measure_allocated_bytes(load_department, courses_json)
+
+    return {
+        "courses": len(courses),
+        "sections": sum(len(course.sections) for course in courses),
+        "bytes_per_course": round(model_bytes / len(courses)),
+        "total_bytes": model_bytes,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the memory footprint of a full department of courses.")
+    parser.add_argument("--courses", type=int, default=120, help="number of courses in the department")
+    print(json.dumps(run(parser.parse_args().courses), indent=4))
@@ -0,0 +1,71 @@
+"""
+Measures the time to render the professors and sections of a course with many sections (course_sections.html).
+
+Run from the root of the repository:
+    python -m benchmarks.render --repeat 200
+
+The course is COMM107 of tests/data_for_tests.json, which has 84 sections. It is rendered as is, and again with the
+weekly schedule of each section formatted on every render the way Section.get_formatted_weekly_schedule used to.
+"""
+import argparse
+import json
+import os
+from timeit import timeit
+
+from jinja2 import Environment, FileSystemLoader
+from markupsafe import Markup
+
+from benchmarks.memory import load_department, make_department_json
+
+TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flask_app", "templates")
+
+
+def legacy_weekly_schedule(section) -> dict:
+    """
+    Formats the weekly schedule of a section on every call, like Section.get_formatted_weekly_schedule used to
+    """
+    time_per_day = {}
+    for day, meeting_time_list in section.class_meetings.items():
+        if len(meeting_time_list) > 0:
+            for meeting_time in set(meeting_time_list):
+                temp = meeting_time.formatted_start_time + "-" + meeting_time.formatted_end_time
+                if temp in time_per_day:
+                    time_per_day[temp] = time_per_day[temp] + day + ""
+                else:
+                    time_per_day[temp] = day
+    return time_per_day
+
+
+def run(repeat: int) -> dict:
+    """
+    Args:
+        repeat: int
+            Number of times each template is rendered
+    Returns:
+        results: dict
+            Number of sections, and milliseconds per render with the precomputed and the legacy weekly schedule
+    """
+    # The fourth course of the test data is COMM107
+    course = load_department(make_department_json(4))[3]
+    course.professor_to_rating = {professor: 4.0 for professor in course.professor_to_sections}
+
+    environment = Environment(loader=FileSystemLoader(TEMPLATES_PATH), autoescape=True)
+    template = environment.get_template("course_sections.html")
+    legacy_source = environment.loader.get_source(environment, "course_sections.html")[0].replace(
+        "section.weekly_schedule", "legacy_weekly_schedule(section).items()")
+    legacy_template = environment.from_string(legacy_source)
+
+    context = {"course": course, "csrf_token_field": Markup(""), "legacy_weekly_schedule": legacy_weekly_schedule}
+
+    return {
+        "sections": len(course.sections),
+        "precomputed_ms_per_render": round(timeit(lambda: template.render(context), number=repeat) / repeat * 1000, 3),
+        "legacy_ms_per_render": round(timeit(lambda: legacy_template.render(context), number=repeat) / repeat * 1000,
+                                      3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the render time of a course with many sections.")
+    parser.add_argument("--repeat", type=int, default=200, help="number of renders to time")
+    print(json.dumps(run(parser.parse_args().repeat), indent=4))
@@ -1,13 +1,27 @@
-from flask import Flask, render_template, request, session
-from flask_app.backend.schedule import MySchedule
-from flask_app.backend.courses import CourseList, APIGet, Professor
+import json
+import logging
+import os
+from contextlib import contextmanager
+
+from flask import Flask, Response, abort, g, jsonify, render_template, request, session
+from flask_wtf.csrf import generate_csrf
+from markupsafe import Markup
+from flask_app.backend.cache import LRUCache
+from flask_app.backend.courses import CourseList, APIGet, RequestProxy
+from flask_app.backend.catalog import CatalogSnapshot
+from flask_app.backend.grades import GradeStore
+from flask_app.backend.http_client import HTTPClient
+from flask_app.backend.metrics import Metrics, SamplingProfiler
+from flask_app.backend.optimizer import ScheduleOptimizer
+from flask_app.backend.pages import CoursePages
+from flask_app.backend.professors import ProfessorDirectory, ProfessorIndex
+from flask_app.backend.serializers import JSONSerializer
+from flask_app.backend.sessions import SessionStore
+from flask_app.backend.warmer import CatalogWarmer
 from flask_app.forms import SearchForm, ClearAllCoursesForm, AddRemoveForm, SearchForCourseForm, AddClassForm, \
-    ViewSectionsForm, SerializeScheduleForm, GenEdSearchForm
-from time import time
+    ViewSectionsForm, SerializeScheduleForm, GenEdSearchForm, OptimizeScheduleForm
 
 course_list = CourseList()
-session_data = {}  # Dict mapping the user's session's session_num to a dict of relevant objects stored server-side.
-session_count = 0
 
 
 def create_app():
@@ -17,8 +31,174 @@ def create_app():
     app = Flask(__name__)
     app.debug = True
     app.config['SECRET_KEY'] = "super secret key"
+    # Path of an offline catalog snapshot (see flask_app/backend/catalog.py) to serve all course data from
+    app.config['CATALOG_SNAPSHOT'] = os.environ.get("CATALOG_SNAPSHOT")
+    # Path of a sqlite database keeping the grade totals of each course and semester (see flask_app/backend/grades.py)
+    app.config['GRADE_STORE'] = os.environ.get("GRADE_STORE")
+
+    # Number of kept-alive connections (and of requests in flight) to each upstream API
+    app.config['UPSTREAM_POOL_SIZE'] = int(os.environ.get("UPSTREAM_POOL_SIZE", 10))
+
+    if RequestProxy.http_client.pool_maxsize != app.config['UPSTREAM_POOL_SIZE']:
+        RequestProxy.http_client.close()
+        RequestProxy.http_client = HTTPClient(pool_maxsize=app.config['UPSTREAM_POOL_SIZE'],
+                                              max_requests_per_host=app.config['UPSTREAM_POOL_SIZE'])
+
+    # Where the users' schedules are kept: "memory" (in this process) or "sqlite" (shared by every worker)
+    app.config['SESSION_STORE'] = os.environ.get("SESSION_STORE", "memory")
+    app.config['SESSION_DB'] = os.environ.get("SESSION_DB", "sessions.db")
+    app.config['MAX_SESSIONS'] = int(os.environ.get("MAX_SESSIONS", 10000))
+
+    # Keep popular courses cached in the background: the comma separated WARM_COURSES, plus those users open most
+    app.config['CATALOG_WARMER'] = os.environ.get("CATALOG_WARMER") == "1"
+    app.config['WARM_COURSES'] = os.environ.get("WARM_COURSES", "").split(",")
+    app.config['WARMER_INTERVAL'] = float(os.environ.get("WARMER_INTERVAL", 55))
+    # Serve the warmer's status at /admin/warmer, which has no authentication, so it is off by default
+    app.config['ADMIN_ENDPOINTS'] = os.environ.get("ADMIN_ENDPOINTS") == "1"
+
+    # Log one JSON line of timings and upstream calls per request (see flask_app/backend/metrics.py)
+    app.config['REQUEST_LOG'] = os.environ.get("REQUEST_LOG", "1") == "1"
+    # Share of requests profiled with cProfile, and the directory their profiles are saved to
+    app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+    app.config['PROFILE_DIR'] = os.environ.get("PROFILE_DIR", "profiles")
+
+    if app.config['CATALOG_SNAPSHOT']:
+        RequestProxy.snapshot = CatalogSnapshot(app.config['CATALOG_SNAPSHOT'])
+        APIGet.course_index.build(RequestProxy.snapshot.get_course_titles())
+    if app.config['GRADE_STORE']:
+        APIGet.grade_store = GradeStore(app.config['GRADE_STORE'])
+
+    session_store = SessionStore.create(app.config['SESSION_STORE'], app.config['SESSION_DB'],
+                                        max_sessions=app.config['MAX_SESSIONS'])
+    app.extensions['session_store'] = session_store
+
+    # A snapshot never goes to the APIs, so there is nothing to keep warm
+    if app.config['CATALOG_WARMER'] and not app.config['CATALOG_SNAPSHOT']:
+        warmer = CatalogWarmer(app.config['WARM_COURSES'], interval=app.config['WARMER_INTERVAL'])
+        CourseList.course_views = warmer.course_views
+        warmer.start()
+        app.extensions['catalog_warmer'] = warmer
+
+    # Pages of the all courses page, built from a local list of every course (which course searches use too)
+    course_pages = CoursePages()
+    app.extensions['course_pages'] = course_pages
+    # Every professor, searched locally by the all professors page
+    professor_directory = ProfessorDirectory()
+    app.extensions['professor_directory'] = professor_directory
+
+    def search_course_heads(query: str) -> list:
+        """
+        APIGet.get_course_heads_by_query, downloading the course list the local search index is built from if it is
+        missing or stale. Searches go to planetterp until it is downloaded.
+        """
+        course_pages.refresh_course_list()
+        return APIGet.get_course_heads_by_query(query)
+
+    request_logger = logging.getLogger("flask_app.requests")
+    request_logger.setLevel(logging.INFO)
+    if not request_logger.handlers:
+        request_log_handler = logging.StreamHandler()
+        request_log_handler.setFormatter(logging.Formatter("%(message)s"))
+        request_logger.addHandler(request_log_handler)
+    profiler = SamplingProfiler(app.config['PROFILE_SAMPLE_RATE'], app.config['PROFILE_DIR'])
+
+    @app.before_request
+    def start_request_trace():
+        """
+        Starts timing the request, and profiling it if it is sampled
+        """
+        g.trace = Metrics.start_trace()
+        g.profile = profiler.start()
+
+    @app.after_request
+    def keep_response_status(response: Response) -> Response:
+        """
+        Keeps the response's status for finish_request_trace
+        """
+        g.response_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_request_trace(exception) -> None:
+        """
+        Records the request's duration in the metrics and writes its timings to the request log. Runs even when the
+        request failed with an exception (which never reaches after_request when it propagates), counted as a 500.
+        """
+        trace = g.pop("trace", None)
+        try:
+            if trace is None:
+                return
+            endpoint = request.endpoint or "not_found"
+            profile_path = profiler.stop(g.pop("profile", None), endpoint)
+            status = g.pop("response_status", 500 if exception is not None else 200)
+            summary = trace.get_summary()
+            Metrics.record_request(endpoint, request.method, status, summary["duration_ms"] / 1000)
+
+            if app.config['REQUEST_LOG'] and endpoint not in ("metrics", "static"):
+                request_logger.info(json.dumps(dict(
+                    summary, method=request.method, path=request.path, endpoint=endpoint, status=status,
+                    profile=profile_path), separators=(",", ":")))
+        finally:
+            # Worker threads are reused, so the next request must not add to this one's trace
+            Metrics.current_trace.set(None)
+
+    def render_page(template_name: str, **context) -> str:
+        """
+        render_template, timed as a render span
+        """
+        with Metrics.span("render", template_name):
+            return render_template(template_name, **context)
+
+    # Rendered professors and sections of courses, shared by every session (see render_course_sections)
+    fragment_cache = LRUCache(max_entries=512, default_ttl=60 * 60)
+    app.extensions['fragment_cache'] = fragment_cache
+    csrf_token_placeholder = "<!-- csrf token field -->"
+
+    @app.template_global()
+    def render_course_sections(course) -> Markup:
+        """
+        Renders the professors and sections of a course, reusing the HTML rendered for any session that viewed the
+        same course with the same data. The user's own CSRF token is filled into the cached HTML.
 
-    app_boot_time = time()
+        Args:
+            course: Course
+                Course to render the professors and sections of
+        Returns:
+            html: Markup
+                The rendered course_sections.html
+        """
+        cache_key = (course.course_code, course.get_data_version())
+        fragment = fragment_cache.get(cache_key)
+        if fragment is None:
+            # A separate category, since fragments are rendered inside the render of their page
+            with Metrics.span("render_fragment", "course_sections.html"):
+                fragment = app.jinja_env.get_template("course_sections.html").render(
+                    course=course, csrf_token_field=Markup(csrf_token_placeholder))
+            fragment_cache.put(cache_key, fragment)
+
+        csrf_token_field = ""
+        if app.config.get("WTF_CSRF_ENABLED", True):
+            csrf_token_field = Markup('<input id="csrf_token" name="csrf_token" type="hidden" value="{}">').format(
+                generate_csrf())
+        return Markup(fragment.replace(csrf_token_placeholder, csrf_token_field))
+
+    @contextmanager
+    def locked_session_data():
+        """
+        Loads the user's session data and saves it back at the end of the with block, holding the session's lock
+        in between so only one request of a user at a time changes it.
+        Starts a new session if the user has none or theirs expired.
+        """
+        if "session_id" not in session:
+            session["session_id"] = session_store.new_session()
+
+        with session_store.lock(session["session_id"]):
+            session_data = session_store.get(session["session_id"])
+            if session_data is None:
+                session["session_id"] = session_store.new_session()
+                session_data = SessionStore.new_session_data()
+            yield session_data
+            session_store.put(session["session_id"], session_data)
 
     @app.route('/', methods=['GET', 'POST'])
     def index():
@@ -26,149 +206,140 @@ def create_app():
         Home page for the flask app that will allow users to see/make their schedule
         Also contains link to see all courses
         """
-        global session_data
-        global session_count
-
-        # Check if the user's session_num is valid
-        if "start_time" not in session or session["start_time"] < app_boot_time\
-                or "session_num" not in session:
-            session["start_time"] = time()
-            session["session_num"] = session_count
-            session_count += 1
-            
-            session_data[session["session_num"]] = {
-                "schedule": MySchedule(),
-                "courses_to_display": [],
-                "expanded_course_to_display": None,
-            }
-
         # Load up session info
-        this_session_data = session_data[session["session_num"]]
-        schedule = this_session_data["schedule"]
-        courses_to_display = this_session_data["courses_to_display"]
-        expanded_course_to_display = this_session_data["expanded_course_to_display"]
-
-        search_form = SearchForm()
-        add_remove_form = AddRemoveForm()
-        add_remove_notification_text = ""
-        clear_all_courses_form = ClearAllCoursesForm()
-        search_for_course_form = SearchForCourseForm()
-        add_class_form = AddClassForm()
-        view_sections_form = ViewSectionsForm()
-        serialize_schedule_form = SerializeScheduleForm()
-        serialized_schedule = None
-        gen_ed_search_form = GenEdSearchForm()
-        all_gen_ends = ["SCIS", "DVCC", "DVUP", "DSHS",
-                        "DSHU", "DSNS", "DSNL", "DSSP",
-                        "FSAW", "FSAR", "FSMA", "FSOC", "FSPW"]
-
-        if search_for_course_form.search_for_course.data and \
-                search_for_course_form.validate_on_submit():
-            partial_course_code = search_for_course_form.search_query.data.upper()
+        with locked_session_data() as this_session_data:
+            schedule = this_session_data["schedule"]
+            courses_to_display = this_session_data["courses_to_display"]
+            expanded_course_to_display = this_session_data["expanded_course_to_display"]
 
-            try:
-                courses_to_display = APIGet.get_course_heads_by_query(partial_course_code)
-
-                courses_to_display.sort(reverse=True,
-                                        key=lambda this_course: (this_course.avg_gpa is not None, this_course.avg_gpa))
-            except ConnectionError as e:
-                add_remove_notification_text = str(e)
-
-        if (add_remove_form.add.data or add_remove_form.remove.data) and add_remove_form.validate_on_submit():
-            course_code = add_remove_form.course_query.data.upper()
-            section_number = add_remove_form.section_query.data
+            search_form = SearchForm()
+            add_remove_form = AddRemoveForm()
             add_remove_notification_text = ""
+            clear_all_courses_form = ClearAllCoursesForm()
+            search_for_course_form = SearchForCourseForm()
+            add_class_form = AddClassForm()
+            view_sections_form = ViewSectionsForm()
+            serialize_schedule_form = SerializeScheduleForm()
+            serialized_schedule = None
+            gen_ed_search_form = GenEdSearchForm()
+            all_gen_ends = ["SCIS", "DVCC", "DVUP", "DSHS",
+                            "DSHU", "DSNS", "DSNL", "DSSP",
+                            "FSAW", "FSAR", "FSMA", "FSOC", "FSPW"]
+
+            if search_for_course_form.search_for_course.data and \
+                    search_for_course_form.validate_on_submit():
+                partial_course_code = search_for_course_form.search_query.data.upper()
 
-            try:
-                course_list_to_add = CourseList.get_course_using_course_code(course_code)
-                if course_list_to_add.sections == {}:
-                    raise ConnectionError("This course has no sections, please "
-                                          "contact department for information to register for this course.")
                 try:
-                    course_to_add = course_list_to_add.sections[section_number]
-                    if add_remove_form.add.data:
-                        add_remove_notification_text = schedule.add_section(course_to_add)
-
-                    if add_remove_form.remove.data:
-                        add_remove_notification_text = schedule.remove_section(course_to_add)
-                except KeyError:
-                    add_remove_notification_text = "Section Number not found"
-            except ConnectionError as e:
-                add_remove_notification_text = str(e)
-
-        if request.form.getlist("gened") != [] and gen_ed_search_form.validate_on_submit():
-            list_of_gen_eds_selected = request.form.getlist("gened")
-            if len(list_of_gen_eds_selected) > 0:
-                courses_to_display = APIGet.get_course_list_by_gen_ed(
-                    gen_ed_search_form.department_id.data, list_of_gen_eds_selected[0])
+                    courses_to_display = search_course_heads(partial_course_code)
 
-        if clear_all_courses_form.clear_all.data and clear_all_courses_form.validate_on_submit():
-            if schedule.total_credits == 0:
-                clear_all_courses_form.clear_all.errors = ["Schedule is already empty"]
+                    courses_to_display.sort(reverse=True,
+                                            key=lambda this_course: (this_course.avg_gpa is not None,
+                                                                     this_course.avg_gpa))
+                except ConnectionError as e:
+                    add_remove_notification_text = str(e)
 
-            schedule.remove_all_classes()
-            add_remove_form.course_query.errors = []
-            add_remove_form.section_query.errors = []
+            if (add_remove_form.add.data or add_remove_form.remove.data) and add_remove_form.validate_on_submit():
+                course_code = add_remove_form.course_query.data.upper()
+                section_number = add_remove_form.section_query.data
+                add_remove_notification_text = ""
 
-        if serialize_schedule_form.serialize_schedule.data and serialize_schedule_form.validate_on_submit():
-            serialized_schedule = schedule.get_serialized_schedule()
-
-        if serialize_schedule_form.load_schedule.data and serialize_schedule_form.validate_on_submit():
-            schedule.load_serialized_schedule(serialize_schedule_form.display_serialized_schedule.data)
-
-        # KEEP THIS IF STATEMENT LAST PLEASE!!!!
-        # Changed to be a slightly different horrible hack
-        if "add_course" in request.form:
-            try:
-                button_response = request.form['add_course']
-                course_code = button_response.split(" ")[1]
-                if expanded_course_to_display and expanded_course_to_display.course_code == course_code:
-                    add_remove_notification_text = schedule.add_course(expanded_course_to_display)
-                else:
-                    course_to_add = CourseList.get_course_using_course_code(course_code)
-                    add_remove_notification_text = schedule.add_course(course_to_add)
-
-            except ConnectionError as e:
-                add_remove_notification_text = str(e)
-
-        if "add_section" in request.form:
-            try:
-                button_response = request.form['add_section']
-                section_id = button_response.split(" ")[1]
-                course_code = section_id.split("-")[0]
-                section_number = section_id.split("-")[1]
-
-                course_in_schedule = course_code in [course.course_code for course in schedule.courses_list]
-                if course_in_schedule:
-                    add_remove_notification_text = schedule.add_registered_course_section_by_id(section_id)
-                else:
-                    section_to_add = CourseList.get_course_using_course_code(course_code).sections[section_number]
-                    add_remove_notification_text = schedule.add_section(section_to_add)
-
-            except ConnectionError as e:
-                add_remove_notification_text = str(e)
+                try:
+                    course_list_to_add = CourseList.get_course_using_course_code(course_code)
+                    if course_list_to_add.sections == {}:
+                        raise ConnectionError("This course has no sections, please "
+                                              "contact department for information to register for this course.")
+                    try:
+                        course_to_add = course_list_to_add.sections[section_number]
+                        if add_remove_form.add.data:
+                            add_remove_notification_text = schedule.add_section(course_to_add)
+
+                        if add_remove_form.remove.data:
+                            add_remove_notification_text = schedule.remove_section(course_to_add)
+                    except KeyError:
+                        add_remove_notification_text = "Section Number not found"
+                except ConnectionError as e:
+                    add_remove_notification_text = str(e)
+
+            if request.form.getlist("gened") != [] and gen_ed_search_form.validate_on_submit():
+                list_of_gen_eds_selected = request.form.getlist("gened")
+                if len(list_of_gen_eds_selected) > 0:
+                    courses_to_display = APIGet.get_course_list_by_gen_ed(
+                        gen_ed_search_form.department_id.data, list_of_gen_eds_selected[0])
+
+            if clear_all_courses_form.clear_all.data and clear_all_courses_form.validate_on_submit():
+                if schedule.total_credits == 0:
+                    clear_all_courses_form.clear_all.errors = ["Schedule is already empty"]
+
+                schedule.remove_all_classes()
+                this_session_data["unresolved_course_codes"] = []
+                this_session_data["unresolved_section_ids"] = []
+                add_remove_form.course_query.errors = []
+                add_remove_form.section_query.errors = []
+
+            if serialize_schedule_form.serialize_schedule.data and serialize_schedule_form.validate_on_submit():
+                serialized_schedule = schedule.get_serialized_schedule()
+
+            if serialize_schedule_form.load_schedule.data and serialize_schedule_form.validate_on_submit():
+                schedule.load_serialized_schedule(serialize_schedule_form.display_serialized_schedule.data)
+
+            # KEEP THIS IF STATEMENT LAST PLEASE!!!!
+            # Changed to be a slightly different horrible hack
+            if "add_course" in request.form:
+                try:
+                    button_response = request.form['add_course']
+                    course_code = button_response.split(" ")[1]
+                    if expanded_course_to_display and expanded_course_to_display.course_code == course_code:
+                        add_remove_notification_text = schedule.add_course(expanded_course_to_display)
+                    else:
+                        course_to_add = CourseList.get_course_using_course_code(course_code)
+                        add_remove_notification_text = schedule.add_course(course_to_add)
+
+                except ConnectionError as e:
+                    add_remove_notification_text = str(e)
+
+            if "add_section" in request.form:
+                try:
+                    button_response = request.form['add_section']
+                    section_id = button_response.split(" ")[1]
+                    course_code = section_id.split("-")[0]
+                    section_number = section_id.split("-")[1]
+
+                    course_in_schedule = course_code in [course.course_code for course in schedule.courses_list]
+                    if course_in_schedule:
+                        add_remove_notification_text = schedule.add_registered_course_section_by_id(section_id)
+                    else:
+                        section_to_add = CourseList.get_course_using_course_code(course_code).sections[section_number]
+                        add_remove_notification_text = schedule.add_section(section_to_add)
+
+                except ConnectionError as e:
+                    add_remove_notification_text = str(e)
+
+            if "view_course" in request.form:
+                try:
+                    button_response = request.form['view_course']
+                    course_code = button_response.split(" ")[1]
 
-        if "view_course" in request.form:
-            try:
-                button_response = request.form['view_course']
-                course_code = button_response.split(" ")[1]
+                    course_in_schedule = [course for course in schedule.courses_list
+                                          if course.course_code == course_code]
+                    if course_in_schedule:
+                        expanded_course_to_display = course_in_schedule[0]
+                    else:
+                        expanded_course_to_display = CourseList.get_course_using_course_code(course_code)
 
-                course_in_schedule = [course for course in schedule.courses_list
-                                      if course.course_code == course_code]
-                if course_in_schedule:
-                    expanded_course_to_display = course_in_schedule[0]
-                else:
-                    expanded_course_to_display = CourseList.get_course_using_course_code(course_code)
+                except ConnectionError as e:
+                    add_remove_notification_text = str(e)
 
-            except ConnectionError as e:
-                add_remove_notification_text = str(e)
+            if not add_remove_notification_text and this_session_data["unresolved_course_codes"]:
+                add_remove_notification_text = "Could not load " + ", ".join(
+                    this_session_data["unresolved_course_codes"]) + " right now, they are kept in your schedule"
 
-        # Write session info
-        session_data[session["session_num"]]["schedule"] = schedule
-        session_data[session["session_num"]]["courses_to_display"] = courses_to_display
-        session_data[session["session_num"]]["expanded_course_to_display"] = expanded_course_to_display
+            # Write session info
+            this_session_data["schedule"] = schedule
+            this_session_data["courses_to_display"] = courses_to_display
+            this_session_data["expanded_course_to_display"] = expanded_course_to_display
 
-        return render_template('index.html',
+            return render_page('index.html',
                                schedule=schedule,
                                search_form=search_form,
                                courses_to_display=courses_to_display,
@@ -184,52 +355,252 @@ def create_app():
                                gen_ed_search_form=gen_ed_search_form,
                                all_gen_ends=all_gen_ends)
 
-    @app.route('/all_courses/<page_num>', methods=['GET', 'POST'])
+    def api_error(message: str, status_code: int):
+        """
+        Returns:
+            response: tuple
+                JSON error response of the API, with its status code
+        """
+        return jsonify({"error": message}), status_code
+
+    def get_json_field(field: str) -> str:
+        """
+        Returns:
+            value: str
+                A string field of the JSON body of the request, or None if it is missing. Requiring a JSON body also
+                keeps plain cross-site form posts out of the API.
+        """
+        body = request.get_json(silent=True)
+        value = body.get(field) if isinstance(body, dict) else None
+        return value.strip() if isinstance(value, str) else None
+
+    @app.route('/api/schedule', methods=['GET'])
+    def api_schedule():
+        """
+        Returns the user's schedule as JSON
+        """
+        with locked_session_data() as this_session_data:
+            return jsonify({"schedule": JSONSerializer.schedule_to_json(this_session_data["schedule"])})
+
+    @app.route('/api/schedule/sections', methods=['POST'])
+    def api_add_section():
+        """
+        Adds a section (e.g. {"section_id": "CMSC131-0101"}) to the user's schedule.
+        Returns a message describing the result and the updated schedule.
+        """
+        section_id = get_json_field("section_id")
+        if not section_id or "-" not in section_id:
+            return api_error("Expected a section_id of the format <course>-<section>", 400)
+        section_id = section_id.upper()
+        course_code = section_id.split("-")[0]
+
+        with locked_session_data() as this_session_data:
+            schedule = this_session_data["schedule"]
+            try:
+                if course_code in [course.course_code for course in schedule.courses_list]:
+                    message = schedule.add_registered_course_section_by_id(section_id)
+                else:
+                    sections = CourseList.get_course_using_course_code(course_code).sections.values()
+                    section_to_add = next((section for section in sections if section.section_id == section_id),
+                                          None)
+                    if section_to_add is None:
+                        return api_error("Section Number not found", 404)
+                    message = schedule.add_section(section_to_add)
+            except ConnectionError as e:
+                return api_error(str(e), 502)
+
+            return jsonify({"message": message, "schedule": JSONSerializer.schedule_to_json(schedule)})
+
+    @app.route('/api/schedule/sections/<section_id>', methods=['DELETE'])
+    def api_remove_section(section_id: str):
+        """
+        Removes a section from the user's schedule.
+        Returns a message describing the result and the updated schedule.
+
+        Args:
+            section_id: str
+                Id of the section to remove (e.g. CMSC131-0101)
+        """
+        section_id = section_id.upper()
+        with locked_session_data() as this_session_data:
+            schedule = this_session_data["schedule"]
+            section_to_remove = next((section for section in schedule.sections_list
+                                      if section.section_id == section_id), None)
+            if section_to_remove is None:
+                return api_error(section_id + " not in schedule.", 404)
+
+            message = schedule.remove_section(section_to_remove)
+            return jsonify({"message": message, "schedule": JSONSerializer.schedule_to_json(schedule)})
+
+    @app.route('/api/schedule/courses', methods=['POST'])
+    def api_add_course():
+        """
+        Adds a course (e.g. {"course_code": "CMSC131"}) to the user's schedule, without choosing a section.
+        Returns a message describing the result and the updated schedule.
+        """
+        course_code = get_json_field("course_code")
+        if not course_code:
+            return api_error("Expected a course_code", 400)
+        course_code = course_code.upper()
+
+        with locked_session_data() as this_session_data:
+            schedule = this_session_data["schedule"]
+            expanded_course_to_display = this_session_data["expanded_course_to_display"]
+            try:
+                if expanded_course_to_display and expanded_course_to_display.course_code == course_code:
+                    message = schedule.add_course(expanded_course_to_display)
+                else:
+                    message = schedule.add_course(CourseList.get_course_using_course_code(course_code))
+            except ConnectionError as e:
+                return api_error(str(e), 502)
+
+            return jsonify({"message": message, "schedule": JSONSerializer.schedule_to_json(schedule)})
+
+    @app.route('/api/search', methods=['GET'])
+    def api_search():
+        """
+        Searches courses by a partial course code or title (e.g. /api/search?q=CMSC13), best average GPA first.
+        Returns the matching courses, without their sections.
+        """
+        query = request.args.get("q", "").strip().upper()
+        if not query:
+            return api_error("Expected a search query q", 400)
+
+        with locked_session_data() as this_session_data:
+            try:
+                courses_to_display = search_course_heads(query)
+            except ConnectionError as e:
+                return api_error(str(e), 502)
+
+            courses_to_display.sort(reverse=True,
+                                    key=lambda this_course: (this_course.avg_gpa is not None, this_course.avg_gpa))
+            this_session_data["courses_to_display"] = courses_to_display
+            return jsonify({"courses": [JSONSerializer.course_head_to_json(course)
+                                        for course in courses_to_display]})
+
+    @app.route('/api/courses/<course_code>/sections', methods=['GET'])
+    def api_view_sections(course_code: str):
+        """
+        Returns a course with its professors and sections, and makes it the user's expanded course.
+
+        Args:
+            course_code: str
+                Course code of the course to view (e.g. CMSC131)
+        """
+        course_code = course_code.upper()
+        with locked_session_data() as this_session_data:
+            course_in_schedule = [course for course in this_session_data["schedule"].courses_list
+                                  if course.course_code == course_code]
+            try:
+                expanded_course_to_display = course_in_schedule[0] if course_in_schedule \
+                    else CourseList.get_course_using_course_code(course_code)
+            except ConnectionError as e:
+                return api_error(str(e), 502)
+
+            this_session_data["expanded_course_to_display"] = expanded_course_to_display
+            return jsonify({"course": JSONSerializer.course_to_json(expanded_course_to_display)})
+
+    @app.route('/api/schedule/serialized', methods=['GET', 'POST'])
+    def api_serialized_schedule():
+        """
+        GET returns the user's schedule as a string, in the format of MySchedule.get_serialized_schedule.
+        POST loads such a string (e.g. {"serialized_schedule": "CMSC131-0101,MATH140-0111"}) into the user's
+        schedule and returns the updated schedule.
+        """
+        with locked_session_data() as this_session_data:
+            schedule = this_session_data["schedule"]
+            if request.method == "GET":
+                return jsonify({"serialized_schedule": schedule.get_serialized_schedule()})
+
+            serialized_schedule = get_json_field("serialized_schedule")
+            if serialized_schedule is None:
+                return api_error("Expected a serialized_schedule", 400)
+            schedule.load_serialized_schedule(serialized_schedule)
+            return jsonify({"schedule": JSONSerializer.schedule_to_json(schedule)})
+
+    @app.route('/all_courses/<int:page_num>', methods=['GET', 'POST'])
     def all_courses(page_num: int):
-        """"
+        """
         Display a list of all courses that the student could try to sign up for
         The user can navigate to the next and previous pages to see more courses
         Args:
             page_num: int
                 The page number of all courses to load
         """
-
-        courses = CourseList.get_courses_using_page_number(page_num)
-
-        prev_page_num = None if page_num == 1 else int(page_num) - 1
-        next_page_num = int(page_num) + 1
-
-        return render_template('all_courses.html',
-                               courses=courses,
-                               page_num=page_num,
-                               prev_page_num=prev_page_num,
-                               next_page_num=next_page_num)
-
-    @app.route('/all_professors/<page_num>', methods=['GET', 'POST'])
+        page_count = course_pages.get_page_count()
+        if page_num < 1 or (page_count is not None and page_num > page_count):
+            abort(404)
+
+        notification_text = ""
+        try:
+            courses = course_pages.get_page(page_num)
+        except ConnectionError as e:
+            courses = {}
+            notification_text = str(e)
+
+        prev_page_num = None if page_num == 1 else page_num - 1
+        # Until the course list is downloaded, the last page is the first one with fewer courses than a full page
+        if page_count is not None:
+            next_page_num = page_num + 1 if page_num < page_count else None
+        else:
+            next_page_num = page_num + 1 if len(courses) == CoursePages.page_size else None
+
+        return render_page('all_courses.html',
+                           courses=courses,
+                           notification_text=notification_text,
+                           page_num=page_num,
+                           prev_page_num=prev_page_num,
+                           next_page_num=next_page_num)
+
+    @app.route('/all_professors/<int:page_num>', methods=['GET', 'POST'])
     def all_professors(page_num: int):
-        """"
+        """
         Display a list of all professors that the student could try to take
         Each professor is a hyperlink to their specific page
+        The list can be searched by name (q), sorted by name or rating (sort) and filtered by department (dept)
 
         Args:
             page_num: int
                 The page number of all courses to load
         """
-
-        professor_names, professor_slugs, professor_ratings = Professor.get_all_professors(page_num)
-
-        prev_page_num = None if page_num == 1 else int(page_num) - 1
-        next_page_num = int(page_num) + 1
-
-        return render_template('all_professors.html',
-                               professor_names_slugs=zip(professor_names, professor_slugs, professor_ratings),
-                               page_num=page_num,
-                               prev_page_num=prev_page_num,
-                               next_page_num=next_page_num)
+        if page_num < 1:
+            abort(404)
+        query = request.args.get("q", "")
+        sort = request.args.get("sort", "name")
+        sort = sort if sort in ProfessorIndex.sorts else "name"
+        department = request.args.get("dept", "")
+
+        notification_text = ""
+        professor_index = professor_directory.get_index()
+        if professor_index is not None:
+            professors, match_count = professor_index.search(query, sort, department, (page_num - 1) * 100, 100)
+            has_next_page = page_num * 100 < match_count
+        else:
+            # Until the directory is downloaded, only the page planetterp sends can be searched
+            try:
+                professors_raw = RequestProxy.planetterp_get_professors_by_page(page_num)
+            except ConnectionError as e:
+                professors_raw = []
+                notification_text = str(e)
+            professors, _ = ProfessorIndex(professors_raw).search(query, sort, department)
+            has_next_page = len(professors_raw) == 100
+
+        prev_page_num = None if page_num == 1 else page_num - 1
+        next_page_num = page_num + 1 if has_next_page else None
+
+        return render_page('all_professors.html',
+                           professors=professors,
+                           notification_text=notification_text,
+                           query=query,
+                           sort=sort,
+                           department=department,
+                           page_num=page_num,
+                           prev_page_num=prev_page_num,
+                           next_page_num=next_page_num)
 
     @app.route('/professor/<name>/<slug>', methods=['GET', 'POST'])
     def professor_detail(name: str, slug):
-        """"
+        """
         Display a page for a specific professor using their slug
         Args:
             name: string
@@ -240,15 +611,74 @@ def create_app():
 
         professor = APIGet.get_professor_by_name(name, get_reviews="true")
         plantterp_link = "https://planetterp.com/professor/" + slug
-        return render_template("professor_detail.html",
-                               professor=professor,
-                               plantterp_link=plantterp_link)
+        return render_page("professor_detail.html",
+                           professor=professor,
+                           plantterp_link=plantterp_link)
+
+    @app.route('/optimize', methods=['GET', 'POST'])
+    def optimize():
+        """
+        Finds the best schedules of a list of courses, ranked by the objectives the user cares about.
+        Each schedule can be loaded into the user's schedule on the home page.
+        """
+        optimize_schedule_form = OptimizeScheduleForm()
+        serialize_schedule_form = SerializeScheduleForm()
+        ranked_schedules = None
+        notification_text = ""
+
+        if optimize_schedule_form.validate_on_submit():
+            course_codes = [course_code for course_code in optimize_schedule_form.course_codes.data.split(",")
+                            if course_code.strip()]
+            required_sections = [section_id.strip().upper() for section_id in
+                                 (optimize_schedule_form.required_sections.data or "").split(",")
+                                 if section_id.strip()]
+            weights = {name: getattr(optimize_schedule_form, name + "_weight").data
+                       for name in ScheduleOptimizer.objective_names}
+
+            try:
+                optimizer = ScheduleOptimizer.from_course_codes(
+                    course_codes, weights=weights, open_seats_only=optimize_schedule_form.open_seats_only.data,
+                    required_section_ids=required_sections)
+                ranked_schedules = optimizer.get_top_schedules(optimize_schedule_form.top_k.data or 10)
+                if not optimizer.search_complete:
+                    notification_text = "There are too many schedules to compare them all, so these are the best " \
+                                        "found in time. Requiring some sections makes the search faster."
+                elif not ranked_schedules:
+                    notification_text = "No schedule fits all of these courses."
+            except ConnectionError as e:
+                notification_text = str(e)
+
+        return render_page('optimize.html',
+                           optimize_schedule_form=optimize_schedule_form,
+                           serialize_schedule_form=serialize_schedule_form,
+                           ranked_schedules=ranked_schedules,
+                           notification_text=notification_text)
+
+    @app.route('/admin/warmer', methods=['GET'])
+    def admin_warmer():
+        """
+        Returns the status of the catalog warmer as JSON: its hot courses, queue depth, last refresh and failures.
+        Not found unless ADMIN_ENDPOINTS is set.
+        """
+        if not app.config['ADMIN_ENDPOINTS']:
+            abort(404)
+        warmer = app.extensions.get('catalog_warmer')
+        if warmer is None:
+            return jsonify({"enabled": False})
+        return jsonify(dict(warmer.status(), enabled=True))
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """
+        Returns the request, span and upstream call metrics in the Prometheus text format
+        """
+        return Response(Metrics.registry.render_prometheus(), mimetype="text/plain; version=0.0.4")
 
     @app.route('/tutorial', methods=['GET'])
     def tutorial():
-        """"
+        """
         Tutorial page explaining how to use the schedule builder
         """
-        return render_template("tutorial.html")
+        return render_page("tutorial.html")
 
     return app
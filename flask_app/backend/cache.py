@@ -0,0 +1,161 @@
+from collections import OrderedDict
+from threading import RLock
+from time import monotonic
+from typing import Any, Callable, Hashable, Tuple
+
+
+class LRUCache(object):
+    """
+    Bounded, thread-safe least-recently-used cache whose entries expire after a time to live.
+    Once max_entries is reached, adding a new entry evicts the least recently used one.
+    """
+
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 300, clock: Callable[[], float] = monotonic):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (expiry time, value), ordered from least to most recently used
+        self._entries = OrderedDict()
+        self._lock = RLock()
+
+    def get(self, key: Hashable, default: Any = None, min_ttl: float = 0) -> Any:
+        """
+        Args:
+            key: Hashable
+                Key of the entry to look up
+            default: any
+                Value to return when the key is missing or expired
+            min_ttl: float
+                Entries expiring within this many seconds count as a miss too (but stay cached until they expire)
+        Returns:
+            value: any
+                The cached value, or default on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            now = self.clock()
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            if entry[0] - now <= min_ttl:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, ttl: float = None) -> None:
+        """
+        Args:
+            key: Hashable
+                Key of the entry to store
+            value: any
+                Value to store
+            ttl: float
+                Seconds until the entry expires, defaults to default_ttl
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Removes a single entry from the cache, if present.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Empties the cache and resets its counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            stats: dict
+                Current size and hit/miss/eviction counters of the cache
+        """
+        with self._lock:
+            return {"size": len(self._entries),
+                    "max_entries": self.max_entries,
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > self.clock()
+
+
+class ResponseCache(LRUCache):
+    """
+    Cache of upstream API responses, keyed on endpoint, URL and request params.
+    Every endpoint has its own time to live, since e.g. grades rarely change but open seats change often.
+    """
+    # Seconds that a response of each endpoint stays fresh
+    default_endpoint_ttls = {
+        "planetterp_search": 60 * 60,
+        "planetterp_course": 60 * 60,
+        "planetterp_courses": 60 * 60,
+        "planetterp_grades": 24 * 60 * 60,
+        "planetterp_professor": 24 * 60 * 60,
+        "planetterp_professors": 24 * 60 * 60,
+        "umdio_sections": 60,
+        "umdio_courses": 10 * 60,
+    }
+
+    def __init__(self, max_entries: int = 2048, endpoint_ttls: dict = None, default_ttl: float = 300,
+                 clock: Callable[[], float] = monotonic):
+        super().__init__(max_entries, default_ttl, clock)
+        self.endpoint_ttls = dict(self.default_endpoint_ttls)
+        if endpoint_ttls:
+            self.endpoint_ttls.update(endpoint_ttls)
+
+    @staticmethod
+    def make_key(endpoint: str, url: str, params: dict) -> Tuple:
+        """
+        Args:
+            endpoint: str
+                Name of the upstream endpoint (e.g. "planetterp_course")
+            url: str
+                URL the request is sent to
+            params: dict
+                Query params of the request
+        Returns:
+            key: tuple
+                Hashable key identifying this request
+        """
+        return endpoint, url, tuple(sorted((str(name), str(value)) for name, value in params.items()))
+
+    def get_response(self, endpoint: str, url: str, params: dict, min_ttl: float = 0) -> Any:
+        """
+        Returns the cached response of a request, or None on a miss (or if it expires within min_ttl seconds).
+        """
+        return self.get(self.make_key(endpoint, url, params), min_ttl=min_ttl)
+
+    def put_response(self, endpoint: str, url: str, params: dict, response: Any) -> None:
+        """
+        Stores the response of a request using the time to live of its endpoint.
+        """
+        self.put(self.make_key(endpoint, url, params), response,
+                 self.endpoint_ttls.get(endpoint, self.default_ttl))
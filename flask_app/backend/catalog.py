@@ -0,0 +1,304 @@
+import argparse
+import json
+import re
+import sqlite3
+import threading
+from time import time
+from typing import Tuple
+
+from flask_app.backend.courses import APIGet, RequestProxy
+
+
+class CatalogSnapshot(object):
+    """
+    Local on-disk copy of the course catalog (courses, sections, grades and professors of a semester),
+    stored in SQLite with indexes on course code, department and gen ed.
+
+    Setting RequestProxy.snapshot to a CatalogSnapshot makes RequestProxy answer every request from the
+    snapshot instead of the planetterp and umd.io APIs. Responses are stored in the same json format the
+    APIs return them in, so the rest of the backend cannot tell the difference.
+    """
+    schema = """
+        CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS courses (course_code TEXT PRIMARY KEY, department TEXT, payload TEXT);
+        CREATE TABLE IF NOT EXISTS umdio_courses (course_code TEXT PRIMARY KEY, department TEXT, payload TEXT);
+        CREATE INDEX IF NOT EXISTS umdio_courses_department ON umdio_courses (department, course_code);
+        CREATE TABLE IF NOT EXISTS course_gen_eds (course_code TEXT, gen_ed TEXT,
+                                                   PRIMARY KEY (course_code, gen_ed));
+        CREATE INDEX IF NOT EXISTS course_gen_eds_gen_ed ON course_gen_eds (gen_ed, course_code);
+        CREATE TABLE IF NOT EXISTS sections (section_id TEXT PRIMARY KEY, course_code TEXT, payload TEXT);
+        CREATE INDEX IF NOT EXISTS sections_course_code ON sections (course_code, section_id);
+        CREATE TABLE IF NOT EXISTS grades (course_code TEXT, professor TEXT, semester TEXT, section TEXT,
+                                           payload TEXT);
+        CREATE INDEX IF NOT EXISTS grades_course_code ON grades (course_code);
+        CREATE INDEX IF NOT EXISTS grades_professor ON grades (professor);
+        CREATE TABLE IF NOT EXISTS professors (name TEXT PRIMARY KEY, slug TEXT, payload TEXT);
+    """
+    # Number of matches returned by a search, like the planetterp search endpoint
+    search_limit = 30
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self.connection().executescript(self.schema)
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Returns:
+            connection: sqlite3.Connection
+                Connection to the snapshot for the current thread (sqlite connections can't be shared)
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _dump(payload) -> str:
+        return json.dumps(payload, separators=(",", ":"))
+
+    @staticmethod
+    def _flatten_gen_eds(gen_eds: list) -> set:
+        # umd.io gives gen eds either as a flat list or as a list of alternatives, e.g. [["FSAR", "FSMA"]]
+        flat_gen_eds = set()
+        for gen_ed in gen_eds or []:
+            if isinstance(gen_ed, list):
+                flat_gen_eds.update(gen_ed)
+            else:
+                flat_gen_eds.add(gen_ed)
+        return flat_gen_eds
+
+    def set_metadata(self, key: str, value: str) -> None:
+        with self.connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO metadata VALUES (?, ?)", (key, str(value)))
+
+    def get_metadata(self, key: str) -> str:
+        row = self.connection().execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def add_planetterp_courses(self, courses_raw: list) -> None:
+        """
+        Args:
+            courses_raw: list[dict]
+                Courses as returned by planetterp's course and courses endpoints
+        """
+        with self.connection() as connection:
+            connection.executemany("INSERT OR REPLACE INTO courses VALUES (?, ?, ?)",
+                                   [(course["department"] + course["course_number"], course["department"],
+                                     self._dump(course)) for course in courses_raw])
+
+    def add_umdio_courses(self, courses_raw: list) -> None:
+        """
+        Args:
+            courses_raw: list[dict]
+                Courses as returned by umd.io's courses endpoint. If a course embeds its full sections
+                (like tests/data_for_tests.json does) the sections are stored too.
+        """
+        embedded_sections = []
+        with self.connection() as connection:
+            for course in courses_raw:
+                course_code = course["course_id"]
+                course_summary = dict(course)
+                sections = course.get("sections") or []
+                if sections and isinstance(sections[0], dict):
+                    embedded_sections += sections
+                    course_summary["sections"] = [section["section_id"] for section in sections]
+
+                connection.execute("INSERT OR REPLACE INTO umdio_courses VALUES (?, ?, ?)",
+                                   (course_code, course["dept_id"], self._dump(course_summary)))
+                connection.execute("DELETE FROM course_gen_eds WHERE course_code = ?", (course_code,))
+                connection.executemany("INSERT INTO course_gen_eds VALUES (?, ?)",
+                                       [(course_code, gen_ed) for gen_ed in
+                                        self._flatten_gen_eds(course.get("gen_ed"))])
+        self.add_sections(embedded_sections)
+
+    def add_sections(self, sections_raw: list) -> None:
+        """
+        Args:
+            sections_raw: list[dict]
+                Sections as returned by umd.io's sections endpoints
+        """
+        with self.connection() as connection:
+            connection.executemany("INSERT OR REPLACE INTO sections VALUES (?, ?, ?)",
+                                   [(section["section_id"], section["course"], self._dump(section))
+                                    for section in sections_raw])
+
+    def add_grades(self, course_code: str, grades_raw: list) -> None:
+        """
+        Args:
+            course_code: str
+                Course the grades belong to
+            grades_raw: list[dict]
+                Grade distributions as returned by planetterp's grades endpoint
+        """
+        with self.connection() as connection:
+            connection.execute("DELETE FROM grades WHERE course_code = ?", (course_code,))
+            connection.executemany("INSERT INTO grades VALUES (?, ?, ?, ?, ?)",
+                                   [(course_code, grade["professor"], grade["semester"], grade["section"],
+                                     self._dump(grade)) for grade in grades_raw])
+
+    def add_professors(self, professors_raw: list) -> None:
+        """
+        Args:
+            professors_raw: list[dict]
+                Professors as returned by planetterp's professors endpoint
+        """
+        with self.connection() as connection:
+            connection.executemany("INSERT OR REPLACE INTO professors VALUES (?, ?, ?)",
+                                   [(professor["name"], professor["slug"], self._dump(professor))
+                                    for professor in professors_raw])
+
+    def _payloads(self, query: str, params: tuple = ()) -> list:
+        return [json.loads(row[0]) for row in self.connection().execute(query, params)]
+
+    def lookup(self, endpoint: str, url: str, params: dict) -> Tuple[int, any]:
+        """
+        Answers an upstream API request from the snapshot.
+
+        Args:
+            endpoint: str
+                Name of the endpoint (as passed to RequestProxy.get)
+            url: str
+                URL the request would have been sent to
+            params: dict
+                Query params of the request
+        Returns:
+            (status_code, response): Tuple(int, any)
+                200 and the stored response, or 404 and None if the snapshot has no answer
+        """
+        if endpoint == "planetterp_search":
+            # Wildcards in the query are matched literally, like planetterp does
+            prefix = re.sub(r"([\\%_])", r"\\\1", params["query"].upper()) + "%"
+            courses = self.connection().execute(
+                "SELECT course_code FROM courses WHERE course_code LIKE ? ESCAPE '\\' ORDER BY course_code LIMIT ?",
+                (prefix, self.search_limit)).fetchall()
+            professors = self.connection().execute(
+                "SELECT name, slug FROM professors WHERE name LIKE ? ESCAPE '\\' ORDER BY name LIMIT ?",
+                (prefix, self.search_limit)).fetchall()
+            return 200, [{"name": course_code, "slug": course_code, "type": "course"} for course_code, in courses] + \
+                [{"name": name, "slug": slug, "type": "professor"} for name, slug in professors]
+
+        if endpoint == "planetterp_course":
+            courses = self._payloads("SELECT payload FROM courses WHERE course_code = ?", (params["name"].upper(),))
+            return (200, courses[0]) if courses else (404, None)
+
+        if endpoint == "planetterp_courses":
+            return 200, self._payloads("SELECT payload FROM courses ORDER BY course_code LIMIT ? OFFSET ?",
+                                       (int(params["limit"]), int(params["offset"])))
+
+        if endpoint == "planetterp_grades":
+            course_code = params["course"].upper()
+            if not self.connection().execute("SELECT 1 FROM courses WHERE course_code = ?", (course_code,)).fetchone():
+                return 404, None
+            if params.get("semester"):
+                return 200, self._payloads("SELECT payload FROM grades WHERE course_code = ? AND semester = ?",
+                                           (course_code, str(params["semester"])))
+            return 200, self._payloads("SELECT payload FROM grades WHERE course_code = ?", (course_code,))
+
+        if endpoint == "planetterp_professor":
+            professors = self._payloads("SELECT payload FROM professors WHERE name = ?", (params["name"],))
+            if not professors:
+                return 404, None
+            # Reviews are not part of the snapshot
+            if str(params.get("reviews")).lower() == "true":
+                professors[0]["reviews"] = []
+            return 200, professors[0]
+
+        if endpoint == "planetterp_professors":
+            return 200, self._payloads("SELECT payload FROM professors ORDER BY name LIMIT 100 OFFSET ?",
+                                       (int(params["offset"]),))
+
+        if endpoint == "umdio_sections":
+            course_code = url.rstrip("/").split("/")[-2].upper()
+            sections = self._payloads("SELECT payload FROM sections WHERE course_code = ? ORDER BY section_id",
+                                      (course_code,))
+            return (200, sections) if sections else (404, None)
+
+        if endpoint == "umdio_courses":
+            query = "SELECT umdio_courses.payload FROM umdio_courses JOIN course_gen_eds " \
+                    "ON umdio_courses.course_code = course_gen_eds.course_code WHERE course_gen_eds.gen_ed = ?"
+            query_params = (params["gen_ed"],)
+            if params.get("dept_id"):
+                query += " AND umdio_courses.department = ?"
+                query_params += (params["dept_id"].upper(),)
+            courses = self._payloads(query + " ORDER BY umdio_courses.course_code", query_params)
+            return (200, courses) if courses else (404, None)
+
+        return 404, None
+
+    def get_course_titles(self) -> list:
+        """
+        Returns:
+            course_titles: list[tuple]
+                (course code, title) pairs of every course in the snapshot
+        """
+        return [(course_code, json.loads(payload)["title"]) for course_code, payload in
+                self.connection().execute("SELECT course_code, payload FROM courses")]
+
+    @staticmethod
+    def _fetch_all_pages(endpoint: str, url: str, params: dict, page_param: str, page_size: int,
+                         first_page: int = 0) -> list:
+        # umd.io numbers its pages, planetterp pages by offset
+        results = []
+        page = first_page
+        while True:
+            status_code, page_results = RequestProxy.get(endpoint, url, dict(params, **{page_param: page}))
+            if status_code != 200 or not page_results:
+                return results
+            results += page_results
+            if len(page_results) < page_size:
+                return results
+            page += 1 if page_param == "page" else page_size
+
+    @classmethod
+    def build(cls, path: str, semester: str = None) -> "CatalogSnapshot":
+        """
+        Downloads every course, section, grade distribution and professor of a semester from the live APIs
+        into a new snapshot. RequestProxy.snapshot must not be set while building.
+
+        Args:
+            path: str
+                Path of the SQLite file to write
+            semester: str
+                umd.io semester code (e.g. 202208), defaults to the current semester
+        Returns:
+            snapshot: CatalogSnapshot
+                The finished snapshot
+        """
+        snapshot = cls(path)
+        umdio_params = {"semester": semester} if semester else {}
+
+        snapshot.add_planetterp_courses(cls._fetch_all_pages(
+            "planetterp_courses", "https://api.planetterp.com/v1/courses", {"limit": 100}, "offset", 100))
+        snapshot.add_umdio_courses(cls._fetch_all_pages(
+            "umdio_courses", "https://api.umd.io/v1/courses", dict(umdio_params, per_page=100), "page", 100, 1))
+        snapshot.add_sections(cls._fetch_all_pages(
+            "umdio_sections", "https://api.umd.io/v1/courses/sections", dict(umdio_params, per_page=100),
+            "page", 100, 1))
+        snapshot.add_professors(cls._fetch_all_pages(
+            "planetterp_professors", "https://api.planetterp.com/v1/professors", {"limit": 100}, "offset", 100))
+
+        course_codes = [row[0] for row in snapshot.connection().execute("SELECT course_code FROM courses")]
+        for course_code, grades_raw in zip(course_codes, APIGet.fan_out(
+                [(cls._get_grades_or_empty, (course_code,)) for course_code in course_codes])):
+            snapshot.add_grades(course_code, grades_raw)
+
+        snapshot.set_metadata("semester", semester or "current")
+        snapshot.set_metadata("built_at", time())
+        return snapshot
+
+    @staticmethod
+    def _get_grades_or_empty(course_code: str) -> list:
+        try:
+            return RequestProxy.planetterp_get_grades_by_course_code(course_code)
+        except ConnectionError:
+            return []
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build an offline snapshot of the UMD course catalog")
+    parser.add_argument("path", help="SQLite file to write the snapshot to")
+    parser.add_argument("--semester", help="umd.io semester code, e.g. 202208 (defaults to the current semester)")
+    arguments = parser.parse_args()
+    CatalogSnapshot.build(arguments.path, arguments.semester)
@@ -0,0 +1,133 @@
+from bisect import bisect_left, bisect_right, insort_right
+
+WEEKDAYS = ("M", "Tu", "W", "Th", "F")
+
+
+def interval_mask(start_minute: int, end_minute: int) -> int:
+    """
+    Args:
+        start_minute: int
+            Start of the interval, in minutes since midnight
+        end_minute: int
+            End of the interval, in minutes since midnight (inclusive)
+    Returns:
+        mask: int
+            Bitmask with one bit set for every minute from start_minute to end_minute, both included
+    """
+    return ((1 << (max(end_minute, start_minute) - start_minute + 1)) - 1) << start_minute
+
+
+def section_day_masks(section) -> dict:
+    """
+    Args:
+        section: Section
+            Section to get the meeting minutes of
+    Returns:
+        day_masks: dict[str, int]
+            Dict mapping each day the section meets on to a bitmask of the minutes it meets
+    """
+    day_masks = {}
+    for day, meeting_times in section.class_meetings.items():
+        for meeting_time in meeting_times:
+            day_masks[day] = day_masks.get(day, 0) | \
+                interval_mask(meeting_time.start_time, meeting_time.end_time)
+    return day_masks
+
+
+def section_week_mask(section) -> int:
+    """
+    Args:
+        section: Section
+            Section to get the meeting minutes of
+    Returns:
+        mask: int
+            Single bitmask of every minute of the week the section meets, which makes checking whether two
+            sections conflict one bitwise and
+    """
+    week_mask = 0
+    for day, day_mask in section_day_masks(section).items():
+        week_mask |= day_mask << (WEEKDAYS.index(day) * 24 * 60)
+    return week_mask
+
+
+class ConflictEngine(object):
+    """
+    Keeps track of the minutes of each day that are taken by a schedule.
+    Each day is a bitmask with one bit per minute, so checking a section for conflicts is a handful of
+    bitwise ands, no matter how many classes are already in the schedule.
+    Meetings are considered to include their end minute, so a class ending at 9:50 conflicts with one
+    starting at 9:50.
+    """
+
+    def __init__(self):
+        self.day_masks = dict.fromkeys(WEEKDAYS, 0)
+        # sorted start minutes of the meetings of each day, used to find where a new meeting goes
+        self.day_start_minutes = {day: [] for day in WEEKDAYS}
+        # section id -> day masks and meeting start minutes of that section, so it can be removed again
+        self._section_day_masks = {}
+        self._section_start_minutes = {}
+
+    def has_conflict(self, section) -> bool:
+        """
+        Args:
+            section: Section
+                Section to test for overlap with the minutes already taken.
+        Returns:
+            has_conflict: bool
+                Whether any meeting of the section overlaps a meeting in the schedule.
+        """
+        for day, day_mask in section_day_masks(section).items():
+            if self.day_masks[day] & day_mask:
+                return True
+        return False
+
+    def add_section(self, section) -> list:
+        """
+        Marks the minutes of a section as taken. Does not check for conflicts.
+
+        Args:
+            section: Section
+                Section to add.
+        Returns:
+            insertions: list[tuple]
+                (day, index, meeting time) for every meeting of the section. Inserting each meeting time at its
+                index of its day's list, in this order, keeps the day's list sorted by start time.
+        """
+        day_masks = section_day_masks(section)
+        for day, day_mask in day_masks.items():
+            self.day_masks[day] |= day_mask
+
+        insertions = []
+        start_minutes = []
+        for day, meeting_times in section.class_meetings.items():
+            for meeting_time in meeting_times:
+                start_minute = meeting_time.start_time
+                index = bisect_right(self.day_start_minutes[day], start_minute)
+                insort_right(self.day_start_minutes[day], start_minute)
+                insertions.append((day, index, meeting_time))
+                start_minutes.append((day, start_minute))
+
+        self._section_day_masks[section.section_id] = day_masks
+        self._section_start_minutes[section.section_id] = start_minutes
+        return insertions
+
+    def remove_section(self, section) -> None:
+        """
+        Frees the minutes taken by a section, if it was added.
+
+        Args:
+            section: Section
+                Section to remove.
+        """
+        # Sections in a schedule never overlap, so no other section shares these bits
+        for day, day_mask in self._section_day_masks.pop(section.section_id, {}).items():
+            self.day_masks[day] &= ~day_mask
+
+        for day, start_minute in self._section_start_minutes.pop(section.section_id, []):
+            del self.day_start_minutes[day][bisect_left(self.day_start_minutes[day], start_minute)]
+
+    def clear(self) -> None:
+        """
+        Frees every minute of the schedule.
+        """
+        self.__init__()
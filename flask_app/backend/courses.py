@@ -1,30 +1,129 @@
-from typing import Tuple, Union
+from typing import Callable, Tuple, Union
 
-import requests
+import math
 import re
-from datetime import datetime
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import lru_cache
+from operator import itemgetter
+
+import numpy
+
+from flask_app.backend.cache import ResponseCache
+from flask_app.backend.http_client import HTTPClient
+from flask_app.backend.metrics import Metrics
+from flask_app.backend.search import CourseIndex
+
+
+def intern_string(value: any) -> any:
+    """
+    Args:
+        value: any
+            Value to intern, usually a building, room or professor name repeated across many sections
+    Returns:
+        value: any
+            The shared interned copy of value if it is a string, value itself otherwise
+    """
+    return sys.intern(value) if isinstance(value, str) else value
 
 
 class Course(object):
     """
     Represents a course as seen on the Schedule of Classes.
     Contains a list of sections, the course code, and credits.
+
+    Sections can be loaded lazily: a course made with sections=None and a section_loader only fetches and parses its
+    sections (and professor_to_sections) the first time either is used. Until then, section_count and
+    open_seats_total summarize them, for views that only list courses.
     """
+    __slots__ = ("course_code", "name", "credits", "_sections", "avg_gpa", "gen_eds", "_professor_to_sections",
+                 "professor_to_avg_course_gpa", "professor_to_rating", "_section_loader", "section_count",
+                 "open_seats_total")
 
-    def __init__(self, course_code: str, name: str, course_credits: int, sections: dict, professor_to_sections: dict,
-                 professor_to_avg_course_gpa: dict, avg_gpa: any = 0, gen_eds: list = None):
-        self.sess = requests.Session()
+    def __init__(self, course_code: str, name: str, course_credits: int, sections: Union[dict, None],
+                 professor_to_sections: Union[dict, None], professor_to_avg_course_gpa: dict, avg_gpa: any = 0,
+                 gen_eds: list = None, section_loader: Callable[["Course"], Tuple[dict, dict]] = None):
         self.course_code = course_code
         self.name = name
         self.credits = course_credits if course_credits else 0
-        self.sections = sections
+        self.section_count = None
+        self.open_seats_total = None
+        self._section_loader = section_loader
+        self._sections = None
+        if sections is not None:
+            self.sections = sections
         self.avg_gpa = avg_gpa
         self.gen_eds = gen_eds if gen_eds else []
         # note this will be a dict[string: list] since it is just one professor. In the case of co-taught classes,
         # the same section will appear as part of 2 (or more) lists in this dict
-        self.professor_to_sections = professor_to_sections
+        self._professor_to_sections = professor_to_sections
         self.professor_to_avg_course_gpa = professor_to_avg_course_gpa
+        # planetterp rating of each professor, filled in by load_professor_ratings so templates never fetch ratings
+        self.professor_to_rating = {}
+
+    @property
+    def sections_loaded(self) -> bool:
+        """
+        Whether the sections are in memory, so using them does not fetch anything
+        """
+        return self._section_loader is None
+
+    def load_sections(self) -> None:
+        """
+        Fetches and parses the sections of a lazily loaded course, if not done yet.
+        Threads sharing a course may both load it, which only costs a (usually cached) extra fetch.
+        """
+        section_loader = self._section_loader
+        if section_loader is not None:
+            sections, professor_to_sections = section_loader(self)
+            self._professor_to_sections = professor_to_sections
+            self.sections = sections
+
+    def set_section_summary(self, section_count: int, open_seats_total: int,
+                            section_loader: Callable[["Course"], Tuple[dict, dict]]) -> None:
+        """
+        Makes the course carry only a summary of its sections, which are loaded by section_loader when first used.
+
+        Args:
+            section_count: int
+                Number of sections of the course
+            open_seats_total: int
+                Open seats of all sections together
+            section_loader: Callable[[Course], Tuple[dict, dict]]
+                Returns the sections and professor_to_sections of a course (e.g. APIGet.get_sections_list_by_course)
+        """
+        self._sections = None
+        self._professor_to_sections = None
+        self._section_loader = section_loader
+        self.section_count = section_count
+        self.open_seats_total = open_seats_total
+
+    @property
+    def sections(self) -> dict:
+        if self._section_loader is not None:
+            self.load_sections()
+        return self._sections
+
+    @sections.setter
+    def sections(self, sections: dict) -> None:
+        self._sections = sections
+        self._section_loader = None
+        self.section_count = len(sections)
+        self.open_seats_total = sum(section.open_seats for section in sections.values())
+
+    @property
+    def professor_to_sections(self) -> dict:
+        if self._section_loader is not None:
+            self.load_sections()
+        return self._professor_to_sections
+
+    @professor_to_sections.setter
+    def professor_to_sections(self, professor_to_sections: dict) -> None:
+        self._professor_to_sections = professor_to_sections
 
     @staticmethod
     def get_professor_average_rating(professor_name: str) -> Union[float, None]:
@@ -43,6 +142,34 @@ class Course(object):
         except ConnectionError:
             return None
 
+    def load_professor_ratings(self) -> None:
+        """
+        Fetches the ratings of every professor of this course that has not been rated yet, all in one
+        concurrent batch, and stores them in professor_to_rating.
+
+        Returns:
+            None
+        """
+        professors = [professor for professor in self.professor_to_sections.keys()
+                      if professor not in self.professor_to_rating]
+        ratings = APIGet.fan_out([(Course.get_professor_average_rating, (professor,)) for professor in professors])
+        self.professor_to_rating.update(zip(professors, ratings))
+
+    def get_data_version(self) -> int:
+        """
+        Returns:
+            data_version: int
+                Hash of everything shown about the course's professors and sections (order, ratings, GPAs, seats and
+                meeting times). It changes whenever the course's displayed data does, so it can key rendered HTML.
+        """
+        return hash((self.course_code, self.avg_gpa, tuple(
+            (professor, self.professor_to_rating.get(professor), self.professor_to_avg_course_gpa.get(professor),
+             tuple((section.section_id, section.open_seats, section.total_seats,
+                    tuple((day, meeting_time.start_time, meeting_time.end_time)
+                          for day, meeting_times in section.class_meetings.items() for meeting_time in meeting_times))
+                   for section in sections))
+            for professor, sections in self.professor_to_sections.items())))
+
     def set_sorted_professors_by_rating(self) -> None:
         """
         This function sorts the existing professors to sections object by the rating to display
@@ -51,11 +178,12 @@ class Course(object):
         Returns:
             None
         """
+        self.load_professor_ratings()
+
         self.professor_to_sections = dict(OrderedDict(sorted(self.professor_to_sections.items(),
                                                              key=lambda prof: (
-                                                                 Course.get_professor_average_rating(
-                                                                     prof[0]) is not None,
-                                                                 Course.get_professor_average_rating(prof[0])),
+                                                                 self.professor_to_rating[prof[0]] is not None,
+                                                                 self.professor_to_rating[prof[0]]),
                                                              reverse=True)))
 
 
@@ -71,30 +199,6 @@ class Professor(object):
         self.average_rating = average_rating
         self.reviews = reviews
 
-    @staticmethod
-    def get_all_professors(page_num: int) -> Tuple[list, list, list]:
-        """
-        Returns a list of professors
-
-        Args:
-            page_num: int
-                Page number for the professors to retrieve from planetterp API
-        Returns:
-            (professor_names, professor_slugs, professor_ratings): Tuple(list, list, list)
-                Tuple consisting of list of professor names and slugs and ratings for that page number
-        """
-
-        page_num_offset = str((int(page_num) - 1) * 100)
-
-        professors_request = requests.get('https://api.planetterp.com/v1/professors?offset=' + page_num_offset,
-                                          headers={'Accept': 'application/json'}).json()
-
-        professor_names = [prof["name"] for prof in professors_request]
-        professor_slugs = [prof["slug"] for prof in professors_request]
-        professor_ratings = [prof["average_rating"] for prof in professors_request]
-
-        return professor_names, professor_slugs, professor_ratings
-
 
 class Section(object):
     """
@@ -102,18 +206,42 @@ class Section(object):
     Contains course code, section id, total and open seats,
     and other information for the schedule builder itself such as color to be displayed.
     """
+    __slots__ = ("course_code", "section_id", "total_seats", "open_seats", "class_meetings", "professor_name_list",
+                 "course", "is_synchronous", "weekly_schedule")
 
     def __init__(self, course_code: str, section_id: str, total_seats: int, open_seats: int, class_meetings: dict,
                  professor: list, course: Course, is_synchronous: bool):
-        self.sess = requests.Session()
         self.course_code = course_code
         self.section_id = section_id
         self.total_seats = total_seats
         self.open_seats = open_seats
         self.class_meetings = class_meetings
-        self.professor_name_list = professor
+        # professor names repeat across sections and courses, so every section shares one copy of each
+        self.professor_name_list = [intern_string(professor_name) for professor_name in professor]
         self.course = course
         self.is_synchronous = is_synchronous
+        # formatted once here, since templates show it for every section on every render
+        self.weekly_schedule = Section.make_weekly_schedule(class_meetings)
+
+    @staticmethod
+    def make_weekly_schedule(class_meetings: dict) -> tuple:
+        """
+        Args:
+            class_meetings: dict[str, list[MeetingTime]]
+                Meeting times of a section on each day
+        Returns:
+            weekly_schedule: tuple[tuple[str, str]]
+                Pairs of nicely formatted meeting times and the days they happen on, in order of first meeting.
+                Times are strings of format "9:00am-10:15am", etc.
+                Days are strings of format "MWF", "TuTh", etc.
+        """
+        time_per_day = {}
+        for day, meeting_time_list in class_meetings.items():
+            for meeting_time in dict.fromkeys(meeting_time_list):
+                temp = meeting_time.formatted_start_time + "-" + meeting_time.formatted_end_time
+                time_per_day[temp] = time_per_day.get(temp, "") + day
+
+        return tuple((times, intern_string(days)) for times, days in time_per_day.items())
 
     # Specifying the type contents of a dict type hint crashes Flask.
     def get_formatted_weekly_schedule(self) -> dict:
@@ -124,17 +252,7 @@ class Section(object):
                 Keys are strings of format "9AM-10:15AM", etc.
                 Values are strings of format "MWF", "TuTh", etc.
         """
-        time_per_day = {}
-        for day, meeting_time_list in self.class_meetings.items():
-            if len(meeting_time_list) > 0:
-                for meeting_time in set(meeting_time_list):
-                    temp = meeting_time.formatted_start_time + "-" + meeting_time.formatted_end_time
-                    if temp in time_per_day:
-                        time_per_day[temp] = time_per_day[temp] + day + ""
-                    else:
-                        time_per_day[temp] = day
-
-        return time_per_day
+        return dict(self.weekly_schedule)
 
 
 class MeetingTime(object):
@@ -142,20 +260,43 @@ class MeetingTime(object):
     Class representing a single time-slot of a section.
     Contains time, location, and section id.
     """
+    __slots__ = ("room", "building", "classtype", "start_time", "end_time", "formatted_start_time",
+                 "formatted_end_time", "course", "section_id")
 
     def __init__(self, meeting: dict, section_id: str, course: Course):
-        self.room = meeting["room"]
-        self.building = meeting["building"]
-        self.classtype = meeting["classtype"]
-        # these next 2 are used for comparison of time
-        self.start_time = datetime.strptime(meeting["start_time"], '%I:%M%p')
-        self.end_time = datetime.strptime(meeting["end_time"], '%I:%M%p')
+        self.room = intern_string(meeting["room"])
+        self.building = intern_string(meeting["building"])
+        self.classtype = intern_string(meeting["classtype"])
+        # these next 2 are used for comparison of time, in minutes since midnight
+        self.start_time = MeetingTime.parse_minutes(meeting["start_time"])
+        self.end_time = MeetingTime.parse_minutes(meeting["end_time"])
         # these next 2 are used for frontend formatting of time
-        self.formatted_start_time = meeting["start_time"]
-        self.formatted_end_time = meeting["end_time"]
+        self.formatted_start_time = intern_string(meeting["start_time"])
+        self.formatted_end_time = intern_string(meeting["end_time"])
         self.course = course
         self.section_id = section_id
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def parse_minutes(time_string: str) -> int:
+        """
+        Parses a time of day like the APIs give it (e.g. "9:00AM", "4:30pm"). There are only a few hundred
+        distinct times, so results are cached.
+
+        Args:
+            time_string: str
+                Time in the format "%I:%M%p"
+        Returns:
+            minutes: int
+                Minutes since midnight
+        """
+        hours, minutes = time_string[:-2].split(":")
+        hours, minutes, meridiem = int(hours), int(minutes), time_string[-2:].lower()
+        if not 1 <= hours <= 12 or not 0 <= minutes <= 59 or meridiem not in ("am", "pm"):
+            raise ValueError("time data " + repr(time_string) + " does not match format '%I:%M%p'")
+
+        return (hours % 12 + (12 if meridiem == "pm" else 0)) * 60 + minutes
+
     def __eq__(self, other):
         if not isinstance(other, MeetingTime):
             # don't attempt to compare against unrelated types
@@ -176,6 +317,9 @@ class CourseList(object):
     """
     Class containing a list of all courses available to add.
     """
+    # Counter of course code -> number of times users opened the course (e.g. to learn which courses to keep warm),
+    # counted when set
+    course_views = None
 
     @staticmethod
     def get_course_using_course_code(course_code: str) -> Course:
@@ -193,7 +337,10 @@ class CourseList(object):
             course: Course
                 Returns a Course object corresponding with the course code string
         """
-        return APIGet.get_complete_course_by_course_code(course_code)
+        course = APIGet.get_complete_course_by_course_code(course_code)
+        if CourseList.course_views is not None:
+            CourseList.course_views[course.course_code] += 1
+        return course
 
     @staticmethod
     def get_courses_using_page_number(page_num: int) -> dict:
@@ -253,8 +400,107 @@ class CourseList(object):
 class APIGet(object):
     """
     Static class which handles API calls to retrieve course/section info.
+    Independent API calls are sent concurrently through a shared thread pool (see fan_out).
     """
     headers = {'Accept': 'application/json'}
+    # Local index of known course codes and titles, which answers searches once it holds the whole catalog
+    course_index = CourseIndex()
+    # Persistent per-semester grade totals (a grades.GradeStore), used instead of downloading every course's whole
+    # grade history when set
+    grade_store = None
+    # Maximum number of upstream requests in flight at once
+    max_concurrent_requests = 8
+    _executor = None
+    _executor_lock = threading.Lock()
+    _worker_state = threading.local()
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        """
+        Returns:
+            executor: ThreadPoolExecutor
+                The shared thread pool used to send concurrent requests, created on first use
+        """
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=cls.max_concurrent_requests,
+                                                   thread_name_prefix="api-fan-out",
+                                                   initializer=cls._mark_worker_thread)
+            return cls._executor
+
+    @classmethod
+    def set_max_concurrent_requests(cls, max_concurrent_requests: int) -> None:
+        """
+        Changes the concurrency cap, replacing the shared thread pool.
+
+        Args:
+            max_concurrent_requests: int
+                Maximum number of upstream requests in flight at once
+        """
+        with cls._executor_lock:
+            old_executor = cls._executor
+            cls.max_concurrent_requests = max_concurrent_requests
+            cls._executor = None
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+
+    @classmethod
+    def _mark_worker_thread(cls) -> None:
+        cls._worker_state.in_worker = True
+
+    @classmethod
+    def fan_out(cls, calls: list) -> list:
+        """
+        Runs independent calls concurrently on the shared thread pool and waits for all of them.
+        Calls made from inside a pool thread run one after another instead,
+        so nested fan outs can never deadlock waiting on a full pool.
+
+        Args:
+            calls: list[tuple]
+                List of (function, args) pairs to call
+        Returns:
+            results: list
+                Return values of the calls, in the same order as the calls.
+                If any call raised, the exception of the first such call (in call order) is raised instead.
+        """
+        if len(calls) <= 1 or getattr(cls._worker_state, "in_worker", False):
+            return [function(*args) for function, args in calls]
+
+        # Each call runs in a copy of the caller's context, so context variables (e.g. RequestProxy.refreshing)
+        # reach the pool threads
+        executor = cls.get_executor()
+        futures = [executor.submit(copy_context().run, function, *args) for function, args in calls]
+
+        return [future.result() for future in futures]
+
+    @classmethod
+    def fan_out_as_completed(cls, calls: list):
+        """
+        Runs independent calls concurrently like fan_out, but yields each result as soon as it is ready.
+
+        Args:
+            calls: list[tuple]
+                List of (function, args) pairs to call
+        Yields:
+            (index, result): Tuple(int, any)
+                Index of the call in calls and its return value, in order of completion.
+                If a call raised, its exception is raised when it completes.
+        """
+        if len(calls) <= 1 or getattr(cls._worker_state, "in_worker", False):
+            for index, (function, args) in enumerate(calls):
+                yield index, function(*args)
+            return
+
+        executor = cls.get_executor()
+        future_to_index = {executor.submit(copy_context().run, function, *args): index
+                           for index, (function, args) in enumerate(calls)}
+        try:
+            for future in as_completed(future_to_index):
+                yield future_to_index[future], future.result()
+        finally:
+            # The caller stopped early (or a call failed), so do not send requests nobody will read
+            for future in future_to_index:
+                future.cancel()
 
     @staticmethod
     def get_course_heads_by_query(query: str) -> list:
@@ -270,15 +516,44 @@ class APIGet(object):
                 List of courses that were found by this search,
                 without sections. (Course "heads")
         """
+        return APIGet.get_course_heads_by_course_codes(APIGet.get_course_codes_by_query(query))
+
+    @staticmethod
+    def get_course_codes_by_query(query: str) -> list:
+        """
+        Args:
+            query: str
+                 Search string to search on planetterp
+        Returns:
+            course_codes: list[str]
+                Codes of the courses matched by this search, in the order planetterp returned them,
+                without duplicates. Answered by the local course_index instead once it is complete (built from a
+                catalog snapshot or the course list of CoursePages).
+        """
+        if APIGet.course_index.complete:
+            return APIGet.course_index.search(query)
+
         query = query.upper()
         course_search_return = RequestProxy.planetterp_search_by_query(query)
-        course_names = [result["name"] for result in course_search_return if result["type"] == "course"]
 
-        course_heads = []
-        for course_name in course_names:
-            course_heads += [APIGet.get_course_head_by_course_code(course_name)]
+        return list(dict.fromkeys(result["name"] for result in course_search_return if result["type"] == "course"))
+
+    @staticmethod
+    def get_course_heads_by_course_codes(course_codes: list) -> list:
+        """
+        Gets the course heads of many courses at once, fetching them concurrently.
+
+        Args:
+            course_codes: list[str]
+                Course codes of the courses to be gotten. Repeated codes are only fetched once.
+        Returns:
+            course_heads: list[Course]
+                Courses without sections, in the same order as course_codes (without duplicates)
+        """
+        course_codes = list(dict.fromkeys(course_codes))
 
-        return course_heads
+        return APIGet.fan_out([(APIGet.get_course_head_by_course_code, (course_code,))
+                               for course_code in course_codes])
 
     @staticmethod
     def get_complete_course_by_course_code(course_code: str) -> Course:
@@ -294,9 +569,17 @@ class APIGet(object):
                 Course returned by combined responses of
                 planetterp and umd.io APIs
         """
-        out_course = APIGet.get_course_head_by_course_code(course_code)
-        out_course.sections, out_course.professor_to_sections = APIGet.get_sections_list_by_course(out_course)
-        out_course.professor_to_avg_course_gpa = APIGet.get_professor_gpa_breakdown_by_course(course_code)
+        # The course head, its sections and its grades do not depend on each other, so fetch them all at once
+        course_raw, sections_raw, professor_to_avg_course_gpa = APIGet.fan_out([
+            (RequestProxy.planetterp_get_course_by_course_code, (course_code,)),
+            (RequestProxy.umdio_get_sections_by_course_code, (course_code.upper(),)),
+            (APIGet.get_professor_gpa_breakdown_by_course, (course_code,)),
+        ])
+
+        out_course = APIParse.planetterp_course_raw_to_course_head(course_raw)
+        out_course.sections, out_course.professor_to_sections = \
+            APIParse.umd_io_sections_raw_to_section_list(sections_raw, out_course)
+        out_course.professor_to_avg_course_gpa = professor_to_avg_course_gpa
         out_course.set_sorted_professors_by_rating()
 
         return out_course
@@ -316,8 +599,11 @@ class APIGet(object):
                 Will have rating info, etc.
         """
         course_search_return = RequestProxy.planetterp_get_course_by_course_code(course_code)
+        course_head = APIParse.planetterp_course_raw_to_course_head(course_search_return)
+        # Keep the search index up to date with courses it has not seen yet
+        APIGet.course_index.add(course_head.course_code, course_head.name)
 
-        return APIParse.planetterp_course_raw_to_course_head(course_search_return)
+        return course_head
 
     @staticmethod
     def get_course_list_by_page_number(page_num: int) -> dict:
@@ -335,17 +621,27 @@ class APIGet(object):
                 Dictionary of courses in alphabetical order to display in the "all courses" page (max of 30)
         """
         courses_this_page = RequestProxy.planetterp_get_courses_by_page(page_num)
+        course_heads = [APIParse.planetterp_course_raw_to_course_head(course_raw) for course_raw in courses_this_page]
+        APIGet.load_section_summaries_of_courses(course_heads)
 
-        courses = {}  # dictionary mapping course code (string) to a Course object
-
-        for course_raw in courses_this_page:
-            course_obj = APIParse.planetterp_course_raw_to_course_head(course_raw)
-            course_obj.sections = APIGet.get_sections_list_by_course(course_obj)[0]
-            course_code = course_obj.course_code
+        # dictionary mapping course code (string) to a Course object
+        return {course.course_code: course for course in course_heads}
 
-            courses[course_code] = course_obj
+    @staticmethod
+    def load_section_summaries_of_courses(courses: list) -> None:
+        """
+        Fetches the sections of several courses at once (see fan_out), but only counts them and their open seats.
+        The sections themselves are parsed when a course's sections are first used (see Course.set_section_summary).
 
-        return courses
+        Args:
+            courses: list[Course]
+                Courses to load the section summaries of
+        """
+        sections_raw_per_course = APIGet.fan_out([
+            (RequestProxy.umdio_get_sections_by_course_code, (course.course_code,)) for course in courses])
+        for course, sections_raw in zip(courses, sections_raw_per_course):
+            course.set_section_summary(*APIParse.umd_io_sections_raw_to_section_summary(sections_raw),
+                                       APIGet.get_sections_list_by_course)
 
     @staticmethod
     def get_course_list_by_gen_ed(department_id: str, gen_ed: str) -> list:
@@ -393,7 +689,7 @@ class APIGet(object):
             professors: dict[str, Section]
                 Professors teaching this course with a list of their sections, from umd.io
         """
-        sections_response = RequestProxy.umdio_get_sections_by_course_code(course)
+        sections_response = RequestProxy.umdio_get_sections_by_course_code(course.course_code)
 
         return APIParse.umd_io_sections_raw_to_section_list(sections_response, course)
 
@@ -408,6 +704,9 @@ class APIGet(object):
                 Dictionary of [str:float] of professor to calculated average gpa of specific course when taught by that
                 professor
         """
+        if APIGet.grade_store is not None:
+            return APIGet.grade_store.get_professor_to_avg_course_gpa(course_code)
+
         grade_search_return = RequestProxy.planetterp_get_grades_by_course_code(course_code)
 
         return APIParse.planetterp_raw_grade_distribution_to_gpa(grade_search_return)
@@ -436,9 +735,83 @@ class RequestProxy(object):
     Emulation consists of returning the sample responses
     listed on the respective APIs.
     Returns error sample response when bad_request is set to True.
+    Outside of test mode, successful responses are cached in a ResponseCache.
+    Set snapshot to a CatalogSnapshot to answer every request from a local copy of the catalog instead.
+    Requests that do reach an API go through one shared HTTPClient, which keeps connections to each host alive.
     """
     test_mode = False
     bad_request = False
+    cache = ResponseCache()
+    snapshot = None
+    http_client = HTTPClient()
+    # While set, requests skip the cached responses expiring within this many seconds and store fresh ones
+    # (see force_refresh)
+    refreshing = ContextVar("refreshing", default=None)
+
+    @classmethod
+    @contextmanager
+    def force_refresh(cls, expiring_within: float = math.inf):
+        """
+        Sends the requests made inside the block (including those fanned out to other threads) to the APIs even if
+        their responses are cached, and caches the new responses. Used to refresh cached courses before they expire.
+
+        Args:
+            expiring_within: float
+                Only responses that expire within this many seconds are refreshed, the others are still answered
+                from the cache. Every response is refreshed by default.
+        """
+        token = cls.refreshing.set(expiring_within)
+        try:
+            yield
+        finally:
+            cls.refreshing.reset(token)
+
+    @classmethod
+    def get(cls, endpoint: str, url: str, params: dict) -> Tuple[int, any]:
+        """
+        Sends a GET request to an upstream API, answering from the response cache when possible.
+        Only successful (status code 200) responses are cached, and the cache is skipped inside force_refresh (for
+        the responses it refreshes).
+        Cached responses are shared between callers, so they must not be mutated.
+        Raises ConnectionError if the API cannot be reached, does not answer within the client's timeouts or keeps
+        failing (see HTTPClient).
+        If a snapshot is set, the request is answered from it without going to the network.
+
+        Args:
+            endpoint: str
+                Name of the endpoint, which decides how long its responses are cached
+            url: str
+                URL to send the request to
+            params: dict
+                Query params of the request
+        Returns:
+            (status_code, response): Tuple(int, any)
+                Status code of the response and its json body (None if the request failed)
+        """
+        if cls.snapshot is not None:
+            Metrics.count_upstream_call(endpoint, "snapshot")
+            return cls.snapshot.lookup(endpoint, url, params)
+
+        refreshing = cls.refreshing.get()
+        cached_response = cls.cache.get_response(endpoint, url, params, 0 if refreshing is None else refreshing)
+        if cached_response is not None:
+            Metrics.count_upstream_call(endpoint, "cache")
+            return 200, cached_response
+
+        try:
+            with Metrics.span("upstream", endpoint):
+                response = cls.http_client.get(url, params=params, headers=APIGet.headers)
+        except ConnectionError:
+            Metrics.count_upstream_call(endpoint, "error")
+            raise
+        Metrics.count_upstream_call(endpoint, "network")
+        if response.status_code != 200:
+            return response.status_code, None
+
+        with Metrics.span("parse", "json"):
+            response_json = response.json()
+        cls.cache.put_response(endpoint, url, params, response_json)
+        return 200, response_json
 
     @classmethod
     def planetterp_search_by_query(cls, query: str) -> list:
@@ -453,9 +826,10 @@ class RequestProxy(object):
                 List of courses that were matched (from json response)
         """
         if not cls.test_mode:
-            return requests.get('https://api.planetterp.com/v1/search',
-                                params={'query': query},
-                                headers=APIGet.headers).json()
+            status_code, matched_courses = cls.get("planetterp_search", 'https://api.planetterp.com/v1/search',
+                                                   {'query': query})
+
+            return matched_courses if status_code == 200 else []
 
         else:
             return [{"name": "CMSC131", "slug": "CMSC131", "type": "course"}]
@@ -473,14 +847,13 @@ class RequestProxy(object):
                 Course that was found, in dict form (from json response)
         """
         if not cls.test_mode:
-            course_search_return = requests.get('https://api.planetterp.com/v1/course',
-                                                params={'name': course_code},
-                                                headers=APIGet.headers)
+            status_code, course = cls.get("planetterp_course", 'https://api.planetterp.com/v1/course',
+                                          {'name': course_code})
 
-            if course_search_return.status_code != 200:
+            if status_code != 200:
                 raise ConnectionError("Course Code Not Found")
 
-            return course_search_return.json()
+            return course
 
         else:
             if not cls.bad_request:
@@ -507,22 +880,31 @@ class RequestProxy(object):
                 raise ConnectionError("Course Code Not Found")
 
     @classmethod
-    def planetterp_get_courses_by_page(cls, page_num: int) -> list:
+    def planetterp_get_courses_by_page(cls, page_num: int, limit: int = 30) -> list:
         """
         Ask planetterp to get a page from the list of all courses
 
         Args:
-            page_num: str
-                Page number to get
+            page_num: int
+                Page number to get, starting at 1
+            limit: int
+                Number of courses per page
         Returns:
             courses: list
-                List of course on this page (from json response)
+                List of course on this page (from json response), empty past the last page. Raises ConnectionError
+                if planetterp does not answer with the page.
         """
         if not cls.test_mode:
-            return requests.get("https://api.planetterp.com/v1/courses", params={
-                "limit": 30,
-                "offset": page_num
-            }, headers=APIGet.headers).json()
+            # planetterp pages by offset, so page n starts after the courses of the n - 1 pages before it
+            status_code, courses = cls.get("planetterp_courses", "https://api.planetterp.com/v1/courses", {
+                "limit": limit,
+                "offset": (int(page_num) - 1) * limit
+            })
+
+            if status_code != 200:
+                raise ConnectionError("Error retrieving the list of courses")
+
+            return courses
 
         else:
             if not cls.bad_request:
@@ -548,27 +930,27 @@ class RequestProxy(object):
                 return []
 
     @classmethod
-    def umdio_get_sections_by_course_code(cls, course: Course) -> list:
+    def umdio_get_sections_by_course_code(cls, course_code: str) -> list:
         """
         Ask umd.io to get a list of sections from a course code
 
         Args:
-            course: str
-                Course whose course code will be used for search
+            course_code: str
+                Course code to get the sections of
         Returns:
             sections: list
                 List of sections for the course (from json response)
         """
         if not cls.test_mode:
-            sections_response = requests.get("https://api.umd.io/v1/courses/" + course.course_code + "/sections",
-                                             params={},
-                                             headers=APIGet.headers)
+            status_code, sections = cls.get("umdio_sections",
+                                            "https://api.umd.io/v1/courses/" + course_code + "/sections",
+                                            {})
 
             # Not all courses have sections
-            if sections_response.status_code != 200:
+            if status_code != 200:
                 return []
 
-            return sections_response.json()
+            return sections
 
         else:
             if not cls.bad_request:
@@ -614,20 +996,17 @@ class RequestProxy(object):
         """
         if not cls.test_mode:
             if department_id == "":
-                sections_response = requests.get("https://api.umd.io/v1/courses",
-                                                 params={"gen_ed": gen_ed},
-                                                 headers=APIGet.headers)
+                params = {"gen_ed": gen_ed}
             else:
-                sections_response = requests.get("https://api.umd.io/v1/courses",
-                                                 params={"dept_id": department_id,
-                                                         "gen_ed": gen_ed},
-                                                 headers=APIGet.headers)
+                params = {"dept_id": department_id,
+                          "gen_ed": gen_ed}
+            status_code, courses = cls.get("umdio_courses", "https://api.umd.io/v1/courses", params)
 
             # No courses found
-            if sections_response.status_code != 200:
+            if status_code != 200:
                 return []
 
-            return sections_response.json()
+            return courses
 
         else:
             if not cls.bad_request:
@@ -694,26 +1073,29 @@ class RequestProxy(object):
                 return []
 
     @classmethod
-    def planetterp_get_grades_by_course_code(cls, course_code: str) -> list:
+    def planetterp_get_grades_by_course_code(cls, course_code: str, semester: str = None) -> list:
         """
         Ask planetterp to get grades for a course
 
         Args:
             course_code: str
                 Course code to get grades for
+            semester: str
+                Semester code (e.g. 202008) to only get the grades of, defaults to every semester
         Returns:
             grades: list
                 List of letter grades for this course (from json response)
         """
         if not cls.test_mode:
-            grade_search_return = requests.get('https://api.planetterp.com/v1/grades', params={
-                'course': course_code
-            }, headers=APIGet.headers)
+            params = {'course': course_code}
+            if semester is not None:
+                params['semester'] = semester
+            status_code, grades = cls.get("planetterp_grades", 'https://api.planetterp.com/v1/grades', params)
 
-            if grade_search_return.status_code != 200:
+            if status_code != 200:
                 raise ConnectionError("Error retrieving gpa information from course")
 
-            return grade_search_return.json()
+            return grades
 
         else:
             if not cls.bad_request:
@@ -756,15 +1138,14 @@ class RequestProxy(object):
             prof_raw: a json dict with professor information
         """
         if not cls.test_mode:
-            course_search_return = requests.get('https://api.planetterp.com/v1/professor', params={
+            status_code, prof_raw = cls.get("planetterp_professor", 'https://api.planetterp.com/v1/professor', {
                 'name': professor_name,
                 'reviews': get_reviews
-            }, headers=APIGet.headers)
+            })
 
-            if course_search_return.status_code != 200:
+            if status_code != 200:
                 raise ConnectionError("Professor Not Found")
 
-            prof_raw = course_search_return.json()
             return prof_raw
         else:
             if not cls.bad_request:
@@ -780,14 +1161,57 @@ class RequestProxy(object):
             else:
                 raise ConnectionError("Professor Not Found")
 
+    @classmethod
+    def planetterp_get_professors_by_page(cls, page_num: int) -> list:
+        """
+        Ask planetterp to get a page from the list of all professors
+
+        Args:
+            page_num: int
+                Page number to get, each page has 100 professors
+        Returns:
+            professors: list
+                List of professors on this page (from json response), empty past the last page. Raises
+                ConnectionError if planetterp does not answer with the page.
+        """
+        if not cls.test_mode:
+            status_code, professors = cls.get("planetterp_professors", 'https://api.planetterp.com/v1/professors', {
+                'offset': (int(page_num) - 1) * 100
+            })
+
+            if status_code != 200:
+                raise ConnectionError("Error retrieving the list of professors")
+
+            return professors
+
+        else:
+            if not cls.bad_request:
+                return [{
+                    "name": "Jon Snow",
+                    "slug": "snow",
+                    "type": "professor",
+                    "courses": [
+                        "MATH140"
+                    ],
+                    "average_rating": 4.125
+                }]
+
+            else:
+                return []
+
 
 class APIParse(object):
     """
     Static class which parses API responses.
     Extract their contents using .json() before calling this class.
     """
+    # Grades counted in a gpa, and the quality points of each in tenths (4.0 -> 40)
+    gpa_grades = ("A+", "A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D+", "D", "D-", "F", "W")
+    grade_quality_tenths = numpy.array([40, 40, 37, 33, 30, 27, 23, 20, 17, 13, 10, 7, 0, 0], dtype=numpy.int64)
+    _get_gpa_grade_counts = staticmethod(itemgetter(*gpa_grades))
 
     @staticmethod
+    @Metrics.timed("parse")
     def planetterp_course_raw_to_course_head(course_raw: dict) -> Course:
         """
         Makes a response from planetterp's course get into a course (with no sections)
@@ -814,6 +1238,7 @@ class APIParse(object):
         return out_course
 
     @staticmethod
+    @Metrics.timed("parse")
     def umd_io_course_raw_to_course_head(course_raw: dict) -> Course:
         """
         Makes a response from umd.io's course get into a course (with no sections)
@@ -840,6 +1265,7 @@ class APIParse(object):
         return out_course
 
     @staticmethod
+    @Metrics.timed("parse")
     def umd_io_sections_raw_to_section_list(sections_raw: list, parent_course: Course) \
             -> Tuple[dict, dict]:
         """
@@ -872,7 +1298,7 @@ class APIParse(object):
                 parent_course.course_code, section_id, total_seats, open_seats, class_meetings, professors,
                 parent_course, is_synchronous)
             # set the initial value to an empty list of sections
-            for professor in professors:
+            for professor in section_to_add.professor_name_list:
                 professor_to_sections_dict.setdefault(professor, [])
                 professor_to_sections_dict[professor].append(section_to_add)
             section_dict[section_number] = section_to_add
@@ -880,6 +1306,19 @@ class APIParse(object):
         return section_dict, professor_to_sections_dict
 
     @staticmethod
+    def umd_io_sections_raw_to_section_summary(sections_raw: list) -> Tuple[int, int]:
+        """
+        Args:
+            sections_raw: list[dict]
+                The raw response of the umd.io sections API (converted from json to dict)
+        Returns:
+            (section_count, open_seats_total): Tuple(int, int)
+                Number of sections and their open seats together, without parsing the sections
+        """
+        return len(sections_raw), sum(int(section["open_seats"]) for section in sections_raw)
+
+    @staticmethod
+    @Metrics.timed("parse")
     def planetterp_raw_grade_distribution_to_gpa(grades_raw: list) -> dict:
         """
         Makes a response from planetterps's grades get into a gpa float
@@ -892,59 +1331,64 @@ class APIParse(object):
                 Dictionary of [string: float] representing Professor to the calculated average GPA of the course
                 taught by that specific professor
         """
-        professor_to_course_gpa = {}
-        professor_to_quality_points = {}
-        professor_to_total_grade_entries = {}
-
-        # W's are counted as 0.0, "other" is excluded in gpa calculation
-        for semester_grade in grades_raw:
-            professor = semester_grade["professor"]
-            professor_to_quality_points.setdefault(professor, 0.0)
-            professor_to_total_grade_entries.setdefault(professor, 0)
-
-            professor_to_quality_points[professor] += 4 * (semester_grade["A+"] + semester_grade["A"])
-            professor_to_total_grade_entries[professor] += semester_grade["A+"] + semester_grade["A"]
-
-            professor_to_quality_points[professor] += 3.7 * semester_grade["A-"]
-            professor_to_total_grade_entries[professor] += semester_grade["A-"]
-
-            professor_to_quality_points[professor] += 3.3 * semester_grade["B+"]
-            professor_to_total_grade_entries[professor] += semester_grade["B+"]
-
-            professor_to_quality_points[professor] += 3 * semester_grade["B"]
-            professor_to_total_grade_entries[professor] += semester_grade["B"]
-
-            professor_to_quality_points[professor] += 2.7 * semester_grade["B-"]
-            professor_to_total_grade_entries[professor] += semester_grade["B-"]
-
-            professor_to_quality_points[professor] += 2.3 * semester_grade["C+"]
-            professor_to_total_grade_entries[professor] += semester_grade["C+"]
-
-            professor_to_quality_points[professor] += 2 * semester_grade["C"]
-            professor_to_total_grade_entries[professor] += semester_grade["C"]
-
-            professor_to_quality_points[professor] += 1.7 * semester_grade["C-"]
-            professor_to_total_grade_entries[professor] += semester_grade["C-"]
+        return {professor: APIParse.grade_totals_to_gpa(quality_tenths, total_grade_entries)
+                for professor, (quality_tenths, total_grade_entries)
+                in APIParse.planetterp_raw_grades_to_totals(grades_raw, ("professor",)).items()}
 
-            professor_to_quality_points[professor] += 1.3 * semester_grade["D+"]
-            professor_to_total_grade_entries[professor] += semester_grade["D+"]
+    @staticmethod
+    def planetterp_raw_grades_to_totals(grades_raw: list, group_by: tuple) -> dict:
+        """
+        Sums the quality points and graded entries of planetterp's grade rows, grouped by some of their fields
 
-            professor_to_quality_points[professor] += 1 * semester_grade["D"]
-            professor_to_total_grade_entries[professor] += semester_grade["D"]
+        Args:
+            grades_raw: list[dict]
+                The raw response of the planetterp grades API (converted from json to dict)
+            group_by: tuple[str]
+                Fields to group the rows by, e.g. ("professor",) or ("professor", "semester")
+        Returns:
+            totals: dict
+                Dict mapping the value of the field (or the tuple of values of the fields, if there are several) of
+                each group to its (quality points in tenths, graded entries) as ints, in order of first row
+        """
+        if not grades_raw:
+            return {}
 
-            professor_to_quality_points[professor] += .7 * semester_grade["D-"]
-            professor_to_total_grade_entries[professor] += semester_grade["D-"]
+        # Rows are grouped with a dict, since numpy can't group arbitrary keys (e.g. a professor may be None)
+        get_group = itemgetter(*group_by)
+        group_to_index = {}
+        group_indices = [group_to_index.setdefault(get_group(semester_grade), len(group_to_index))
+                         for semester_grade in grades_raw]
 
-            professor_to_total_grade_entries[professor] += semester_grade["F"]
+        # One row per semester and one column per grade. W's are counted as 0.0, "other" is excluded in gpa
+        # calculation. Quality points are kept in integer tenths so every sum is exact.
+        grade_matrix = numpy.array(list(map(APIParse._get_gpa_grade_counts, grades_raw)), dtype=numpy.int64)
+        row_quality_tenths = grade_matrix @ APIParse.grade_quality_tenths
+        row_total_grade_entries = grade_matrix.sum(axis=1)
 
-            professor_to_total_grade_entries[professor] += semester_grade["W"]
+        group_quality_tenths = numpy.bincount(group_indices, weights=row_quality_tenths,
+                                              minlength=len(group_to_index))
+        group_total_grade_entries = numpy.bincount(group_indices, weights=row_total_grade_entries,
+                                                   minlength=len(group_to_index))
 
-        for professor, quality_points in professor_to_quality_points.items():
-            professor_to_course_gpa[professor] = quality_points / professor_to_total_grade_entries[professor]
+        return {group: (int(group_quality_tenths[index]), int(group_total_grade_entries[index]))
+                for group, index in group_to_index.items()}
 
-        return professor_to_course_gpa
+    @staticmethod
+    def grade_totals_to_gpa(quality_tenths: int, total_grade_entries: int) -> Union[float, None]:
+        """
+        Args:
+            quality_tenths: int
+                Sum of the quality points of the graded entries, in tenths
+            total_grade_entries: int
+                Number of graded entries
+        Returns:
+            gpa: any (float/None)
+                The average gpa, or None if there are no graded entries (e.g. only "other" grades)
+        """
+        return quality_tenths / (10 * total_grade_entries) if total_grade_entries else None
 
     @staticmethod
+    @Metrics.timed("parse")
     def planetterp_prof_raw_to_prof_head(prof_raw: dict) -> Professor:
         """
         Makes a response from planetterp's professor get into a course (with no sections)
@@ -962,11 +1406,9 @@ class APIParse(object):
         average_rating = prof_raw["average_rating"]
 
         if "reviews" in prof_raw.keys():
-            reviews = prof_raw["reviews"]
-
-            for review in reviews:
-                del review["professor"]
-                del review["created"]
+            # Copy the reviews rather than deleting keys, since prof_raw may be a shared cached response
+            reviews = [{key: value for key, value in review.items() if key not in ("professor", "created")}
+                       for review in prof_raw["reviews"]]
 
         else:
             reviews = None
@@ -0,0 +1,126 @@
+from flask_app.backend.conflicts import section_week_mask
+from flask_app.backend.courses import APIGet
+
+
+class ScheduleGenerator(object):
+    """
+    Enumerates every conflict-free schedule made of one section of each of a list of courses.
+
+    Each section's meeting times are turned into a single bitmask of the minutes of the week, and every pair of
+    sections is compared once up front, giving each section a bitset of the sections it conflicts with.
+    The search then picks one section per course by backtracking, keeping a bitset of the sections that are still
+    allowed, and gives up on a branch as soon as some remaining course has no allowed section left.
+    """
+
+    def __init__(self, courses: list):
+        """
+        Args:
+            courses: list[Course]
+                Courses to make schedules of. Courses without sections make every schedule impossible.
+        """
+        self.courses = courses
+        self.sections = []  # every section of every course, indexed by its bit in the bitsets below
+        self.course_section_bits = []  # for each course, bitset of the indices of its sections
+
+        for course in courses:
+            course_bits = 0
+            for section in course.sections.values():
+                course_bits |= 1 << len(self.sections)
+                self.sections.append(section)
+            self.course_section_bits.append(course_bits)
+
+        self.conflict_bits = self._make_conflict_bits([section_week_mask(section) for section in self.sections])
+
+    @staticmethod
+    def _make_conflict_bits(week_masks: list) -> list:
+        # Many sections meet at the same times, so compare each distinct set of meeting times only once
+        week_mask_to_indices = {}
+        for index, week_mask in enumerate(week_masks):
+            week_mask_to_indices[week_mask] = week_mask_to_indices.get(week_mask, 0) | (1 << index)
+
+        distinct_week_masks = list(week_mask_to_indices.items())
+        week_mask_to_conflict_bits = {}
+        for week_mask, _ in distinct_week_masks:
+            conflict_bits = 0
+            if week_mask:
+                for other_week_mask, other_indices in distinct_week_masks:
+                    if week_mask & other_week_mask:
+                        conflict_bits |= other_indices
+            week_mask_to_conflict_bits[week_mask] = conflict_bits
+
+        return [week_mask_to_conflict_bits[week_mask] for week_mask in week_masks]
+
+    @staticmethod
+    def _bit_indices(bits: int):
+        while bits:
+            lowest_bit = bits & -bits
+            yield lowest_bit.bit_length() - 1
+            bits ^= lowest_bit
+
+    def iter_schedules(self, max_results: int = 1000, allowed_bits: int = None):
+        """
+        Args:
+            max_results: int
+                Maximum number of schedules to yield (None for no limit)
+            allowed_bits: int
+                Bitset of the indices of the sections that may be used (defaults to every section)
+        Yields:
+            schedule: tuple[Section]
+                One section of each course, in the same order as the courses, with no time conflicts
+        """
+        if not self.courses or max_results == 0:
+            return
+
+        allowed_bits = (1 << len(self.sections)) - 1 if allowed_bits is None else allowed_bits
+        # Courses with the fewest sections first, so impossible branches are cut as early as possible
+        course_order = sorted(range(len(self.courses)),
+                              key=lambda course: bin(self.course_section_bits[course] & allowed_bits).count("1"))
+        chosen = [None] * len(self.courses)
+        results_yielded = 0
+
+        def backtrack(depth: int, allowed: int):
+            nonlocal results_yielded
+            if depth == len(course_order):
+                results_yielded += 1
+                yield tuple(chosen)
+                return
+
+            course = course_order[depth]
+            for index in self._bit_indices(self.course_section_bits[course] & allowed):
+                still_allowed = allowed & ~self.conflict_bits[index]
+                # Forward check: every course left must still have a section that fits
+                if all(self.course_section_bits[other_course] & still_allowed
+                       for other_course in course_order[depth + 1:]):
+                    chosen[course] = self.sections[index]
+                    yield from backtrack(depth + 1, still_allowed)
+                    if max_results is not None and results_yielded >= max_results:
+                        return
+
+        yield from backtrack(0, allowed_bits)
+
+    @staticmethod
+    def from_course_codes(course_codes: list) -> "ScheduleGenerator":
+        """
+        Args:
+            course_codes: list[str]
+                Course codes of the courses to make schedules of (e.g. ["CMSC131", "MATH140"])
+        Returns:
+            generator: ScheduleGenerator
+                Generator over the complete courses, fetched concurrently
+        """
+        return ScheduleGenerator(ScheduleGenerator.fetch_courses(course_codes))
+
+    @staticmethod
+    def fetch_courses(course_codes: list) -> list:
+        """
+        Args:
+            course_codes: list[str]
+                Course codes of the courses to fetch. Repeated codes are only fetched once.
+        Returns:
+            courses: list[Course]
+                The complete courses (with sections), fetched concurrently
+        """
+        course_codes = list(dict.fromkeys(course_code.strip().upper() for course_code in course_codes))
+        return APIGet.fan_out([(APIGet.get_complete_course_by_course_code, (course_code,))
+                               for course_code in course_codes])
+
@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+from datetime import date
+from typing import Callable
+
+from flask_app.backend.courses import APIParse, RequestProxy
+
+
+class GradeStore(object):
+    """
+    Persistent totals of the grades of every course, so a course's grade history is only downloaded once.
+
+    Grades of past semesters never change, so the store keeps the quality points and graded entries of each
+    (course, professor, semester), plus their sum per (course, professor). The first time a course is asked for, its
+    whole history is fetched. After that, only the semesters after the latest stored one are fetched (one request
+    per semester), and merged into the totals. If more than max_semesters_per_update are missing, the whole
+    history is fetched again instead, since that takes a single request.
+    """
+    schema = """
+        CREATE TABLE IF NOT EXISTS semester_totals (course_code TEXT, professor TEXT, semester TEXT,
+                                                    quality_tenths INTEGER, graded_entries INTEGER,
+                                                    PRIMARY KEY (course_code, professor, semester));
+        CREATE TABLE IF NOT EXISTS professor_totals (course_code TEXT, professor TEXT, quality_tenths INTEGER,
+                                                     graded_entries INTEGER, PRIMARY KEY (course_code, professor));
+        CREATE TABLE IF NOT EXISTS courses (course_code TEXT PRIMARY KEY, latest_semester TEXT);
+        CREATE TABLE IF NOT EXISTS checked_semesters (course_code TEXT PRIMARY KEY, semester TEXT);
+    """
+    # Months in which UMD semesters start (spring, summer, fall and winter), which end their semester codes
+    semester_months = ("01", "05", "08", "12")
+    # Number of missing semesters above which the whole history is fetched instead (a year of semesters)
+    max_semesters_per_update = 4
+    # Stands in for a missing professor, since NULLs are never equal in a primary key
+    no_professor = ""
+
+    def __init__(self, path: str, today: Callable[[], date] = date.today):
+        self.path = path
+        self.today = today
+        self._local = threading.local()
+        with self.connection() as connection:
+            connection.executescript(self.schema)
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Returns:
+            connection: sqlite3.Connection
+                Connection to the store for the current thread (sqlite connections can't be shared)
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            self._local.connection = connection
+        return connection
+
+    def get_semesters_after(self, semester: str) -> list:
+        """
+        Args:
+            semester: str
+                Semester code, e.g. 202008
+        Returns:
+            semesters: list[str]
+                Codes of every semester after it that has started by today, in order
+        """
+        current_month = self.today().strftime("%Y%m")
+        semesters = []
+        for year in range(int(semester[:4]), int(current_month[:4]) + 1):
+            for month in self.semester_months:
+                if semester < str(year) + month <= current_month:
+                    semesters.append(str(year) + month)
+        return semesters
+
+    def merge_grades(self, course_code: str, grades_raw: list) -> None:
+        """
+        Adds planetterp grade rows of a course to the totals. Semesters of a professor that are already stored are
+        skipped, so merging the same rows twice changes nothing.
+
+        Args:
+            course_code: str
+                Course code the rows are grades of
+            grades_raw: list[dict]
+                The raw response of the planetterp grades API
+        """
+        totals = APIParse.planetterp_raw_grades_to_totals(grades_raw, ("professor", "semester"))
+        with self.connection() as connection:
+            connection.execute("INSERT OR IGNORE INTO courses VALUES (?, ?)", (course_code, ""))
+            connection.executemany("INSERT OR IGNORE INTO semester_totals VALUES (?, ?, ?, ?, ?)", [
+                (course_code, professor or self.no_professor, str(semester), quality_tenths, graded_entries)
+                for (professor, semester), (quality_tenths, graded_entries) in totals.items()])
+
+            # Roll the semesters up again for just the professors that were merged
+            professors = {professor or self.no_professor for professor, _ in totals}
+            connection.executemany(
+                "INSERT OR REPLACE INTO professor_totals SELECT course_code, professor, SUM(quality_tenths), "
+                "SUM(graded_entries) FROM semester_totals WHERE course_code = ? AND professor = ? "
+                "GROUP BY course_code, professor", [(course_code, professor) for professor in professors])
+            connection.execute("UPDATE courses SET latest_semester = (SELECT COALESCE(MAX(semester), '') "
+                               "FROM semester_totals WHERE course_code = ?) WHERE course_code = ?",
+                               (course_code, course_code))
+
+    def _set_checked_semester(self, course_code: str, semester: str) -> None:
+        with self.connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO checked_semesters VALUES (?, ?)", (course_code, semester))
+
+    def update_course(self, course_code: str) -> None:
+        """
+        Fetches the grades of a course that are not stored yet: its whole history the first time (or when more than
+        max_semesters_per_update semesters are missing), and otherwise every semester after the latest stored one.
+        Grades are published after a semester ends, so semesters without grades are checked again until they started
+        over a year ago. A semester that fails to download is tried again next time, before any semester after it.
+        Raises ConnectionError if the first download fails.
+
+        Args:
+            course_code: str
+                Course code to fetch the grades of
+        """
+        row = self.connection().execute("SELECT latest_semester FROM courses WHERE course_code = ?",
+                                        (course_code,)).fetchone()
+        today = self.today()
+        # Semesters up to this month are final: they started over a year ago
+        final_month = str(today.year - 1) + str(today.month).zfill(2)
+        if row is None:
+            self.merge_grades(course_code, RequestProxy.planetterp_get_grades_by_course_code(course_code))
+            self._set_checked_semester(course_code, final_month)
+            return
+
+        checked_row = self.connection().execute("SELECT semester FROM checked_semesters WHERE course_code = ?",
+                                                (course_code,)).fetchone()
+        semesters = self.get_semesters_after(max(row[0], checked_row[0] if checked_row else ""))
+        if len(semesters) > self.max_semesters_per_update:
+            try:
+                grades_raw = RequestProxy.planetterp_get_grades_by_course_code(course_code)
+            except ConnectionError:
+                return  # the stored totals are used until the history can be fetched again
+            self.merge_grades(course_code, grades_raw)
+            self._set_checked_semester(course_code, final_month)
+            return
+
+        checked_semester = None
+        for semester in semesters:
+            try:
+                grades_raw = RequestProxy.planetterp_get_grades_by_course_code(course_code, semester)
+            except ConnectionError:
+                # Stop here, so no later semester is stored before this one and it is tried again next time
+                break
+            grades_raw = [grade for grade in grades_raw if str(grade["semester"]) == semester]
+            if grades_raw:
+                self.merge_grades(course_code, grades_raw)
+            if semester <= final_month:
+                checked_semester = semester
+        if checked_semester is not None:
+            self._set_checked_semester(course_code, checked_semester)
+
+    def get_professor_to_avg_course_gpa(self, course_code: str) -> dict:
+        """
+        Args:
+            course_code: str
+                Course code of the course
+        Returns:
+            gpa: dict
+                Dictionary of [str:float] of professor to the average gpa of the course when taught by that
+                professor, read from the stored totals after fetching any new semesters
+        """
+        course_code = course_code.upper()
+        self.update_course(course_code)
+        rows = self.connection().execute(
+            "SELECT professor, quality_tenths, graded_entries FROM professor_totals WHERE course_code = ?",
+            (course_code,))
+        return {professor if professor != self.no_professor else None:
+                APIParse.grade_totals_to_gpa(quality_tenths, graded_entries)
+                for professor, quality_tenths, graded_entries in rows}
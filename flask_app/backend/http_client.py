@@ -0,0 +1,200 @@
+from threading import BoundedSemaphore, Lock
+from time import monotonic
+from typing import Callable
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class CircuitBreaker(object):
+    """
+    Stops sending requests to an upstream that keeps failing, so a slow or broken API can't tie up every worker.
+    After failure_threshold failures in a row the circuit opens and requests are refused outright. Once
+    reset_timeout seconds have passed, one trial request is let through: if it succeeds the circuit closes again,
+    otherwise it stays open for another reset_timeout.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30,
+                 clock: Callable[[], float] = monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CircuitBreaker.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._lock = Lock()
+
+    def allow_request(self) -> bool:
+        """
+        Returns:
+            allowed: bool
+                Whether a request may be sent now. Only one trial request is allowed while half-open.
+        """
+        with self._lock:
+            if self.state == CircuitBreaker.CLOSED:
+                return True
+            if self.state == CircuitBreaker.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = CircuitBreaker.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CircuitBreaker.CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == CircuitBreaker.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = CircuitBreaker.OPEN
+                self.opened_at = self.clock()
+
+
+class HTTPClient(object):
+    """
+    Shared HTTP client that keeps one requests.Session per upstream host, so connections are kept alive and
+    reused instead of doing a new TCP and TLS handshake for every request.
+    Requests are retried with exponential backoff on connection errors, 429 and 5xx responses, at most
+    max_requests_per_host are in flight to a host at once, and each host has its own CircuitBreaker.
+    """
+    retry_status_codes = (429, 500, 502, 503, 504)
+
+    def __init__(self, pool_maxsize: int = 10, max_requests_per_host: int = 10, max_retries: int = 2,
+                 backoff_factor: float = 0.3, connect_timeout: float = 3.05, read_timeout: float = 10,
+                 failure_threshold: int = 5, reset_timeout: float = 30, clock: Callable[[], float] = monotonic):
+        """
+        Args:
+            pool_maxsize: int
+                Number of keep-alive connections kept open to each host
+            max_requests_per_host: int
+                Number of requests allowed in flight to each host at once
+            max_retries: int
+                Number of times a failed request is retried
+            backoff_factor: float
+                Retries wait backoff_factor * 2 ** (retry number - 1) seconds (or what a Retry-After header says)
+            connect_timeout: float
+                Seconds to wait for a connection to the host
+            read_timeout: float
+                Seconds to wait for the host to send data, which is also how long a request waits for its turn
+                when max_requests_per_host requests are already in flight
+            failure_threshold: int
+                Failures in a row after which requests to a host are refused (see CircuitBreaker)
+            reset_timeout: float
+                Seconds a host's circuit stays open before a trial request is let through
+            clock: Callable[[], float]
+                Clock used by the circuit breakers
+        """
+        self.pool_maxsize = pool_maxsize
+        self.max_requests_per_host = max_requests_per_host
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        # host -> (session, circuit breaker, semaphore limiting the requests in flight)
+        self._hosts = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        """
+        Args:
+            url: str
+                URL of a request
+        Returns:
+            host: str
+                Scheme and host (with port) of the URL, e.g. "https://api.umd.io"
+        """
+        split_url = urlsplit(url)
+        return split_url.scheme + "://" + split_url.netloc
+
+    def _make_session(self) -> requests.Session:
+        retry = Retry(total=self.max_retries, backoff_factor=self.backoff_factor,
+                      status_forcelist=self.retry_status_codes, allowed_methods=frozenset(["GET"]),
+                      raise_on_status=False, respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _get_host_state(self, host: str) -> tuple:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = (self._make_session(),
+                                     CircuitBreaker(self.failure_threshold, self.reset_timeout, self.clock),
+                                     BoundedSemaphore(self.max_requests_per_host))
+            return self._hosts[host]
+
+    def get(self, url: str, params: dict = None, headers: dict = None) -> requests.Response:
+        """
+        Sends a GET request over the host's kept-alive session.
+        Raises ConnectionError if the host's circuit is open, too many requests to it are in flight, or the
+        request still fails after every retry.
+
+        Args:
+            url: str
+                URL to send the request to
+            params: dict
+                Query params of the request
+            headers: dict
+                Headers of the request
+        Returns:
+            response: requests.Response
+                The response, which may still have an error status code once retries run out
+        """
+        session, breaker, in_flight = self._get_host_state(self.get_host(url))
+        # Waiting for a turn says nothing about the host (only about this process's load), so it is not a failure.
+        # The circuit is checked after the wait, so a trial request is never left waiting without an outcome.
+        if not in_flight.acquire(timeout=self.read_timeout):
+            raise ConnectionError("Too many requests in flight to " + url)
+
+        try:
+            if not breaker.allow_request():
+                raise ConnectionError("Not sending requests to " + url + " while its host keeps failing")
+            try:
+                response = session.get(url, params=params, headers=headers,
+                                       timeout=(self.connect_timeout, self.read_timeout))
+            except requests.exceptions.RequestException:
+                breaker.record_failure()
+                raise ConnectionError("Could not reach " + url)
+            except BaseException:
+                # Any request that started must be recorded, or a half-open circuit would wait for it forever
+                breaker.record_failure()
+                raise
+        finally:
+            in_flight.release()
+
+        if response.status_code in self.retry_status_codes:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            stats: dict[str, dict]
+                Circuit state and consecutive failures of each host that has been sent a request
+        """
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: {"state": breaker.state, "consecutive_failures": breaker.consecutive_failures}
+                for host, (_, breaker, _) in hosts.items()}
+
+    def close(self) -> None:
+        """
+        Closes every kept-alive connection.
+        """
+        with self._lock:
+            hosts, self._hosts = self._hosts, {}
+        for session, _, _ in hosts.values():
+            session.close()
@@ -0,0 +1,290 @@
+import cProfile
+import os
+import random
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter, time
+from typing import Callable, Union
+
+
+class MetricsRegistry(object):
+    """
+    Thread-safe counters and histograms, rendered in the Prometheus text format.
+    Every metric is identified by its name and a dict of labels, which should only take a few values each (e.g.
+    endpoint names, not URLs).
+    """
+    # Upper bounds (in seconds) of the histogram buckets
+    buckets = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self):
+        # name -> (type, help text)
+        self.descriptions = {}
+        # (name, labels) -> value
+        self.counters = {}
+        # (name, labels) -> [count per bucket (not cumulative, the last one is +Inf), sum of values, count of values]
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, metric_type: str, help_text: str) -> None:
+        """
+        Args:
+            name: str
+                Name of the metric
+            metric_type: str
+                "counter" or "histogram"
+            help_text: str
+                Description of the metric
+        """
+        self.descriptions[name] = (metric_type, help_text)
+
+    @staticmethod
+    def _label_key(labels: dict) -> tuple:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def inc(self, name: str, labels: dict, amount: float = 1) -> None:
+        key = (name, self._label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, labels: dict, value: float) -> None:
+        key = (name, self._label_key(labels))
+        bucket_index = next((index for index, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][bucket_index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def get_counter(self, name: str, labels: dict) -> float:
+        with self._lock:
+            return self.counters.get((name, self._label_key(labels)), 0)
+
+    @staticmethod
+    def _format_labels(labels: tuple) -> str:
+        if not labels:
+            return ""
+        return "{" + ",".join(name + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+                              for name, value in labels) + "}"
+
+    def render_prometheus(self) -> str:
+        """
+        Returns:
+            text: str
+                Every metric in the Prometheus text exposition format (version 0.0.4)
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = {key: (list(histogram[0]), histogram[1], histogram[2])
+                          for key, histogram in self.histograms.items()}
+
+        lines = []
+        for name in sorted({name for name, _ in counters} | {name for name, _ in histograms}):
+            metric_type, help_text = self.descriptions.get(name, ("untyped", ""))
+            lines.append("# HELP " + name + " " + help_text)
+            lines.append("# TYPE " + name + " " + metric_type)
+            for (counter_name, labels), value in sorted(counters.items()):
+                if counter_name == name:
+                    lines.append(name + self._format_labels(labels) + " " + repr(float(value)))
+            for (histogram_name, labels), (bucket_counts, value_sum, value_count) in sorted(histograms.items()):
+                if histogram_name != name:
+                    continue
+                cumulative_count = 0
+                for bound, bucket_count in zip(self.buckets + ("+Inf",), bucket_counts):
+                    cumulative_count += bucket_count
+                    lines.append(name + "_bucket" + self._format_labels(labels + (("le", str(bound)),)) + " " +
+                                 str(cumulative_count))
+                lines.append(name + "_sum" + self._format_labels(labels) + " " + repr(value_sum))
+                lines.append(name + "_count" + self._format_labels(labels) + " " + str(value_count))
+        return "\n".join(lines) + "\n"
+
+
+class RequestTrace(object):
+    """
+    Timing spans and upstream call counts of one request.
+    Spans are appended by whichever thread does the work (fan out calls run in a copy of the request's context), so
+    a trace is only read once the request is done.
+    """
+
+    def __init__(self):
+        self.started_at = perf_counter()
+        # (category, name, seconds)
+        self.spans = []
+        self.upstream_calls = 0
+        self.upstream_cache_hits = 0
+
+    def get_summary(self) -> dict:
+        """
+        Returns:
+            summary: dict
+                Duration of the request so far, its upstream calls, and the number and total milliseconds of the
+                spans of each "category:name", plus the total milliseconds of each category
+        """
+        spans = {}
+        category_ms = {}
+        for category, name, seconds in list(self.spans):
+            span = spans.setdefault(category + ":" + name, {"count": 0, "ms": 0.0})
+            span["count"] += 1
+            span["ms"] += seconds * 1000
+            category_ms[category] = category_ms.get(category, 0.0) + seconds * 1000
+        return {
+            "duration_ms": round((perf_counter() - self.started_at) * 1000, 3),
+            "upstream_calls": self.upstream_calls,
+            "upstream_cache_hits": self.upstream_cache_hits,
+            "category_ms": {category: round(ms, 3) for category, ms in category_ms.items()},
+            "spans": {key: {"count": span["count"], "ms": round(span["ms"], 3)} for key, span in spans.items()},
+        }
+
+
+class Metrics(object):
+    """
+    Static class which instruments the app: timing spans of upstream calls, parse steps and template renders, and a
+    counter of upstream calls by where they were answered from.
+    Everything is recorded in registry (served by /metrics), and spans of a request are also added to its
+    RequestTrace (written to the structured log once the request is done).
+    """
+    prefix = "schedule_builder_"
+    registry = MetricsRegistry()
+    current_trace = ContextVar("current_trace", default=None)
+
+    registry.describe(prefix + "requests_total", "counter", "Requests handled, by endpoint, method and status")
+    registry.describe(prefix + "request_duration_seconds", "histogram", "Time to handle a request, by endpoint")
+    registry.describe(prefix + "span_duration_seconds", "histogram",
+                      "Time spent in upstream calls, parse steps and template renders, by category and name")
+    registry.describe(prefix + "upstream_calls_total", "counter",
+                      "RequestProxy calls, by endpoint and source (cache, snapshot, network or error)")
+
+    @classmethod
+    def start_trace(cls) -> RequestTrace:
+        """
+        Starts tracing the current request. Spans recorded in this context (and fan outs from it) are added to it.
+        """
+        trace = RequestTrace()
+        cls.current_trace.set(trace)
+        return trace
+
+    @classmethod
+    def record_span(cls, category: str, name: str, seconds: float) -> None:
+        cls.registry.observe(cls.prefix + "span_duration_seconds", {"category": category, "name": name}, seconds)
+        trace = cls.current_trace.get()
+        if trace is not None:
+            trace.spans.append((category, name, seconds))
+
+    @classmethod
+    @contextmanager
+    def span(cls, category: str, name: str):
+        """
+        Times the code inside the block as a span.
+
+        Args:
+            category: str
+                Kind of work, e.g. "upstream", "parse" or "render"
+            name: str
+                What is done, e.g. an endpoint, function or template name
+        """
+        started_at = perf_counter()
+        try:
+            yield
+        finally:
+            cls.record_span(category, name, perf_counter() - started_at)
+
+    @classmethod
+    def timed(cls, category: str) -> Callable:
+        """
+        Decorator which times every call of a function as a span named after the function.
+
+        Args:
+            category: str
+                Kind of work the function does, e.g. "parse"
+        """
+        def decorator(function: Callable) -> Callable:
+            @wraps(function)
+            def timed_function(*args, **kwargs):
+                started_at = perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    cls.record_span(category, function.__name__, perf_counter() - started_at)
+            return timed_function
+        return decorator
+
+    @classmethod
+    def count_upstream_call(cls, endpoint: str, source: str) -> None:
+        """
+        Args:
+            endpoint: str
+                Name of the upstream endpoint (e.g. "planetterp_course")
+            source: str
+                Where the call was answered from: "cache", "snapshot", "network" or "error"
+        """
+        cls.registry.inc(cls.prefix + "upstream_calls_total", {"endpoint": endpoint, "source": source})
+        trace = cls.current_trace.get()
+        if trace is not None:
+            trace.upstream_calls += 1
+            if source == "cache":
+                trace.upstream_cache_hits += 1
+
+    @classmethod
+    def record_request(cls, endpoint: str, method: str, status: int, seconds: float) -> None:
+        cls.registry.inc(cls.prefix + "requests_total", {"endpoint": endpoint, "method": method, "status": status})
+        cls.registry.observe(cls.prefix + "request_duration_seconds", {"endpoint": endpoint}, seconds)
+
+
+class SamplingProfiler(object):
+    """
+    Profiles a random sample of requests with cProfile and saves each profile to output_dir, named after the time
+    and endpoint of the request (open them with pstats or snakeviz). Only the request's own thread is profiled, so
+    work fanned out to other threads shows up as time spent waiting for it.
+    """
+
+    def __init__(self, sample_rate: float, output_dir: str, sample: Callable[[], float] = random.random):
+        """
+        Args:
+            sample_rate: float
+                Share of requests to profile, from 0 (none) to 1 (every request)
+            output_dir: str
+                Directory the profiles are saved to
+            sample: Callable[[], float]
+                Returns a random float in [0, 1)
+        """
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.sample = sample
+
+    def start(self) -> Union[cProfile.Profile, None]:
+        """
+        Returns:
+            profile: cProfile.Profile
+                A running profile if this request was sampled, otherwise None
+        """
+        if self.sample_rate <= 0 or self.sample() >= self.sample_rate:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return None  # another profiler (e.g. a debugger) is already running in this thread
+        return profile
+
+    def stop(self, profile: Union[cProfile.Profile, None], endpoint: str) -> Union[str, None]:
+        """
+        Args:
+            profile: cProfile.Profile
+                Profile returned by start (does nothing if None)
+            endpoint: str
+                Endpoint of the request, used in the file name
+        Returns:
+            path: str
+                Path the profile was saved to, or None
+        """
+        if profile is None:
+            return None
+        profile.disable()
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, "%.6f-%s.prof" % (time(), re.sub("[^A-Za-z0-9_]", "_", endpoint)))
+        profile.dump_stats(path)
+        return path
@@ -0,0 +1,281 @@
+import heapq
+from itertools import count
+from time import monotonic
+
+from flask_app.backend.conflicts import WEEKDAYS
+from flask_app.backend.generator import ScheduleGenerator
+
+
+class RankedSchedule(object):
+    """
+    A schedule found by the ScheduleOptimizer, with its score and the value of every objective.
+    """
+
+    def __init__(self, score: float, sections: tuple, objectives: dict):
+        self.score = score
+        self.sections = sections
+        self.objectives = objectives
+
+    def get_serialized_schedule(self) -> str:
+        """
+        Returns:
+            str_schedule: str
+                The schedule in the format of MySchedule.get_serialized_schedule, so it can be loaded
+        """
+        return ",".join(section.section_id for section in self.sections)
+
+
+class ScheduleOptimizer(object):
+    """
+    Finds the best schedules of a list of courses according to user-weighted objectives.
+    Every objective is scored from 0 (worst) to 1 (best), and a schedule's score is the weighted sum of them:
+        gpa: highest average GPA of the sections' professors (or of the course, if a professor has no grades)
+        rating: highest average planetterp rating of the sections' professors
+        days: fewest days on campus
+        gaps: least time between classes on the same day
+        early: fewest courses meeting before early_cutoff
+    Sections can also be restricted to those with open seats, and some sections can be required.
+
+    The search is a branch and bound over the conflict bitsets of a ScheduleGenerator. The best top_k schedules so
+    far are kept in a heap, and a branch is dropped as soon as an optimistic bound of its score can't beat the
+    worst of them. The search stops after max_nodes branches or time_budget seconds, keeping the best schedules
+    found so far (search_complete tells whether it finished).
+    """
+    objective_names = ("gpa", "rating", "days", "gaps", "early")
+    # Minute of the day before which a class counts as an early morning (10:00am)
+    early_cutoff = 10 * 60
+    # Time between classes (in minutes) that scores 0 on the gaps objective
+    max_gap_minutes = 5 * 8 * 60
+    # Default budget of a search, so a request never waits on a search over a huge number of schedules
+    max_nodes = 200000
+    time_budget = 2.0
+
+    def __init__(self, courses: list, weights: dict = None, open_seats_only: bool = False,
+                 required_section_ids: list = None):
+        """
+        Args:
+            courses: list[Course]
+                Courses to make schedules of
+            weights: dict[str, float]
+                Weight of each objective in objective_names (missing or negative weights count as 0)
+            open_seats_only: bool
+                Whether to only use sections that have open seats
+            required_section_ids: list[str]
+                Section ids (e.g. CMSC131-0101) that every schedule must use
+        """
+        self.courses = courses
+        self.weights = {name: max(0.0, float((weights or {}).get(name) or 0)) for name in self.objective_names}
+        self.generator = ScheduleGenerator(courses)
+        self.allowed_bits = self._make_allowed_bits(open_seats_only, required_section_ids or [])
+        self.section_scores = [self._score_section(section) for section in self.generator.sections]
+        # Whether the last get_top_schedules searched every schedule instead of running out of budget
+        self.search_complete = True
+
+    def _make_allowed_bits(self, open_seats_only: bool, required_section_ids: list) -> int:
+        required_section_ids = set(required_section_ids)
+        allowed_bits = 0
+        for course_bits in self.generator.course_section_bits:
+            indices = list(ScheduleGenerator._bit_indices(course_bits))
+            required = [index for index in indices
+                        if self.generator.sections[index].section_id in required_section_ids]
+            for index in required or indices:
+                if not open_seats_only or required or self.generator.sections[index].open_seats > 0:
+                    allowed_bits |= 1 << index
+        return allowed_bits
+
+    @staticmethod
+    def _section_gpa(section) -> float:
+        professor_gpas = [section.course.professor_to_avg_course_gpa.get(professor)
+                          for professor in section.professor_name_list]
+        professor_gpas = [gpa for gpa in professor_gpas if gpa is not None]
+        if professor_gpas:
+            return sum(professor_gpas) / len(professor_gpas)
+        return section.course.avg_gpa or 0.0
+
+    @staticmethod
+    def _section_rating(section) -> float:
+        ratings = [section.course.professor_to_rating.get(professor) for professor in section.professor_name_list]
+        ratings = [rating for rating in ratings if rating is not None]
+        return sum(ratings) / len(ratings) if ratings else 0.0
+
+    def _is_early(self, section) -> bool:
+        return any(meeting_time.start_time < self.early_cutoff
+                   for meeting_times in section.class_meetings.values() for meeting_time in meeting_times)
+
+    def _score_section(self, section) -> float:
+        # The objectives that are a sum over sections, so they can be bounded section by section
+        course_count = len(self.courses)
+        return (self.weights["gpa"] * self._section_gpa(section) / 4.0 +
+                self.weights["rating"] * self._section_rating(section) / 5.0 +
+                self.weights["early"] * (0.0 if self._is_early(section) else 1.0)) / course_count
+
+    @staticmethod
+    def _day_bits(section) -> int:
+        day_bits = 0
+        for day_index, day in enumerate(WEEKDAYS):
+            if section.class_meetings.get(day):
+                day_bits |= 1 << day_index
+        return day_bits
+
+    @staticmethod
+    def _day_gap_minutes(sections) -> list:
+        """
+        Returns:
+            gap_minutes: list[int]
+                Minutes between the first and last class of each weekday that no class takes up
+        """
+        day_gap_minutes = []
+        for day in WEEKDAYS:
+            meetings = sorted((meeting_time.start_time, meeting_time.end_time)
+                              for section in sections for meeting_time in section.class_meetings.get(day, []))
+            gap_minutes = 0
+            if meetings:
+                # Compared with the latest end so far, so a class inside a longer one adds no gap
+                latest_end_minute = meetings[0][1]
+                for start_minute, end_minute in meetings[1:]:
+                    gap_minutes += max(0, start_minute - latest_end_minute)
+                    latest_end_minute = max(latest_end_minute, end_minute)
+            day_gap_minutes.append(gap_minutes)
+        return day_gap_minutes
+
+    @staticmethod
+    def _gap_minutes(sections: tuple) -> int:
+        return sum(ScheduleOptimizer._day_gap_minutes(sections))
+
+    @staticmethod
+    def _day_minutes(section) -> tuple:
+        return tuple(sum(meeting_time.end_time - meeting_time.start_time
+                         for meeting_time in section.class_meetings.get(day, [])) for day in WEEKDAYS)
+
+    def _objectives(self, sections: tuple) -> dict:
+        course_count = len(sections)
+        day_bits = 0
+        for section in sections:
+            day_bits |= self._day_bits(section)
+        return {
+            "gpa": sum(self._section_gpa(section) for section in sections) / course_count / 4.0,
+            "rating": sum(self._section_rating(section) for section in sections) / course_count / 5.0,
+            "days": 1 - bin(day_bits).count("1") / len(WEEKDAYS),
+            "gaps": max(0.0, 1 - self._gap_minutes(sections) / self.max_gap_minutes),
+            "early": sum(0.0 if self._is_early(section) else 1.0 for section in sections) / course_count,
+        }
+
+    def get_top_schedules(self, top_k: int = 10, max_nodes: int = None, time_budget: float = None,
+                          clock=monotonic) -> list:
+        """
+        Args:
+            top_k: int
+                Number of schedules to return
+            max_nodes: int
+                Number of branches to search before giving up (the class's max_nodes by default)
+            time_budget: float
+                Seconds to search before giving up (the class's time_budget by default)
+            clock: Callable[[], float]
+                Clock the time budget is measured with
+        Returns:
+            schedules: list[RankedSchedule]
+                The top_k best scoring conflict-free schedules, best first. If the search ran out of budget
+                (search_complete is False), the best ones found until then.
+        """
+        generator = self.generator
+        self.search_complete = True
+        if not self.courses or top_k <= 0:
+            return []
+        max_nodes = self.max_nodes if max_nodes is None else max_nodes
+        deadline = clock() + (self.time_budget if time_budget is None else time_budget)
+
+        course_candidates = []
+        for course_bits in generator.course_section_bits:
+            candidates = list(ScheduleGenerator._bit_indices(course_bits & self.allowed_bits))
+            if not candidates:
+                return []
+            # Try the best sections first, so good schedules are found early and prune more
+            candidates.sort(key=lambda index: self.section_scores[index], reverse=True)
+            course_candidates.append(candidates)
+
+        course_order = sorted(range(len(self.courses)), key=lambda course: len(course_candidates[course]))
+        # best_remaining[depth] is the best possible section score sum of the courses from depth on
+        best_remaining = [0.0] * (len(course_order) + 1)
+        for depth in range(len(course_order) - 1, -1, -1):
+            best_remaining[depth] = best_remaining[depth + 1] + \
+                self.section_scores[course_candidates[course_order[depth]][0]]
+
+        # remaining_day_minutes[depth][day] is the most class time the courses from depth on can add on a weekday
+        remaining_day_minutes = [(0,) * len(WEEKDAYS)] * (len(course_order) + 1)
+        for depth in range(len(course_order) - 1, -1, -1):
+            course_day_minutes = [self._day_minutes(generator.sections[index])
+                                  for index in course_candidates[course_order[depth]]]
+            remaining_day_minutes[depth] = tuple(
+                later_minutes + max(day_minutes[day_index] for day_minutes in course_day_minutes)
+                for day_index, later_minutes in enumerate(remaining_day_minutes[depth + 1]))
+
+        top_schedules = []  # min heap of (score, tie breaker, RankedSchedule)
+        tie_breaker = count()
+        chosen = [None] * len(self.courses)
+        nodes = 0
+
+        def bound(depth: int, section_score: float, day_bits: int, worst_score: float) -> float:
+            # Days on campus can only grow, and a gap can only shrink by the class time later courses fit into it,
+            # so this never underestimates a schedule
+            score_bound = section_score + best_remaining[depth] + self.weights["gaps"] + \
+                self.weights["days"] * (1 - bin(day_bits).count("1") / len(WEEKDAYS))
+            # Gaps only need bounding if the branch can't be dropped without them
+            if score_bound <= worst_score or not self.weights["gaps"] or depth < 2:
+                return score_bound
+            chosen_sections = [generator.sections[chosen[course]] for course in course_order[:depth]]
+            gap_minutes = sum(max(0, day_gap_minutes - remaining_minutes) for day_gap_minutes, remaining_minutes
+                              in zip(self._day_gap_minutes(chosen_sections), remaining_day_minutes[depth]))
+            return score_bound - self.weights["gaps"] * min(1.0, gap_minutes / self.max_gap_minutes)
+
+        def branch(depth: int, allowed: int, section_score: float, day_bits: int):
+            nonlocal nodes
+            if not self.search_complete:
+                return
+            nodes += 1
+            if nodes > max_nodes or (nodes % 1024 == 0 and clock() >= deadline):
+                self.search_complete = False
+                return
+
+            if len(top_schedules) == top_k and \
+                    bound(depth, section_score, day_bits, top_schedules[0][0]) <= top_schedules[0][0]:
+                return
+
+            if depth == len(course_order):
+                sections = tuple(generator.sections[index] for index in chosen)
+                objectives = self._objectives(sections)
+                score = sum(self.weights[name] * value for name, value in objectives.items())
+                entry = (score, next(tie_breaker), RankedSchedule(score, sections, objectives))
+                if len(top_schedules) < top_k:
+                    heapq.heappush(top_schedules, entry)
+                elif score > top_schedules[0][0]:
+                    heapq.heapreplace(top_schedules, entry)
+                return
+
+            course = course_order[depth]
+            for index in course_candidates[course]:
+                if not allowed >> index & 1:
+                    continue
+                still_allowed = allowed & ~generator.conflict_bits[index]
+                if all(generator.course_section_bits[other_course] & still_allowed
+                       for other_course in course_order[depth + 1:]):
+                    chosen[course] = index
+                    branch(depth + 1, still_allowed, section_score + self.section_scores[index],
+                           day_bits | self._day_bits(generator.sections[index]))
+
+        branch(0, self.allowed_bits, 0.0, 0)
+
+        return [entry[2] for entry in sorted(top_schedules, key=lambda entry: (-entry[0], entry[1]))]
+
+    @staticmethod
+    def from_course_codes(course_codes: list, **kwargs) -> "ScheduleOptimizer":
+        """
+        Args:
+            course_codes: list[str]
+                Course codes of the courses to make schedules of
+            kwargs:
+                Passed on to the ScheduleOptimizer constructor
+        Returns:
+            optimizer: ScheduleOptimizer
+                Optimizer over the complete courses, fetched concurrently
+        """
+        return ScheduleOptimizer(ScheduleGenerator.fetch_courses(course_codes), **kwargs)
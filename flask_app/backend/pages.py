@@ -0,0 +1,174 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from typing import Callable, Union
+
+from flask_app.backend.cache import LRUCache
+from flask_app.backend.courses import APIGet, APIParse, RequestProxy
+
+
+class CoursePages(object):
+    """
+    Pages of the "all courses" page, served from a local list of every course sorted by course code.
+    The list is downloaded once in the background (planetterp_page_size courses per request) and again every
+    course_list_ttl seconds. Until it is ready, pages are fetched from planetterp one at a time. The sections of a
+    page's courses are fetched in one fan out, and whole pages are cached for page_ttl seconds. After a page is
+    served, the pages before and after it are built in the background, so moving to them is instant. Sections are
+    only counted until they are used (see Course.set_section_summary).
+    The course list also rebuilds APIGet.course_index, so course searches are answered locally once it is loaded.
+    """
+    page_size = 30
+    planetterp_page_size = 100
+
+    def __init__(self, max_pages: int = 64, page_ttl: float = 5 * 60, course_list_ttl: float = 24 * 60 * 60,
+                 clock: Callable[[], float] = monotonic):
+        """
+        Args:
+            max_pages: int
+                Number of built pages kept in memory
+            page_ttl: float
+                Seconds a built page (with the open seats of its sections) is served before it is built again
+            course_list_ttl: float
+                Seconds before the list of every course is downloaded again
+            clock: Callable[[], float]
+                Clock used for both times to live
+        """
+        self.course_list_ttl = course_list_ttl
+        self.clock = clock
+        self.pages = LRUCache(max_entries=max_pages, default_ttl=page_ttl, clock=clock)
+        # planetterp responses of every course sorted by course code, or None until downloaded
+        self._courses_raw = None
+        self._course_list_loaded_at = None
+        self._lock = threading.Lock()
+        # Keys of the pages (and "course list") being built in the background, so each is only built once at a time
+        self._pending = set()
+        # Its own threads, so prefetching never takes the fan out pool's threads away from users' requests
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="page-prefetch")
+
+    def load_course_list(self) -> None:
+        """
+        Downloads every course from planetterp and replaces the local course list with them.
+        Raises ConnectionError (and keeps the previous list) if any page fails, so a partial list is never saved.
+        """
+        code_to_course_raw = {}
+        page_num = 1
+        while True:
+            courses_raw = RequestProxy.planetterp_get_courses_by_page(page_num, self.planetterp_page_size)
+            for course_raw in courses_raw:
+                code_to_course_raw[course_raw["department"] + course_raw["course_number"]] = course_raw
+            if len(courses_raw) < self.planetterp_page_size:
+                break
+            page_num += 1
+        if not code_to_course_raw:
+            raise ConnectionError("planetterp sent no courses")
+
+        with self._lock:
+            self._courses_raw = [code_to_course_raw[course_code] for course_code in sorted(code_to_course_raw)]
+            self._course_list_loaded_at = self.clock()
+            # Pages built before may have been fetched from planetterp one at a time, so build them from the list
+            self.pages.clear()
+        APIGet.course_index.build([(course_code, code_to_course_raw[course_code].get("title"))
+                                   for course_code in code_to_course_raw])
+
+    def refresh_course_list(self) -> None:
+        """
+        Downloads the course list in the background if it is missing or older than course_list_ttl.
+        """
+        with self._lock:
+            course_list_is_fresh = self._course_list_loaded_at is not None and \
+                self.clock() - self._course_list_loaded_at < self.course_list_ttl
+        if not course_list_is_fresh:
+            self._build_in_background("course list", self.load_course_list)
+
+    def get_page_count(self) -> Union[int, None]:
+        """
+        Returns:
+            page_count: int
+                Number of pages, or None while the course list is not downloaded yet
+        """
+        with self._lock:
+            if self._courses_raw is None:
+                return None
+            return max(1, -(-len(self._courses_raw) // self.page_size))
+
+    def build_page(self, page_num: int) -> dict:
+        """
+        Args:
+            page_num: int
+                Page number, starting at 1
+        Returns:
+            courses: dict
+                Dictionary of course code to course of the page, in alphabetical order. Courses only carry a
+                summary of their sections until their sections are used.
+        """
+        with self._lock:
+            courses_raw = self._courses_raw
+        if courses_raw is None:
+            return APIGet.get_course_list_by_page_number(page_num)
+
+        start = (page_num - 1) * self.page_size
+        # New course objects, so a page never changes the course list (or another page)
+        courses = [APIParse.planetterp_course_raw_to_course_head(course_raw)
+                   for course_raw in courses_raw[start:start + self.page_size]]
+        APIGet.load_section_summaries_of_courses(courses)
+        return {course.course_code: course for course in courses}
+
+    def _build_in_background(self, key, function: Callable, *args) -> None:
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+
+        def build():
+            try:
+                function(*args)
+            except ConnectionError:
+                pass  # built again when it is asked for
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        self._executor.submit(build)
+
+    def _cache_page(self, page_num: int) -> dict:
+        courses = self.build_page(page_num)
+        # An empty page is likely an API failure, so don't keep it
+        if courses:
+            self.pages.put(page_num, courses)
+        return courses
+
+    def prefetch_page(self, page_num: int) -> None:
+        """
+        Builds a page in the background, unless it is cached or out of range.
+
+        Args:
+            page_num: int
+                Page number, starting at 1
+        """
+        page_count = self.get_page_count()
+        if page_num < 1 or (page_count is not None and page_num > page_count) or page_num in self.pages:
+            return
+        self._build_in_background(page_num, self._cache_page, page_num)
+
+    def get_page(self, page_num: int) -> dict:
+        """
+        Returns a page, building it if it is not cached, and prefetches the pages before and after it.
+        Raises ConnectionError if the page has to be fetched and the APIs cannot be reached.
+
+        Args:
+            page_num: int
+                Page number, starting at 1
+        Returns:
+            courses: dict
+                Dictionary of course code to course (with a summary of its sections) of the page, in alphabetical
+                order
+        """
+        self.refresh_course_list()
+
+        courses = self.pages.get(page_num)
+        if courses is None:
+            courses = self._cache_page(page_num)
+
+        self.prefetch_page(page_num - 1)
+        self.prefetch_page(page_num + 1)
+        return courses
@@ -0,0 +1,172 @@
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from typing import Callable, Tuple, Union
+
+from flask_app.backend.courses import RequestProxy, intern_string
+
+# A professor of the directory, as shown on the all professors page
+ProfessorEntry = namedtuple("ProfessorEntry", ["name", "slug", "rating", "courses"])
+
+
+class ProfessorIndex(object):
+    """
+    Compact, read-only index of professors, sorted by name.
+    Professors are kept as parallel arrays (names, slugs, ratings and course codes), plus a sorted array of
+    (name word, professor) pairs for prefix searches, the professors in order of rating, and the professors who
+    taught in each department. An index never changes once built, so any number of threads can search it.
+    """
+    sorts = ("name", "rating")
+
+    def __init__(self, professors_raw: list):
+        """
+        Args:
+            professors_raw: list[dict]
+                The raw responses of the planetterp professors API (converted from json to dict)
+        """
+        professors_raw = sorted({professor["slug"]: professor for professor in professors_raw}.values(),
+                                key=lambda professor: (professor["name"].lower(), professor["slug"]))
+        self.names = [intern_string(professor["name"]) for professor in professors_raw]
+        self.slugs = [professor["slug"] for professor in professors_raw]
+        # NaN for professors without a rating, so every rating fits in one array of doubles
+        self.ratings = array("d", [math.nan if professor.get("average_rating") is None
+                                   else professor["average_rating"] for professor in professors_raw])
+        self.courses = [tuple(intern_string(course_code) for course_code in professor.get("courses") or ())
+                        for professor in professors_raw]
+
+        self.name_words = sorted((word, index) for index, name in enumerate(self.names)
+                                 for word in set(re.findall("[a-z0-9]+", name.lower())))
+        # Best rated first, then professors without a rating (the sort is stable, so ties stay in name order)
+        self.by_rating = array("I", sorted(range(len(self.names)), key=lambda index: (
+            math.isnan(self.ratings[index]), 0 if math.isnan(self.ratings[index]) else -self.ratings[index])))
+        department_to_indices = {}
+        for index, course_codes in enumerate(self.courses):
+            for department in {self.get_department(course_code) for course_code in course_codes}:
+                department_to_indices.setdefault(department, array("I")).append(index)
+        self.department_to_indices = department_to_indices
+
+    @staticmethod
+    def get_department(course_code: str) -> str:
+        """
+        Args:
+            course_code: str
+                Course code (e.g. CMSC131)
+        Returns:
+            department: str
+                Department of the course (e.g. CMSC)
+        """
+        return re.match("[A-Z]*", course_code.upper()).group()
+
+    def get_entry(self, index: int) -> ProfessorEntry:
+        rating = self.ratings[index]
+        return ProfessorEntry(self.names[index], self.slugs[index], None if math.isnan(rating) else rating,
+                              self.courses[index])
+
+    def search(self, query: str = "", sort: str = "name", department: str = "", offset: int = 0,
+               limit: int = 100) -> Tuple[list, int]:
+        """
+        Args:
+            query: str
+                Prefix of any word of the professors' names (e.g. "sno" finds Jon Snow), or "" for every professor
+            sort: str
+                "name" to sort alphabetically, or "rating" to put the best rated professors first
+            department: str
+                Department (e.g. CMSC) the professors must have taught a course of, or "" for every department
+            offset: int
+                Number of matching professors to skip
+            limit: int
+                Maximum number of professors to return
+        Returns:
+            (professors, match_count): Tuple(list[ProfessorEntry], int)
+                The matching professors from offset on, and the number of matching professors
+        """
+        query = query.strip().lower()
+        department = department.strip().upper()
+        matches = None
+        if query:
+            matches = set()
+            index = bisect_left(self.name_words, (query, -1))
+            while index < len(self.name_words) and self.name_words[index][0].startswith(query):
+                matches.add(self.name_words[index][1])
+                index += 1
+        if department:
+            department_matches = self.department_to_indices.get(department, ())
+            matches = set(department_matches) if matches is None else matches.intersection(department_matches)
+
+        order = self.by_rating if sort == "rating" else range(len(self.names))
+        if matches is None:
+            indices = order[offset:offset + limit]
+            match_count = len(self.names)
+        else:
+            indices = [index for index in order if index in matches][offset:offset + limit]
+            match_count = len(matches)
+        return [self.get_entry(index) for index in indices], match_count
+
+    def __len__(self):
+        return len(self.names)
+
+
+class ProfessorDirectory(object):
+    """
+    Every professor on planetterp, kept in a ProfessorIndex so the all professors page is searched, sorted and
+    filtered without asking planetterp anything.
+    The directory is downloaded in the background when first used and again every ttl seconds. Searches keep using
+    the previous index while a new one is downloaded.
+    """
+
+    def __init__(self, ttl: float = 24 * 60 * 60, clock: Callable[[], float] = monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.index = None
+        self.loaded_at = None
+        self._loading = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="professor-directory")
+
+    def load(self) -> None:
+        """
+        Downloads every professor from planetterp (100 per request) and replaces the index with them.
+        Raises ConnectionError (and keeps the previous index) if any page fails, so a partial index is never used.
+        """
+        professors_raw = []
+        page_num = 1
+        while True:
+            professors_page = RequestProxy.planetterp_get_professors_by_page(page_num)
+            professors_raw += professors_page
+            if len(professors_page) < 100:
+                break
+            page_num += 1
+        if not professors_raw:
+            raise ConnectionError("planetterp sent no professors")
+
+        index = ProfessorIndex(professors_raw)
+        with self._lock:
+            self.index = index
+            self.loaded_at = self.clock()
+
+    def _load_in_background(self) -> None:
+        try:
+            self.load()
+        except ConnectionError:
+            pass  # loaded again on the next search
+        finally:
+            with self._lock:
+                self._loading = False
+
+    def get_index(self) -> Union[ProfessorIndex, None]:
+        """
+        Returns:
+            index: ProfessorIndex
+                The current index, or None until the first download is done. Starts a download in the background
+                if the index is missing or older than ttl.
+        """
+        with self._lock:
+            if not self._loading and (self.loaded_at is None or self.clock() - self.loaded_at >= self.ttl):
+                self._loading = True
+                self._executor.submit(self._load_in_background)
+            return self.index
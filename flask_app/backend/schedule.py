@@ -1,4 +1,5 @@
 from flask_app.backend.courses import Course, Section, CourseList
+from flask_app.backend.conflicts import ConflictEngine
 
 
 class MySchedule(object):
@@ -19,6 +20,8 @@ class MySchedule(object):
         self.total_credits = 0
         self.courses_list = []
         self.sections_list = []
+        # bitmasks of the minutes taken on each day, kept in sync with self.schedule
+        self.conflict_engine = ConflictEngine()
 
         self.warnings_list = []
 
@@ -31,25 +34,7 @@ class MySchedule(object):
             can_add: bool
                 Whether the class can be added.
         """
-        for day, class_meeting in class_to_add.class_meetings.items():
-            for class_time in class_meeting:
-                class_to_add_start_time = class_time.start_time
-                class_to_add_end_time = class_time.end_time
-                for class_index in range(len(self.schedule[day])):
-                    single_class = self.schedule[day][class_index]
-                    if single_class.start_time > class_to_add_start_time:  # try to add our class right before this
-                        if class_to_add_end_time >= single_class.start_time:  # can't add this specific class slot
-                            return False
-                        if class_index > 0 and \
-                                self.schedule[day][class_index - 1].end_time >= \
-                                class_to_add_start_time:  # class right in front of one we want to add overlaps
-                            return False
-                        break
-                    elif class_index == len(self.schedule[day]) - 1:  # if we are at end
-                        if class_to_add_start_time <= single_class.end_time:
-                            return False
-                        break
-        return True
+        return not self.conflict_engine.has_conflict(class_to_add)
 
     def add_course(self, course_to_add: Course) -> str:
         """
@@ -116,19 +101,9 @@ class MySchedule(object):
         if section_to_add.open_seats <= 0:
             self.warnings_list.append(MySchedule.ScheduleWarning([section_to_add], "section full"))
 
-        for day, class_meetings in section_to_add.class_meetings.items():
-            for class_time_to_add in class_meetings:
-                if len(self.schedule[day]) == 0:
-                    self.schedule[day].append(class_time_to_add)
-                else:
-                    for class_index in range(len(self.schedule[day])):
-                        if self.schedule[day][class_index].start_time > class_time_to_add.start_time:  # add before
-                            self.schedule[day].insert(class_index, class_time_to_add)
-                            break
-                        elif class_index == len(self.schedule[day]) - 1 and \
-                                self.schedule[day][class_index].start_time <= class_time_to_add.start_time:
-                            #  made it to end of list without adding class yet, so add the class at the end of day
-                            self.schedule[day].append(class_time_to_add)
+        # Insert each meeting after the meetings of that day that start at the same time or earlier
+        for day, class_index, class_time_to_add in self.conflict_engine.add_section(section_to_add):
+            self.schedule[day].insert(class_index, class_time_to_add)
         self.sections_list.append(section_to_add)
 
         # If the course wasn't already in the course list, add it now.
@@ -156,6 +131,7 @@ class MySchedule(object):
             self.schedule[day] = new_day_list
 
         if class_previously_in_schedule:
+            self.conflict_engine.remove_section(section_to_remove)
             for index in range(len(self.sections_list)):
                 section_obj = self.sections_list[index]
                 if section_obj.section_id == section_to_remove.section_id:
@@ -208,6 +184,7 @@ class MySchedule(object):
             self.schedule[day] = new_day_list
 
         if class_previously_in_schedule:
+            self.conflict_engine.remove_section(section_to_remove)
             for index in range(len(self.sections_list)):
                 section_obj = self.sections_list[index]
                 if section_obj.section_id == section_to_remove.section_id:
@@ -234,6 +211,7 @@ class MySchedule(object):
         self.total_credits = 0
         self.sections_list = []
         self.courses_list = []
+        self.conflict_engine.clear()
         self.warnings_list = []
 
     def get_schedule_average_gpa(self) -> float:
@@ -0,0 +1,113 @@
+import re
+import threading
+from bisect import bisect_left, insort
+
+
+class CourseIndex(object):
+    """
+    In-process prefix index over course codes and the words of course titles, kept as sorted arrays
+    so that prefix searches are a binary search followed by a short scan.
+    Courses can be added one at a time, so a new course code never forces a full rebuild.
+    """
+
+    def __init__(self):
+        self._course_codes = []  # sorted course codes
+        self._title_words = []  # sorted (lowercase title word, course code) pairs
+        self._course_code_to_title = {}
+        self._lock = threading.Lock()
+        # Only a complete index (built from a whole catalog) can answer searches on its own
+        self.complete = False
+
+    @staticmethod
+    def _words(title: str) -> set:
+        return set(re.findall("[a-z0-9]+", title.lower()))
+
+    def add(self, course_code: str, title: str) -> None:
+        """
+        Adds a course to the index, or updates its title if it is already present.
+
+        Args:
+            course_code: str
+                Course code (e.g. CMSC131)
+            title: str
+                Title of the course (e.g. Object-Oriented Programming I)
+        """
+        course_code = course_code.upper()
+        title = title or ""
+        with self._lock:
+            old_title = self._course_code_to_title.get(course_code)
+            if old_title == title:
+                return
+
+            if old_title is None:
+                insort(self._course_codes, course_code)
+            else:
+                for word in self._words(old_title):
+                    del self._title_words[bisect_left(self._title_words, (word, course_code))]
+
+            for word in self._words(title):
+                insort(self._title_words, (word, course_code))
+            self._course_code_to_title[course_code] = title
+
+    def build(self, courses: list) -> None:
+        """
+        Replaces the contents of the index with a whole catalog and marks it complete.
+
+        Args:
+            courses: list[tuple]
+                (course code, title) pairs of every course in the catalog
+        """
+        course_code_to_title = {course_code.upper(): title or "" for course_code, title in courses}
+        course_codes = sorted(course_code_to_title)
+        title_words = sorted((word, course_code) for course_code, title in course_code_to_title.items()
+                             for word in self._words(title))
+
+        with self._lock:
+            self._course_codes = course_codes
+            self._title_words = title_words
+            self._course_code_to_title = course_code_to_title
+            self.complete = True
+
+    def search(self, query: str, limit: int = 30) -> list:
+        """
+        Args:
+            query: str
+                Prefix of a course code (e.g. CMSC13) or of a word in a course title (e.g. calc)
+            limit: int
+                Maximum number of course codes to return
+        Returns:
+            course_codes: list[str]
+                Codes of matching courses. Course code matches come first, in alphabetical order,
+                followed by title matches.
+        """
+        code_prefix = query.strip().upper()
+        word_prefix = query.strip().lower()
+        if not code_prefix:
+            return []
+
+        with self._lock:
+            matches = []
+            index = bisect_left(self._course_codes, code_prefix)
+            while index < len(self._course_codes) and len(matches) < limit and \
+                    self._course_codes[index].startswith(code_prefix):
+                matches.append(self._course_codes[index])
+                index += 1
+
+            index = bisect_left(self._title_words, (word_prefix, ""))
+            while index < len(self._title_words) and len(matches) < limit and \
+                    self._title_words[index][0].startswith(word_prefix):
+                course_code = self._title_words[index][1]
+                if course_code not in matches:
+                    matches.append(course_code)
+                index += 1
+
+        return matches
+
+    def get_title(self, course_code: str) -> str:
+        return self._course_code_to_title.get(course_code.upper())
+
+    def __len__(self):
+        return len(self._course_codes)
+
+    def __contains__(self, course_code):
+        return course_code.upper() in self._course_code_to_title
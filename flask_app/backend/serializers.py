@@ -0,0 +1,112 @@
+from flask_app.backend.courses import Course, MeetingTime, Section
+from flask_app.backend.schedule import MySchedule
+
+
+class JSONSerializer(object):
+    """
+    Static class which turns backend objects into plain dicts and lists for the JSON API.
+    Each function only includes what the frontend displays for that object, so API responses stay small.
+    """
+
+    @staticmethod
+    def meeting_time_to_json(meeting_time: MeetingTime) -> dict:
+        """
+        Args:
+            meeting_time: MeetingTime
+                Meeting time to serialize
+        Returns:
+            meeting_time_json: dict
+                Section id, formatted and minute start and end times, building and room of the meeting time
+        """
+        return {
+            "section_id": meeting_time.section_id,
+            "start_time": meeting_time.formatted_start_time,
+            "end_time": meeting_time.formatted_end_time,
+            "start_minute": meeting_time.start_time,
+            "end_minute": meeting_time.end_time,
+            "building": meeting_time.building,
+            "room": meeting_time.room,
+        }
+
+    @staticmethod
+    def section_to_json(section: Section) -> dict:
+        """
+        Args:
+            section: Section
+                Section to serialize
+        Returns:
+            section_json: dict
+                Section id, seats, professors and weekly schedule of the section
+        """
+        return {
+            "section_id": section.section_id,
+            "course_code": section.course_code,
+            "total_seats": section.total_seats,
+            "open_seats": section.open_seats,
+            "professors": list(section.professor_name_list),
+            "is_synchronous": section.is_synchronous,
+            "weekly_schedule": section.get_formatted_weekly_schedule(),
+        }
+
+    @staticmethod
+    def course_head_to_json(course: Course) -> dict:
+        """
+        Args:
+            course: Course
+                Course to serialize, without its sections (e.g. a search result)
+        Returns:
+            course_json: dict
+                Course code, name, credits, average GPA and gen eds of the course
+        """
+        return {
+            "course_code": course.course_code,
+            "name": course.name,
+            "credits": course.credits,
+            "avg_gpa": course.avg_gpa,
+            "gen_eds": course.gen_eds,
+        }
+
+    @staticmethod
+    def course_to_json(course: Course) -> dict:
+        """
+        Args:
+            course: Course
+                Complete course to serialize, with its sections
+        Returns:
+            course_json: dict
+                The course head, plus its professors (best rated first) with their rating, average GPA in the
+                course and section ids, and every section
+        """
+        course_json = JSONSerializer.course_head_to_json(course)
+        course_json["professors"] = [{
+            "name": professor,
+            "rating": course.professor_to_rating.get(professor),
+            "avg_gpa": course.professor_to_avg_course_gpa.get(professor),
+            "section_ids": [section.section_id for section in sections],
+        } for professor, sections in course.professor_to_sections.items()]
+        course_json["sections"] = [JSONSerializer.section_to_json(section) for section in course.sections.values()]
+        return course_json
+
+    @staticmethod
+    def schedule_to_json(schedule: MySchedule) -> dict:
+        """
+        Args:
+            schedule: MySchedule
+                Schedule to serialize
+        Returns:
+            schedule_json: dict
+                Meetings of each day (in order, with the color of their course), courses, credits, average GPA
+                and warnings of the schedule
+        """
+        return {
+            "days": {day: [dict(JSONSerializer.meeting_time_to_json(meeting_time),
+                                color=schedule.get_course_color(meeting_time.course))
+                           for meeting_time in meeting_times]
+                     for day, meeting_times in schedule.schedule.items()},
+            "courses": [dict(JSONSerializer.course_head_to_json(course), color=schedule.get_course_color(course))
+                        for course in schedule.courses_list],
+            "section_ids": [section.section_id for section in schedule.sections_list],
+            "total_credits": schedule.total_credits,
+            "avg_gpa": schedule.get_schedule_average_gpa(),
+            "warnings": [warning.warning_text for warning in schedule.warnings_list],
+        }
@@ -0,0 +1,342 @@
+import json
+import secrets
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import count
+from time import time
+from typing import Callable, Union
+
+from flask_app.backend.cache import LRUCache
+from flask_app.backend.courses import APIGet, Course
+from flask_app.backend.schedule import MySchedule
+
+
+class SessionStore(ABC):
+    """
+    Server-side storage of each user's session data, which is a dict of:
+        schedule: MySchedule
+            The user's schedule
+        courses_to_display: list[Course]
+            Courses listed by the user's last search
+        expanded_course_to_display: Course
+            Course whose sections the user is viewing (or None)
+        unresolved_course_codes: list[str]
+            Courses of the schedule that could not be fetched when the session was loaded (e.g. while the APIs were
+            down), kept so they are back in the schedule once they can be fetched again
+        unresolved_section_ids: list[str]
+            Sections of those courses
+    Subclasses decide where the data lives. Use SessionStore.create to make the store named in the app config.
+
+    Session ids are random tokens, so they can't be guessed and no two threads or workers ever make the same one.
+    Requests of the same session should hold lock(session_id) while they load, change and save its data.
+    """
+
+    def __init__(self):
+        # session id -> [lock, number of threads holding or waiting for it]
+        self._session_locks = {}
+        self._session_locks_lock = threading.Lock()
+
+    @staticmethod
+    def new_session_id() -> str:
+        """
+        Returns:
+            session_id: str
+                A new random, url safe session id
+        """
+        return secrets.token_urlsafe(16)
+
+    @contextmanager
+    def lock(self, session_id: str):
+        """
+        Holds the lock of a session, so the requests of one user change its data one at a time.
+        Only threads of this process are excluded, so a user's requests should always reach the same worker
+        (or only one at a time) when the store is shared between workers.
+
+        Args:
+            session_id: str
+                Id of the session to lock
+        """
+        with self._session_locks_lock:
+            session_lock = self._session_locks.setdefault(session_id, [threading.Lock(), 0])
+            session_lock[1] += 1
+        try:
+            with session_lock[0]:
+                yield
+        finally:
+            with self._session_locks_lock:
+                session_lock[1] -= 1
+                # Forget the lock once nobody uses it, so there is never more than one per active request
+                if session_lock[1] == 0:
+                    del self._session_locks[session_id]
+
+    @abstractmethod
+    def new_session(self) -> str:
+        """
+        Returns:
+            session_id: str
+                Id of a new session, holding empty session data
+        """
+
+    @abstractmethod
+    def get(self, session_id: str) -> Union[dict, None]:
+        """
+        Args:
+            session_id: str
+                Id of the session to load
+        Returns:
+            session_data: dict
+                The session's data, or None if the session does not exist or expired
+        """
+
+    @abstractmethod
+    def put(self, session_id: str, session_data: dict) -> None:
+        """
+        Args:
+            session_id: str
+                Id of the session to store
+            session_data: dict
+                The session's data
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """
+        Args:
+            session_id: str
+                Id of the session to forget
+        """
+
+    @staticmethod
+    def new_session_data() -> dict:
+        """
+        Returns:
+            session_data: dict
+                Data of a session that has not done anything yet
+        """
+        return {
+            "schedule": MySchedule(),
+            "courses_to_display": [],
+            "expanded_course_to_display": None,
+            "unresolved_course_codes": [],
+            "unresolved_section_ids": [],
+        }
+
+    @staticmethod
+    def create(backend: str, path: str = None, max_sessions: int = 10000, ttl: float = 7 * 24 * 60 * 60) \
+            -> "SessionStore":
+        """
+        Args:
+            backend: str
+                "memory" to keep sessions in this process, or "sqlite" to share them between every worker
+            path: str
+                Path of the sqlite database (only used by the sqlite backend)
+            max_sessions: int
+                Maximum number of sessions kept in memory (by the sqlite backend, loaded sessions kept by each
+                worker)
+            ttl: float
+                Seconds a session is kept after it was last saved
+        Returns:
+            store: SessionStore
+                The session store
+        """
+        if backend == "memory":
+            return MemorySessionStore(max_sessions=max_sessions, ttl=ttl)
+        if backend == "sqlite":
+            return SQLiteSessionStore(path or "sessions.db", ttl=ttl, max_loaded_sessions=max_sessions)
+        raise ValueError("Unknown session store backend " + repr(backend))
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Keeps the session data of the most recently used sessions in this process, as live objects.
+    Once max_sessions is reached the least recently used session is evicted, and sessions expire ttl seconds
+    after they were last saved. Sessions are not shared between worker processes.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl: float = 7 * 24 * 60 * 60,
+                 clock: Callable[[], float] = time):
+        super().__init__()
+        self.sessions = LRUCache(max_entries=max_sessions, default_ttl=ttl, clock=clock)
+
+    def new_session(self) -> str:
+        session_id = self.new_session_id()
+        self.put(session_id, self.new_session_data())
+        return session_id
+
+    def get(self, session_id: str) -> Union[dict, None]:
+        return self.sessions.get(session_id)
+
+    def put(self, session_id: str, session_data: dict) -> None:
+        self.sessions.put(session_id, session_data)
+
+    def delete(self, session_id: str) -> None:
+        self.sessions.invalidate(session_id)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Keeps session data in a SQLite database, so every worker process sees the same sessions.
+    Session data is stored compactly by SessionSerializer (course codes and section ids rather than objects), and
+    expired sessions are deleted every purge_interval saves.
+
+    Loading a session fetches its courses again, so each worker also keeps the session data it last saved, up to
+    max_loaded_sessions of them. Every save gives the session a new random version, and the kept data is used as
+    long as the stored version is still the one this worker saved (no other worker changed the session since).
+    """
+    schema = """
+        CREATE TABLE IF NOT EXISTS user_sessions (session_id TEXT PRIMARY KEY, payload TEXT, expires_at REAL,
+                                                  version TEXT);
+        CREATE INDEX IF NOT EXISTS user_sessions_expires_at ON user_sessions (expires_at);
+    """
+    purge_interval = 1000
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 60 * 60, max_loaded_sessions: int = 10000,
+                 clock: Callable[[], float] = time):
+        super().__init__()
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self._local = threading.local()
+        self._saves = count(1)
+        # session id -> (version, session data) of the sessions this worker saved
+        self.loaded_sessions = LRUCache(max_entries=max_loaded_sessions, default_ttl=ttl, clock=clock)
+        with self.connection() as connection:
+            connection.executescript(self.schema)
+            # Databases made before sessions had versions
+            if "version" not in [column[1] for column in connection.execute("PRAGMA table_info(user_sessions)")]:
+                connection.execute("ALTER TABLE user_sessions ADD COLUMN version TEXT")
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Returns:
+            connection: sqlite3.Connection
+                Connection to the database for the current thread (sqlite connections can't be shared)
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Other workers may be writing, so wait for their lock instead of failing straight away
+            connection = sqlite3.connect(self.path, timeout=10)
+            self._local.connection = connection
+        return connection
+
+    def new_session(self) -> str:
+        session_id = self.new_session_id()
+        session_data = self.new_session_data()
+        version = secrets.token_hex(8)
+        with self.connection() as connection:
+            # A plain insert, so a (practically impossible) repeated id fails instead of taking over a session
+            connection.execute("INSERT INTO user_sessions (session_id, payload, expires_at, version) "
+                               "VALUES (?, ?, ?, ?)",
+                               (session_id, SessionSerializer.dumps(session_data), self.clock() + self.ttl, version))
+        self.loaded_sessions.put(session_id, (version, session_data))
+        return session_id
+
+    def get(self, session_id: str) -> Union[dict, None]:
+        row = self.connection().execute("SELECT payload, version FROM user_sessions "
+                                        "WHERE session_id = ? AND expires_at > ?",
+                                        (session_id, self.clock())).fetchone()
+        # The caller changes the data it gets, so it is only kept again once put saves it
+        loaded_session = self.loaded_sessions.get(session_id)
+        self.loaded_sessions.invalidate(session_id)
+        if row is None:
+            return None
+        # Sessions with courses that couldn't be fetched are loaded again, to try fetching them
+        if loaded_session is not None and loaded_session[0] == row[1] and \
+                not loaded_session[1]["unresolved_course_codes"]:
+            return loaded_session[1]
+        return SessionSerializer.loads(row[0])
+
+    def put(self, session_id: str, session_data: dict) -> None:
+        version = secrets.token_hex(8)
+        with self.connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO user_sessions (session_id, payload, expires_at, version) "
+                               "VALUES (?, ?, ?, ?)",
+                               (session_id, SessionSerializer.dumps(session_data), self.clock() + self.ttl, version))
+            if next(self._saves) % self.purge_interval == 0:
+                connection.execute("DELETE FROM user_sessions WHERE expires_at <= ?", (self.clock(),))
+        self.loaded_sessions.put(session_id, (version, session_data))
+
+    def delete(self, session_id: str) -> None:
+        self.loaded_sessions.invalidate(session_id)
+        with self.connection() as connection:
+            connection.execute("DELETE FROM user_sessions WHERE session_id = ?", (session_id,))
+
+
+class SessionSerializer(object):
+    """
+    Turns session data into compact json and back. Only what can't be fetched again is stored: the course codes
+    and section ids of the schedule, the few fields of the search results that are displayed, and the course code
+    of the expanded course. Complete courses are fetched again (usually from the response cache) when loading, which
+    SQLiteSessionStore only does when another worker changed the session.
+    """
+
+    @staticmethod
+    def dumps(session_data: dict) -> str:
+        """
+        Args:
+            session_data: dict
+                Session data, as described in SessionStore
+        Returns:
+            payload: str
+                Compact json of the session data
+        """
+        schedule = session_data["schedule"]
+        expanded_course = session_data["expanded_course_to_display"]
+        return json.dumps({
+            "courses": list(dict.fromkeys([course.course_code for course in schedule.courses_list] +
+                                          session_data.get("unresolved_course_codes", []))),
+            "sections": list(dict.fromkeys([section.section_id for section in schedule.sections_list] +
+                                           session_data.get("unresolved_section_ids", []))),
+            "display": [[course.course_code, course.name, course.credits, course.avg_gpa, course.gen_eds]
+                        for course in session_data["courses_to_display"]],
+            "expanded": expanded_course.course_code if expanded_course else None,
+        }, separators=(",", ":"))
+
+    @staticmethod
+    def _get_complete_course_or_none(course_code: str) -> Union[Course, None]:
+        try:
+            return APIGet.get_complete_course_by_course_code(course_code)
+        except ConnectionError:
+            return None
+
+    @staticmethod
+    def loads(payload: str) -> dict:
+        """
+        Args:
+            payload: str
+                Json made by dumps
+        Returns:
+            session_data: dict
+                The session data, with the schedule's courses fetched again. Courses that can't be fetched right
+                now are left out of the schedule, but kept (with their sections) in unresolved_course_codes and
+                unresolved_section_ids, so saving the session doesn't lose them.
+        """
+        compact_data = json.loads(payload)
+        course_codes = compact_data["courses"]
+        if compact_data["expanded"] and compact_data["expanded"] not in course_codes:
+            course_codes = course_codes + [compact_data["expanded"]]
+        courses = APIGet.fan_out([(SessionSerializer._get_complete_course_or_none, (course_code,))
+                                  for course_code in course_codes])
+        code_to_course = {course.course_code: course for course in courses if course is not None}
+
+        session_data = SessionStore.new_session_data()
+        schedule = session_data["schedule"]
+        for course_code in compact_data["courses"]:
+            if course_code in code_to_course:
+                schedule.add_course(code_to_course[course_code])
+            else:
+                session_data["unresolved_course_codes"].append(course_code)
+        for section_id in compact_data["sections"]:
+            schedule.add_registered_course_section_by_id(section_id)
+            # A section missing from the fetched courses may be one of a course that couldn't be fetched
+            if session_data["unresolved_course_codes"] and \
+                    all(section.section_id != section_id for section in schedule.sections_list):
+                session_data["unresolved_section_ids"].append(section_id)
+
+        session_data["courses_to_display"] = [
+            Course(course_code, name, course_credits, {}, {}, {}, avg_gpa, gen_eds)
+            for course_code, name, course_credits, avg_gpa, gen_eds in compact_data["display"]]
+        session_data["expanded_course_to_display"] = code_to_course.get(compact_data["expanded"])
+        return session_data
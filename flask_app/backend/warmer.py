@@ -0,0 +1,157 @@
+import threading
+from collections import Counter
+from time import monotonic, time
+from typing import Iterable
+
+from flask_app.backend.courses import APIGet, RequestProxy
+
+
+class CatalogWarmer(object):
+    """
+    Background worker which keeps popular courses in the response cache, so users opening them do not wait for the
+    upstream APIs.
+    The hot courses are the configured course codes, followed by the courses users open most (counted in
+    course_views). Every interval seconds the worker refreshes each hot course once. Refreshes are spread evenly
+    over the interval (and at most max_refreshes_per_second are started), so the APIs never get every request at
+    once.
+    """
+
+    def __init__(self, course_codes: Iterable[str] = (), max_learned_courses: int = 20, interval: float = 55,
+                 max_refreshes_per_second: float = 1):
+        """
+        Args:
+            course_codes: Iterable[str]
+                Course codes to always keep warm
+            max_learned_courses: int
+                Number of the courses users open most that are kept warm as well
+            interval: float
+                Seconds between refreshes of the same course, which should be less than the time to live of the
+                responses to keep (e.g. 60 seconds for sections)
+            max_refreshes_per_second: float
+                Maximum number of courses refreshed per second
+        """
+        self.course_codes = [course_code.strip().upper() for course_code in course_codes if course_code.strip()]
+        self.max_learned_courses = max_learned_courses
+        self.interval = interval
+        self.max_refreshes_per_second = max_refreshes_per_second
+        # Course code -> number of times users opened it
+        self.course_views = Counter()
+
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh_at = None
+        self.last_round_seconds = None
+        self.queue_depth = 0
+        # Course code -> error of its last refresh, for courses whose last refresh failed
+        self.failing_courses = {}
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get_hot_course_codes(self) -> list:
+        """
+        Returns:
+            course_codes: list[str]
+                Configured course codes, then the max_learned_courses courses opened most, without duplicates
+        """
+        # Copied first, since request threads keep counting while most_common iterates
+        learned_course_codes = [course_code for course_code, _
+                                in self.course_views.copy().most_common(self.max_learned_courses)]
+        return list(dict.fromkeys(self.course_codes + learned_course_codes))
+
+    def refresh_course(self, course_code: str) -> bool:
+        """
+        Fetches a course again from the APIs (see RequestProxy.force_refresh), which restarts the time to live of
+        its cached responses. Only the responses that would expire before the course's next refresh are fetched
+        (e.g. its sections), the rest (e.g. grades, cached for a day) are left in the cache.
+
+        Args:
+            course_code: str
+                Course code of the course to refresh
+        Returns:
+            refreshed: bool
+                Whether the course could be fetched
+        """
+        try:
+            # Twice the interval, since a round can start late
+            with RequestProxy.force_refresh(expiring_within=2 * self.interval):
+                APIGet.get_complete_course_by_course_code(course_code)
+        except Exception as e:
+            # Whatever went wrong (e.g. an API is down), the warmer keeps running and tries again next round
+            with self._lock:
+                self.failures += 1
+                self.failing_courses[course_code] = repr(e)
+            return False
+
+        with self._lock:
+            self.refreshes += 1
+            self.last_refresh_at = time()
+            self.failing_courses.pop(course_code, None)
+        return True
+
+    def run_round(self) -> None:
+        """
+        Refreshes every hot course once, spreading the refreshes over interval seconds.
+        Returns early when the warmer is stopped.
+        """
+        course_codes = self.get_hot_course_codes()
+        if not course_codes:
+            return
+        spacing = max(self.interval / len(course_codes), 1 / self.max_refreshes_per_second)
+
+        round_start = monotonic()
+        for index, course_code in enumerate(course_codes):
+            self.queue_depth = len(course_codes) - index
+            if self._stop.wait(max(0.0, round_start + index * spacing - monotonic())):
+                break
+            self.refresh_course(course_code)
+        self.queue_depth = 0
+        self.last_round_seconds = monotonic() - round_start
+
+    def run(self) -> None:
+        """
+        Runs rounds every interval seconds until the warmer is stopped.
+        """
+        while not self._stop.is_set():
+            round_start = monotonic()
+            self.run_round()
+            self._stop.wait(max(0.0, round_start + self.interval - monotonic()))
+
+    def start(self) -> None:
+        """
+        Starts the warmer on its own daemon thread (not the fan out pool, which serves users' requests).
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="catalog-warmer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        """
+        Stops the warmer after its current refresh, waiting at most timeout seconds for it.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def status(self) -> dict:
+        """
+        Returns:
+            status: dict
+                Whether the warmer runs, its hot courses, how many courses are left in the current round, when a
+                course was last refreshed (unix time) and the refreshes and failures so far
+        """
+        with self._lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "interval": self.interval,
+                "hot_courses": self.get_hot_course_codes(),
+                "queue_depth": self.queue_depth,
+                "last_refresh_at": self.last_refresh_at,
+                "last_round_seconds": self.last_round_seconds,
+                "refreshes": self.refreshes,
+                "failures": self.failures,
+                "failing_courses": dict(self.failing_courses),
+            }
@@ -1,6 +1,6 @@
 from flask_wtf import FlaskForm
-from wtforms import StringField, SubmitField
-from wtforms.validators import InputRequired
+from wtforms import StringField, SubmitField, FloatField, IntegerField, BooleanField
+from wtforms.validators import InputRequired, NumberRange, Optional
 
 
 class SearchForm(FlaskForm):
@@ -87,3 +87,19 @@ class GenEdSearchForm(FlaskForm):
     """
     department_id = StringField("Department ID")
     search_by_gened = SubmitField("Search for Gen Eds")
+
+
+class OptimizeScheduleForm(FlaskForm):
+    """
+    Form to find the best schedules of a list of courses, according to how much the user cares about each objective
+    """
+    course_codes = StringField("Course Codes", validators=[InputRequired()])
+    required_sections = StringField("Required Sections")
+    gpa_weight = FloatField("Average GPA", default=1, validators=[Optional(), NumberRange(min=0)])
+    rating_weight = FloatField("Professor Rating", default=1, validators=[Optional(), NumberRange(min=0)])
+    days_weight = FloatField("Fewer Days On Campus", default=1, validators=[Optional(), NumberRange(min=0)])
+    gaps_weight = FloatField("Less Time Between Classes", default=1, validators=[Optional(), NumberRange(min=0)])
+    early_weight = FloatField("No Early Mornings", default=1, validators=[Optional(), NumberRange(min=0)])
+    open_seats_only = BooleanField("Open Seats Only")
+    top_k = IntegerField("Number of Schedules", default=10, validators=[Optional(), NumberRange(min=1, max=50)])
+    optimize = SubmitField("Find Schedules")
@@ -1,6 +1,8 @@
 import pytest
 
 from flask_app.app import create_app
+from flask_app.backend.courses import APIGet, RequestProxy
+from flask_app.backend.search import CourseIndex
 
 
 @pytest.fixture
@@ -19,6 +21,10 @@ def app(request):
 
     def teardown():
         ctx.pop()
+        # Finish background downloads, and forget the search index they may have built
+        app.extensions["course_pages"]._executor.shutdown(wait=True)
+        app.extensions["professor_directory"]._executor.shutdown(wait=True)
+        APIGet.course_index = CourseIndex()
 
     request.addfinalizer(teardown)
 
@@ -31,3 +37,14 @@ def client(app):
     Creates a test client
     """
     return app.test_client()
+
+
+@pytest.fixture
+def emulated_api():
+    """
+    Answer every API call with the sample responses of RequestProxy
+    """
+    RequestProxy.test_mode = True
+    RequestProxy.bad_request = False
+    yield
+    RequestProxy.test_mode = False
@@ -1,4 +1,9 @@
+from unittest import mock
+
 import pytest
+from flask_wtf.csrf import generate_csrf
+
+from flask_app.backend.courses import APIGet, RequestProxy
 
 
 def test_index_returns_200(client):
@@ -31,4 +36,178 @@ def test_professor_detail_returns_404_if_no_professor(client):
 
 def test_tutorial_returns_200(client):
     resp = client.get("/tutorial")
-    assert resp.status_code == 200
\ No newline at end of file
+    assert resp.status_code == 200
+
+
+def test_optimize_returns_200(client):
+    resp = client.get("/optimize")
+    assert resp.status_code == 200
+
+
+def test_optimize_lists_ranked_schedules(client, emulated_api):
+    resp = client.post("/optimize", data={"course_codes": "MATH140", "gpa_weight": 1, "top_k": 5,
+                                          "optimize": "Find Schedules"})
+    assert resp.status_code == 200
+    assert b"Schedule 1" in resp.data
+    assert b"ENGL101-0101" in resp.data  # the one section of the emulated API
+
+
+def test_index_keeps_schedule_in_session_store(app, client, emulated_api):
+    client.post("/", data={"add_course": "Add MATH140"})
+    resp = client.get("/")
+    assert resp.status_code == 200
+    with client.session_transaction() as session:
+        session_id = session["session_id"]
+    schedule = app.extensions["session_store"].get(session_id)["schedule"]
+    assert [course.course_code for course in schedule.courses_list] == ["MATH140"]
+
+
+def test_api_add_section_returns_updated_schedule(client, emulated_api):
+    resp = client.post("/api/schedule/sections", json={"section_id": "engl101-0101"})
+    assert resp.status_code == 200
+    assert resp.json["message"] == "ENGL101-0101 added."
+    assert resp.json["schedule"]["section_ids"] == ["ENGL101-0101"]
+    assert [meeting["start_time"] for meeting in resp.json["schedule"]["days"]["M"]] == ["9:00AM"]
+    assert client.get("/api/schedule").json["schedule"]["total_credits"] == 3
+
+
+def test_api_add_section_needs_json_body(client, emulated_api):
+    assert client.post("/api/schedule/sections", data={"section_id": "ENGL101-0101"}).status_code == 400
+    assert client.post("/api/schedule/sections", json={"section_id": "ENGL101"}).status_code == 400
+    assert client.post("/api/schedule/sections", json={"section_id": "ENGL101-9999"}).status_code == 404
+
+
+def test_api_remove_section(client, emulated_api):
+    assert client.delete("/api/schedule/sections/ENGL101-0101").status_code == 404
+    client.post("/api/schedule/sections", json={"section_id": "ENGL101-0101"})
+    resp = client.delete("/api/schedule/sections/ENGL101-0101")
+    assert resp.json["message"] == "ENGL101-0101 removed."
+    assert resp.json["schedule"]["section_ids"] == []
+
+
+def test_api_add_course(client, emulated_api):
+    resp = client.post("/api/schedule/courses", json={"course_code": "math140"})
+    assert resp.json["message"] == "MATH140 added."
+    assert [course["course_code"] for course in resp.json["schedule"]["courses"]] == ["MATH140"]
+    assert client.post("/api/schedule/courses", json={}).status_code == 400
+
+
+def test_api_search_returns_only_course_heads(client, emulated_api):
+    resp = client.get("/api/search?q=cmsc")
+    assert resp.status_code == 200
+    assert set(resp.json) == {"courses"}
+    assert all("sections" not in course for course in resp.json["courses"])
+    assert client.get("/api/search").status_code == 400
+
+
+def test_api_search_uses_course_list_once_downloaded(app, client, emulated_api):
+    client.get("/api/search?q=calc")
+    app.extensions["course_pages"]._executor.shutdown(wait=True)
+    assert APIGet.course_index.complete
+    resp = client.get("/api/search?q=calc")
+    assert [course["course_code"] for course in resp.json["courses"]] == ["MATH140"]
+
+
+def test_api_view_sections(client, emulated_api):
+    resp = client.get("/api/courses/MATH140/sections")
+    assert resp.json["course"]["course_code"] == "MATH140"
+    assert [section["section_id"] for section in resp.json["course"]["sections"]] == ["ENGL101-0101"]
+    assert resp.json["course"]["professors"][0]["section_ids"] == ["ENGL101-0101"]
+
+
+def test_api_serialize_and_load_schedule(client, emulated_api):
+    client.post("/api/schedule/sections", json={"section_id": "ENGL101-0101"})
+    assert client.get("/api/schedule/serialized").json == {"serialized_schedule": "ENGL101-0101"}
+    # The emulated API numbers its one section 0, so loading finds no section 0101
+    resp = client.post("/api/schedule/serialized", json={"serialized_schedule": "ENGL101-0101"})
+    assert "0101 is not a valid section number for ENGL101" in resp.json["schedule"]["warnings"]
+    assert client.post("/api/schedule/serialized", json={}).status_code == 400
+
+
+def test_course_sections_fragment_is_shared_between_sessions(app, client, emulated_api):
+    resp = client.post("/", data={"view_course": "View MATH140 sections"})
+    assert b'value="Add ENGL101-0101"' in resp.data
+    fragment_cache = app.extensions["fragment_cache"]
+    assert len(fragment_cache) == 1
+
+    other_resp = app.test_client().post("/", data={"view_course": "View MATH140 sections"})
+    assert b'value="Add ENGL101-0101"' in other_resp.data
+    assert len(fragment_cache) == 1
+    assert fragment_cache.stats()["hits"] == 1
+
+
+def test_course_sections_fragment_gets_users_csrf_token(app, emulated_api):
+    course = APIGet.get_complete_course_by_course_code("MATH140")
+    app.config["WTF_CSRF_ENABLED"] = True
+    render_course_sections = app.jinja_env.globals["render_course_sections"]
+    with app.test_request_context("/"):
+        html = render_course_sections(course)
+        assert 'name="csrf_token" type="hidden" value="' + generate_csrf() + '"' in html
+        assert "csrf token field" not in html
+
+
+def test_all_courses_page_from_course_list(app, client, emulated_api):
+    app.extensions["course_pages"].load_course_list()
+    resp = client.get("/all_courses/1")
+    assert resp.status_code == 200
+    assert b"MATH140" in resp.data
+    assert b">Next<" not in resp.data and b">Previous<" not in resp.data
+
+    assert client.get("/all_courses/2").status_code == 404
+    assert client.get("/all_courses/0").status_code == 404
+
+
+def test_all_courses_shows_error_when_apis_are_down(app, client):
+    with mock.patch.object(app.extensions["course_pages"], "get_page",
+                           side_effect=ConnectionError("Error retrieving the list of courses")):
+        resp = client.get("/all_courses/1")
+    assert resp.status_code == 200
+    assert b"Error retrieving the list of courses" in resp.data
+
+
+def test_all_professors_searches_professor_directory(app, client, emulated_api):
+    app.extensions["professor_directory"].load()
+    resp = client.get("/all_professors/1?q=sno&sort=rating&dept=math")
+    assert resp.status_code == 200
+    assert b"Jon Snow" in resp.data and b"MATH140" in resp.data
+
+    resp = client.get("/all_professors/1?q=stark")
+    assert resp.status_code == 200
+    assert b"Jon Snow" not in resp.data
+
+
+def test_all_professors_shows_error_when_planetterp_is_down(app, client):
+    with mock.patch.object(app.extensions["professor_directory"], "get_index", return_value=None), \
+            mock.patch.object(RequestProxy, "planetterp_get_professors_by_page",
+                              side_effect=ConnectionError("Error retrieving the list of professors")):
+        resp = client.get("/all_professors/1")
+    assert resp.status_code == 200
+    assert b"Error retrieving the list of professors" in resp.data
+
+
+def test_admin_warmer_is_not_found_unless_enabled(client):
+    assert client.get("/admin/warmer").status_code == 404
+
+
+def test_admin_warmer_reports_disabled_warmer(app, client):
+    app.config['ADMIN_ENDPOINTS'] = True
+    resp = client.get("/admin/warmer")
+    assert resp.status_code == 200
+    assert resp.get_json() == {"enabled": False}
+
+
+def test_metrics_counts_requests(client):
+    client.get("/tutorial")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/plain"
+    assert b'schedule_builder_requests_total{endpoint="tutorial",method="GET",status="200"}' in resp.data
+    assert b'schedule_builder_span_duration_seconds_count{category="render",name="tutorial.html"}' in resp.data
+
+
+def test_metrics_counts_failing_requests(client):
+    with mock.patch.object(APIGet, "get_professor_by_name", side_effect=ConnectionError("planetterp is down")):
+        with pytest.raises(ConnectionError):
+            client.get("/professor/Jon%20Snow/snow")
+    resp = client.get("/metrics")
+    assert b'schedule_builder_requests_total{endpoint="professor_detail",method="GET",status="500"}' in resp.data
@@ -0,0 +1,93 @@
+import unittest
+from flask_app.backend.cache import LRUCache, ResponseCache
+from flask_app.backend.courses import RequestProxy
+
+
+class FakeClock(object):
+    """
+    Clock that only moves forward when told to, so expiry can be tested without sleeping
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class LRUCacheTest(unittest.TestCase):
+    """
+    Tests for the bounded LRU cache with expiring entries
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = LRUCache(max_entries=2, default_ttl=10, clock=self.clock)
+
+    def test_get_missing_key_counts_miss(self):
+        self.assertIsNone(self.cache.get("CMSC131"))
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_get_stored_key_counts_hit(self):
+        self.cache.put("CMSC131", "Object-Oriented Programming I")
+        self.assertEqual(self.cache.get("CMSC131"), "Object-Oriented Programming I")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_entry_expires_after_ttl(self):
+        self.cache.put("CMSC131", "Object-Oriented Programming I", ttl=5)
+        self.clock.now = 4.9
+        self.assertIn("CMSC131", self.cache)
+        self.clock.now = 5
+        self.assertIsNone(self.cache.get("CMSC131"))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.put("CMSC131", 1)
+        self.cache.put("CMSC132", 2)
+        self.cache.get("CMSC131")  # CMSC132 is now the least recently used
+        self.cache.put("CMSC216", 3)
+        self.assertIn("CMSC131", self.cache)
+        self.assertNotIn("CMSC132", self.cache)
+        self.assertIn("CMSC216", self.cache)
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_clear_resets_entries_and_counters(self):
+        self.cache.put("CMSC131", 1)
+        self.cache.get("CMSC131")
+        self.cache.clear()
+        self.assertEqual(self.cache.stats(), {"size": 0, "max_entries": 2, "hits": 0, "misses": 0, "evictions": 0})
+
+
+class ResponseCacheTest(unittest.TestCase):
+    """
+    Tests for the upstream response cache and its use by RequestProxy
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(endpoint_ttls={"umdio_sections": 30, "planetterp_grades": 600}, clock=self.clock)
+
+    def test_key_ignores_param_order(self):
+        self.cache.put_response("umdio_courses", "url", {"dept_id": "ENGL", "gen_ed": "FSPW"}, ["ENGL101"])
+        self.assertEqual(self.cache.get_response("umdio_courses", "url", {"gen_ed": "FSPW", "dept_id": "ENGL"}),
+                         ["ENGL101"])
+
+    def test_endpoints_have_separate_ttls(self):
+        self.cache.put_response("umdio_sections", "url", {}, ["section"])
+        self.cache.put_response("planetterp_grades", "url", {}, ["grade"])
+        self.clock.now = 60
+        self.assertIsNone(self.cache.get_response("umdio_sections", "url", {}))
+        self.assertEqual(self.cache.get_response("planetterp_grades", "url", {}), ["grade"])
+
+    def test_request_proxy_answers_from_cache(self):
+        course = {"department": "CMSC", "course_number": "131", "title": "Object-Oriented Programming I",
+                  "credits": 4, "average_gpa": 2.9}
+        old_cache = RequestProxy.cache
+        RequestProxy.cache = self.cache
+        try:
+            self.cache.put_response("planetterp_course", "https://api.planetterp.com/v1/course",
+                                    {"name": "CMSC131"}, course)
+            self.assertEqual(RequestProxy.planetterp_get_course_by_course_code("CMSC131"), course)
+            self.assertEqual(self.cache.stats()["hits"], 1)
+        finally:
+            RequestProxy.cache = old_cache
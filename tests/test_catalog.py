@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+from flask_app.backend.catalog import CatalogSnapshot
+from flask_app.backend.courses import APIGet, CourseList, RequestProxy
+from flask_app.backend.search import CourseIndex
+
+
+class CatalogSnapshotTest(unittest.TestCase):
+    """
+    Tests answering RequestProxy calls from an offline catalog snapshot built from the test data
+    """
+
+    def setUp(self):
+        self.snapshot_dir = tempfile.TemporaryDirectory()
+        self.snapshot = CatalogSnapshot(os.path.join(self.snapshot_dir.name, "catalog.db"))
+
+        umdio_courses = json.load(open(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/tests/data_for_tests.json"))
+        self.snapshot.add_umdio_courses(umdio_courses)
+        self.snapshot.add_planetterp_courses([{"department": course["dept_id"],
+                                               "course_number": course["course_id"][4:],
+                                               "title": course["name"],
+                                               "credits": int(course["credits"]),
+                                               "average_gpa": 3.0} for course in umdio_courses])
+        self.snapshot.add_grades("CMSC250", [{"course": "CMSC250", "professor": "Jon Snow", "semester": "202008",
+                                              "section": "0101", "A+": 0, "A": 2, "A-": 0, "B+": 0, "B": 2,
+                                              "B-": 0, "C+": 0, "C": 0, "C-": 0, "D+": 0, "D": 0, "D-": 0,
+                                              "F": 0, "W": 0, "Other": 0}])
+        self.snapshot.add_professors([{"name": "Jon Snow", "slug": "snow", "type": "professor",
+                                       "courses": ["CMSC250"], "average_rating": 4.125}])
+        RequestProxy.snapshot = self.snapshot
+
+    def tearDown(self):
+        RequestProxy.snapshot = None
+        APIGet.course_index = CourseIndex()
+        self.snapshot.connection().close()
+        self.snapshot_dir.cleanup()
+
+    def test_complete_course_is_answered_from_snapshot(self):
+        cmsc250 = CourseList.get_course_using_course_code("CMSC250")
+        self.assertEqual(cmsc250.course_code, "CMSC250")
+        self.assertEqual(len(cmsc250.sections), 21)
+        self.assertEqual(cmsc250.professor_to_avg_course_gpa, {"Jon Snow": 3.5})
+
+    def test_unknown_course_raises_connection_error(self):
+        with self.assertRaises(ConnectionError):
+            CourseList.get_course_using_course_code("CMSC999")
+
+    def test_search_matches_course_code_prefix(self):
+        course_heads = APIGet.get_course_heads_by_query("c")
+        self.assertEqual([course.course_code for course in course_heads], ["CHEM271", "CMSC250", "COMM107"])
+
+    def test_search_answered_by_course_index_built_from_snapshot(self):
+        APIGet.course_index.build(self.snapshot.get_course_titles())
+        self.assertEqual([course.course_code for course in APIGet.get_course_heads_by_query("discrete")],
+                         ["CMSC250"])
+
+    def test_gen_ed_search_uses_gen_ed_index(self):
+        courses = APIGet.get_course_list_by_gen_ed("ANTH", "DSSP")
+        self.assertEqual([course.course_code for course in courses], ["ANTH221"])
+        self.assertEqual(courses[0].avg_gpa, 3.0)
+        self.assertEqual(APIGet.get_course_list_by_gen_ed("CMSC", "DSSP"), [])
+
+    def test_professor_is_answered_from_snapshot(self):
+        professor = APIGet.get_professor_by_name("Jon Snow", get_reviews="true")
+        self.assertEqual(professor.average_rating, 4.125)
+        self.assertEqual(professor.reviews, [])
+
+    def test_search_matches_wildcards_literally(self):
+        self.assertEqual(APIGet.get_course_codes_by_query("%"), [])
+        self.assertEqual(APIGet.get_course_codes_by_query("C_SC"), [])
+        self.assertEqual(APIGet.get_course_codes_by_query("\\"), [])
+        self.assertEqual(APIGet.get_course_codes_by_query("CMSC"), ["CMSC250"])
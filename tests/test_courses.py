@@ -1,10 +1,42 @@
+import random
+import time
 import unittest
-from flask_app.backend.courses import CourseList, APIGet, RequestProxy, Course
+from unittest import mock
+from flask_app.backend.courses import CourseList, APIGet, APIParse, RequestProxy, Course, MeetingTime, Section
 from tests.utils import TestUtils
 
 test_util_instance = TestUtils()
 
 
+def loop_grade_distribution_to_gpa(grades_raw: list) -> dict:
+    """
+    Reference implementation of APIParse.planetterp_raw_grade_distribution_to_gpa, one row at a time
+    """
+    weights = {"A+": 4, "A": 4, "A-": 3.7, "B+": 3.3, "B": 3, "B-": 2.7, "C+": 2.3, "C": 2, "C-": 1.7, "D+": 1.3,
+               "D": 1, "D-": .7, "F": 0, "W": 0}
+    professor_to_quality_points = {}
+    professor_to_total_grade_entries = {}
+    for semester_grade in grades_raw:
+        professor = semester_grade["professor"]
+        professor_to_quality_points.setdefault(professor, 0.0)
+        professor_to_total_grade_entries.setdefault(professor, 0)
+        for grade, weight in weights.items():
+            professor_to_quality_points[professor] += weight * semester_grade[grade]
+            professor_to_total_grade_entries[professor] += semester_grade[grade]
+    return {professor: quality_points / professor_to_total_grade_entries[professor]
+            for professor, quality_points in professor_to_quality_points.items()}
+
+
+def make_random_grade_rows(rng: random.Random, row_count: int) -> list:
+    """
+    Random planetterp grade rows of a few professors (including None, for rows with no known professor)
+    """
+    grades = ["A+", "A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D+", "D", "D-", "F", "W", "Other"]
+    return [dict({grade: rng.randint(0, 40) for grade in grades}, course="MATH140", semester="201908",
+                 professor=rng.choice(["Jon Snow", "Tyrion Lannister", "Arya Stark", None]), section="0101")
+            for _ in range(row_count)]
+
+
 class CourseListTest(unittest.TestCase):
     """
     Test functions in the CourseList class, which is primarily responsible for
@@ -44,6 +76,31 @@ class CourseListTest(unittest.TestCase):
         courses = CourseList.get_courses_using_page_number(10)
         self.assertEqual(len(courses), 1)
 
+    def test_course_pages_only_carry_section_summaries(self):
+        RequestProxy.bad_request = False
+        course = CourseList.get_courses_using_page_number(1)["MATH140"]
+        self.assertFalse(course.sections_loaded)
+        self.assertEqual((course.section_count, course.open_seats_total), (1, 0))
+
+        self.assertEqual([section.section_id for section in course.sections.values()], ["ENGL101-0101"])
+        self.assertTrue(course.sections_loaded)
+        self.assertEqual(list(course.professor_to_sections), ["string"])
+
+    def test_lazy_sections_are_loaded_once_when_first_used(self):
+        RequestProxy.bad_request = False
+        loaded_courses = []
+
+        def load_sections(course: Course) -> tuple:
+            loaded_courses.append(course.course_code)
+            return APIGet.get_sections_list_by_course(course)
+
+        course = Course("MATH140", "Calculus I", 4, None, None, {}, 3.0)
+        course.set_section_summary(1, 0, load_sections)
+        self.assertEqual(loaded_courses, [])
+        self.assertEqual(len(course.professor_to_sections), 1)
+        self.assertEqual(len(course.sections), 1)
+        self.assertEqual(loaded_courses, ["MATH140"])
+
     def test_get_courses_using_invalid_page_number(self):
         RequestProxy.bad_request = True
         courses = CourseList.get_courses_using_page_number(100000)
@@ -63,6 +120,11 @@ class CourseTest(unittest.TestCase):
                          cmsc250.get_formatted_weekly_schedule())
         self.assertEqual({'4:30pm-5:45pm': 'MW'}, comm107.get_formatted_weekly_schedule())
 
+    def test_weekly_schedule_is_formatted_once_in_meeting_order(self):
+        cmsc250 = test_util_instance.courses["CMSC250"].sections["0307"]
+        self.assertEqual(cmsc250.weekly_schedule, (('8:00am-8:50am', 'MW'), ('3:30pm-4:45pm', 'TuTh')))
+        self.assertEqual(Section.make_weekly_schedule({"M": [], "Tu": []}), ())
+
     def test_meeting_time_not_equal_to_non_meeting_time_object(self):
         cmsc250 = test_util_instance.courses["CMSC250"].sections["0307"]
         meeting_times_dict = cmsc250.class_meetings
@@ -92,6 +154,28 @@ class CourseTest(unittest.TestCase):
         meeting_times_cmsc250_dict = cmsc250.class_meetings
         self.assertEqual(hash(meeting_times_cmsc250_dict["M"][0]), hash(meeting_times_cmsc250_dict["M"][0]))
 
+    def test_meeting_times_are_stored_as_minutes_since_midnight(self):
+        meeting_time = test_util_instance.courses["CMSC250"].sections["0307"].class_meetings["Tu"][0]
+        self.assertEqual((meeting_time.start_time, meeting_time.end_time), (15 * 60 + 30, 16 * 60 + 45))
+        self.assertEqual((meeting_time.formatted_start_time, meeting_time.formatted_end_time), ("3:30pm", "4:45pm"))
+
+    def test_parse_minutes_matches_strptime_format(self):
+        self.assertEqual(MeetingTime.parse_minutes("12:00AM"), 0)
+        self.assertEqual(MeetingTime.parse_minutes("12:30pm"), 12 * 60 + 30)
+        self.assertEqual(MeetingTime.parse_minutes("9:05am"), 9 * 60 + 5)
+        self.assertEqual(MeetingTime.parse_minutes("11:59PM"), 23 * 60 + 59)
+        for bad_time in ["13:00pm", "9:60am", "9:00", "nine:00am", ""]:
+            with self.assertRaises(ValueError):
+                MeetingTime.parse_minutes(bad_time)
+
+    def test_sections_share_interned_strings_and_have_no_instance_dict(self):
+        sections = list(test_util_instance.courses["CMSC250"].sections.values())
+        self.assertFalse(hasattr(sections[0], "__dict__"))
+        self.assertFalse(hasattr(sections[0].course, "__dict__"))
+        self.assertIs(sections[0].professor_name_list[0], sections[1].professor_name_list[0])
+        meeting_times = [meeting_time for section in sections for meeting_time in section.class_meetings["M"]]
+        self.assertIs(meeting_times[0].building, meeting_times[1].building)
+
     def test_course_correct_professor_rating_static_method(self):
         rating = Course.get_professor_average_rating("Erin Callahan")
         self.assertEqual(5.0, rating)
@@ -153,3 +237,74 @@ class APIGetAndParseTest(unittest.TestCase):
         courses = APIGet.get_course_list_by_gen_ed("ENGL", "FSPW")
         self.assertEqual(len(courses), 0)
 
+
+    def test_fan_out_returns_results_in_call_order(self):
+        results = APIGet.fan_out([(time.sleep, (0.05,)), (str.upper, ("cmsc131",)), (len, ("MATH140",))])
+        self.assertEqual(results, [None, "CMSC131", 7])
+
+    def test_fan_out_raises_first_exception_in_call_order(self):
+        def raise_error(message):
+            raise ConnectionError(message)
+
+        with self.assertRaises(ConnectionError) as context:
+            APIGet.fan_out([(str.upper, ("cmsc131",)), (raise_error, ("first",)), (raise_error, ("second",))])
+        self.assertEqual(str(context.exception), "first")
+
+    def test_fan_out_runs_calls_concurrently(self):
+        start = time.perf_counter()
+        APIGet.fan_out([(time.sleep, (0.2,)) for _ in range(4)])
+        self.assertLess(time.perf_counter() - start, 0.6)
+
+    def test_complete_course_combines_concurrent_responses(self):
+        RequestProxy.bad_request = False
+        course = APIGet.get_complete_course_by_course_code("MATH140")
+        self.assertEqual(course.course_code, "MATH140")
+        self.assertEqual(list(course.sections.keys()), [0])
+        self.assertEqual(list(course.professor_to_avg_course_gpa.keys()), ["Jon Snow"])
+
+    def test_complete_course_stores_professor_ratings(self):
+        RequestProxy.bad_request = False
+        course = APIGet.get_complete_course_by_course_code("MATH140")
+        self.assertEqual(course.professor_to_rating, {"string": 4.125})
+
+    def test_sorting_professors_reuses_stored_ratings(self):
+        course = Course("MATH140", "Calculus I", 4, {}, {"Jon Snow": [], "Tyrion Lannister": []}, {})
+        course.professor_to_rating = {"Jon Snow": 3.0, "Tyrion Lannister": 4.5}
+        RequestProxy.bad_request = True  # any rating request would now fail and give None
+        course.set_sorted_professors_by_rating()
+        self.assertEqual(list(course.professor_to_sections.keys()), ["Tyrion Lannister", "Jon Snow"])
+        self.assertEqual(course.professor_to_rating, {"Jon Snow": 3.0, "Tyrion Lannister": 4.5})
+
+    def test_course_heads_by_course_codes_deduplicates_and_keeps_order(self):
+        RequestProxy.bad_request = False
+        old_get_course = RequestProxy.planetterp_get_course_by_course_code
+        requested_codes = []
+
+        def get_course(course_code):
+            requested_codes.append(course_code)
+            course_raw = dict(old_get_course(course_code))
+            course_raw["department"], course_raw["course_number"] = course_code[:4], course_code[4:]
+            return course_raw
+
+        with mock.patch.object(RequestProxy, "planetterp_get_course_by_course_code", get_course):
+            course_heads = APIGet.get_course_heads_by_course_codes(["CMSC250", "MATH140", "CMSC250", "COMM107"])
+
+        self.assertEqual([course.course_code for course in course_heads], ["CMSC250", "MATH140", "COMM107"])
+        self.assertEqual(sorted(requested_codes), ["CMSC250", "COMM107", "MATH140"])
+
+    def test_grade_distribution_gpa_matches_row_by_row_loop(self):
+        rng = random.Random(140)
+        for row_count in [1, 2, 10, 2000]:
+            grades_raw = make_random_grade_rows(rng, row_count)
+            expected = loop_grade_distribution_to_gpa(grades_raw)
+            actual = APIParse.planetterp_raw_grade_distribution_to_gpa(grades_raw)
+            self.assertEqual(list(actual.keys()), list(expected.keys()))
+            for professor, gpa in expected.items():
+                self.assertAlmostEqual(actual[professor], gpa, places=12)
+
+    def test_grade_distribution_gpa_of_professor_without_graded_entries_is_none(self):
+        grade_row = {grade: 0 for grade in APIParse.gpa_grades}
+        grades_raw = [dict(grade_row, professor="Jon Snow", Other=3), dict(grade_row, professor="Arya Stark", B=1)]
+        self.assertEqual(APIParse.planetterp_raw_grade_distribution_to_gpa(grades_raw),
+                         {"Jon Snow": None, "Arya Stark": 3.0})
+        self.assertEqual(APIParse.planetterp_raw_grade_distribution_to_gpa([]), {})
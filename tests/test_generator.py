@@ -0,0 +1,48 @@
+import itertools
+import unittest
+from flask_app.backend.courses import Course
+from flask_app.backend.generator import ScheduleGenerator
+from flask_app.backend.schedule import MySchedule
+from tests.utils import TestUtils
+
+test_util_instance = TestUtils()
+
+
+def fits_in_schedule(sections: tuple) -> bool:
+    schedule = MySchedule()
+    for section in sections:
+        if not schedule.check_section_no_time_conflicts(section):
+            return False
+        schedule.add_section(section)
+    return True
+
+
+class ScheduleGeneratorTest(unittest.TestCase):
+    """
+    Tests enumerating conflict-free section combinations of several courses
+    """
+
+    def setUp(self):
+        self.courses = [test_util_instance.courses["CMSC250"], test_util_instance.courses["CHEM271"],
+                        test_util_instance.courses["ANTH221"]]
+
+    def test_generates_exactly_the_conflict_free_combinations(self):
+        expected = {combination for combination in
+                    itertools.product(*[course.sections.values() for course in self.courses])
+                    if fits_in_schedule(combination)}
+        generated = list(ScheduleGenerator(self.courses).iter_schedules(max_results=None))
+        self.assertEqual(len(generated), len(set(generated)))
+        self.assertEqual(set(generated), expected)
+        self.assertGreater(len(generated), 0)
+
+    def test_sections_are_in_course_order(self):
+        for schedule in ScheduleGenerator(self.courses).iter_schedules(max_results=20):
+            self.assertEqual([section.course_code for section in schedule], ["CMSC250", "CHEM271", "ANTH221"])
+
+    def test_max_results_caps_generated_schedules(self):
+        self.assertEqual(len(list(ScheduleGenerator(self.courses).iter_schedules(max_results=5))), 5)
+
+    def test_course_without_sections_gives_no_schedules(self):
+        no_sections = Course("TEST100", "Test", 3, {}, {}, {})
+        self.assertEqual(list(ScheduleGenerator(self.courses + [no_sections]).iter_schedules()), [])
+
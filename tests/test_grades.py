@@ -0,0 +1,174 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+from flask_app.backend.courses import APIGet, APIParse, RequestProxy
+from flask_app.backend.grades import GradeStore
+from tests.test_courses import make_random_grade_rows
+
+
+class FakePlanetterpGrades(object):
+    """
+    Stands in for RequestProxy.planetterp_get_grades_by_course_code, answering from a list of grade rows and
+    recording the semester of every request
+    """
+
+    def __init__(self, grades_raw: list):
+        self.grades_raw = grades_raw
+        self.requested_semesters = []
+
+    def __call__(self, course_code: str, semester: str = None) -> list:
+        self.requested_semesters.append(semester)
+        return [grade for grade in self.grades_raw if semester is None or grade["semester"] == semester]
+
+
+def make_semester_grade_rows(rng: random.Random, semesters: list) -> list:
+    """
+    Random grade rows of a few professors in each of the semesters
+    """
+    return [dict(row, semester=semester) for semester in semesters for row in make_random_grade_rows(rng, 20)]
+
+
+class GradeStoreTest(unittest.TestCase):
+    """
+    Tests the persistent grade totals, with planetterp replaced by a fake that only knows some semesters
+    """
+
+    def setUp(self):
+        self.database_dir = tempfile.TemporaryDirectory()
+        self.today = date(2021, 3, 1)
+        self.store = GradeStore(os.path.join(self.database_dir.name, "grades.db"), today=lambda: self.today)
+        self.rng = random.Random(19)
+        self.grades_raw = make_semester_grade_rows(self.rng, ["201908", "201912", "202001", "202008", "202101"])
+
+    def tearDown(self):
+        self.store.connection().close()
+        self.database_dir.cleanup()
+
+    def get_gpas(self, fake_grades: FakePlanetterpGrades) -> dict:
+        with mock.patch.object(RequestProxy, "planetterp_get_grades_by_course_code", fake_grades):
+            return self.store.get_professor_to_avg_course_gpa("math140")
+
+    def assertGpasEqual(self, first: dict, second: dict):
+        self.assertEqual(first.keys(), second.keys())
+        for professor, gpa in first.items():
+            self.assertAlmostEqual(gpa, second[professor], places=12)
+
+    def test_semesters_after_stop_at_today(self):
+        self.assertEqual(self.store.get_semesters_after("202005"), ["202008", "202012", "202101"])
+        self.assertEqual(self.store.get_semesters_after("202101"), [])
+
+    def test_first_request_fetches_whole_history(self):
+        fake_grades = FakePlanetterpGrades(self.grades_raw)
+        gpas = self.get_gpas(fake_grades)
+
+        self.assertEqual(fake_grades.requested_semesters, [None])
+        self.assertGpasEqual(gpas, APIParse.planetterp_raw_grade_distribution_to_gpa(self.grades_raw))
+        self.assertIn(None, gpas)
+
+    def test_later_requests_only_fetch_new_semesters(self):
+        self.get_gpas(FakePlanetterpGrades(self.grades_raw))
+
+        # A new semester starts and gets its grades
+        self.today = date(2021, 6, 1)
+        grades_raw = self.grades_raw + make_semester_grade_rows(self.rng, ["202105"])
+        fake_grades = FakePlanetterpGrades(grades_raw)
+        gpas = self.get_gpas(fake_grades)
+
+        self.assertEqual(fake_grades.requested_semesters, ["202105"])
+        self.assertGpasEqual(gpas, APIParse.planetterp_raw_grade_distribution_to_gpa(grades_raw))
+
+        # Nothing new: the latest semester is already stored
+        fake_grades = FakePlanetterpGrades(grades_raw)
+        self.assertGpasEqual(self.get_gpas(fake_grades), gpas)
+        self.assertEqual(fake_grades.requested_semesters, [])
+
+    def test_semesters_without_grades_are_tried_again_for_a_year(self):
+        self.get_gpas(FakePlanetterpGrades(self.grades_raw))
+
+        self.today = date(2021, 9, 1)
+        fake_grades = FakePlanetterpGrades(self.grades_raw)
+        self.get_gpas(fake_grades)
+        self.assertEqual(fake_grades.requested_semesters, ["202105", "202108"])
+
+        # Grades of 202105 were published later, and are still picked up
+        grades_raw = self.grades_raw + make_semester_grade_rows(self.rng, ["202105"])
+        fake_grades = FakePlanetterpGrades(grades_raw)
+        gpas = self.get_gpas(fake_grades)
+        self.assertEqual(fake_grades.requested_semesters, ["202105", "202108"])
+        self.assertGpasEqual(gpas, APIParse.planetterp_raw_grade_distribution_to_gpa(grades_raw))
+
+        # Over a year later, too many semesters are missing, so the whole history is fetched again
+        self.today = date(2023, 1, 1)
+        fake_grades = FakePlanetterpGrades(grades_raw)
+        self.get_gpas(fake_grades)
+        self.assertEqual(fake_grades.requested_semesters, [None])
+
+        # Semesters that started over a year ago are not asked for anymore
+        self.today = date(2023, 2, 1)
+        fake_grades = FakePlanetterpGrades(grades_raw)
+        self.get_gpas(fake_grades)
+        self.assertEqual(fake_grades.requested_semesters, ["202205", "202208", "202212", "202301"])
+
+    def test_no_semester_after_latest_stored_is_skipped(self):
+        self.get_gpas(FakePlanetterpGrades(self.grades_raw))
+
+        # 202105 started over a year ago, but it was never fetched, so its grades are still picked up
+        self.today = date(2022, 6, 1)
+        grades_raw = self.grades_raw + make_semester_grade_rows(self.rng, ["202105"])
+        fake_grades = FakePlanetterpGrades(grades_raw)
+        gpas = self.get_gpas(fake_grades)
+        self.assertEqual(fake_grades.requested_semesters, [None])
+        self.assertGpasEqual(gpas, APIParse.planetterp_raw_grade_distribution_to_gpa(grades_raw))
+
+    def test_failed_semester_is_tried_again_before_later_ones(self):
+        self.get_gpas(FakePlanetterpGrades(self.grades_raw))
+        grades_raw = self.grades_raw + make_semester_grade_rows(self.rng, ["202105", "202108"])
+
+        def fail_202105(course_code: str, semester: str = None):
+            if semester == "202105":
+                raise ConnectionError("planetterp is down")
+            return FakePlanetterpGrades(grades_raw)(course_code, semester)
+
+        self.today = date(2022, 2, 1)
+        self.get_gpas(fail_202105)
+        fake_grades = FakePlanetterpGrades(grades_raw)
+        gpas = self.get_gpas(fake_grades)
+        self.assertEqual(fake_grades.requested_semesters, ["202105", "202108", "202112", "202201"])
+        self.assertGpasEqual(gpas, APIParse.planetterp_raw_grade_distribution_to_gpa(grades_raw))
+
+    def test_merging_the_same_grades_twice_changes_nothing(self):
+        gpas = self.get_gpas(FakePlanetterpGrades(self.grades_raw))
+        self.store.merge_grades("MATH140", self.grades_raw)
+        self.assertEqual(self.get_gpas(FakePlanetterpGrades(self.grades_raw)), gpas)
+
+    def test_failed_new_semester_keeps_stored_totals(self):
+        gpas = self.get_gpas(FakePlanetterpGrades(self.grades_raw))
+
+        def fail(course_code: str, semester: str = None):
+            raise ConnectionError("planetterp is down")
+
+        self.today = date(2021, 6, 1)
+        self.assertEqual(self.get_gpas(fail), gpas)
+
+    def test_complete_course_uses_grade_store(self):
+        RequestProxy.test_mode = True
+        RequestProxy.bad_request = False
+        fake_grades = FakePlanetterpGrades(self.grades_raw)
+        try:
+            with mock.patch.object(APIGet, "grade_store", self.store), \
+                    mock.patch.object(RequestProxy, "planetterp_get_grades_by_course_code", fake_grades):
+                course = APIGet.get_complete_course_by_course_code("MATH140")
+                APIGet.get_complete_course_by_course_code("MATH140")
+        finally:
+            RequestProxy.test_mode = False
+
+        self.assertEqual(fake_grades.requested_semesters, [None])
+        self.assertGpasEqual(course.professor_to_avg_course_gpa,
+                             APIParse.planetterp_raw_grade_distribution_to_gpa(self.grades_raw))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from flask_app.backend.cache import ResponseCache
+from flask_app.backend.courses import RequestProxy
+from flask_app.backend.http_client import CircuitBreaker, HTTPClient
+from tests.test_cache import FakeClock
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    """
+    Answers every GET with the next (status code, delay) the test queued for its path, then with 200
+    """
+    protocol_version = "HTTP/1.1"  # needed for keep-alive
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            server.client_ports.add(self.client_address[1])
+            queued = server.responses.get(self.path.split("?")[0], [])
+            status_code, delay = queued.pop(0) if queued else (200, 0)
+        time.sleep(delay)
+
+        body = json.dumps({"path": self.path}).encode()
+        try:
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass  # the client gave up waiting
+
+    def log_message(self, *args):
+        pass
+
+
+class HTTPClientTest(unittest.TestCase):
+    """
+    Tests the shared HTTP client against a stub API server running on localhost
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPIHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.request_count = 0
+        self.server.client_ports = set()
+        self.server.responses = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:" + str(self.server.server_port)
+        self.clock = FakeClock()
+        self.client = HTTPClient(max_retries=2, backoff_factor=0, connect_timeout=1, read_timeout=0.5,
+                                 failure_threshold=2, reset_timeout=30, clock=self.clock)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_is_kept_alive_between_requests(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(self.url + "/v1/course").status_code, 200)
+        self.assertEqual(self.server.request_count, 5)
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_server_errors_and_rate_limits_are_retried(self):
+        self.server.responses["/v1/course"] = [(503, 0), (429, 0)]
+        response = self.client.get(self.url + "/v1/course", params={"name": "CMSC131"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"path": "/v1/course?name=CMSC131"})
+        self.assertEqual(self.server.request_count, 3)
+
+    def test_error_status_is_returned_once_retries_run_out(self):
+        self.server.responses["/v1/course"] = [(500, 0)] * 3
+        self.assertEqual(self.client.get(self.url + "/v1/course").status_code, 500)
+        self.assertEqual(self.server.request_count, 3)
+
+    def test_client_errors_are_not_retried(self):
+        self.server.responses["/v1/course"] = [(404, 0)]
+        self.assertEqual(self.client.get(self.url + "/v1/course").status_code, 404)
+        self.assertEqual(self.server.request_count, 1)
+
+    def test_slow_response_raises_connection_error(self):
+        self.client.max_retries = 0
+        self.server.responses["/v1/course"] = [(200, 1.5)]
+        with self.assertRaises(ConnectionError):
+            self.client.get(self.url + "/v1/course")
+
+    def test_circuit_opens_after_repeated_failures_and_closes_after_trial(self):
+        self.server.responses["/v1/course"] = [(503, 0)] * 6
+        self.client.get(self.url + "/v1/course")
+        self.client.get(self.url + "/v1/course")
+        self.assertEqual(self.client.stats()[self.url]["state"], CircuitBreaker.OPEN)
+
+        with self.assertRaises(ConnectionError):
+            self.client.get(self.url + "/v1/course")
+        self.assertEqual(self.server.request_count, 6)
+
+        self.clock.now = 30
+        self.assertEqual(self.client.get(self.url + "/v1/professor").status_code, 200)
+        self.assertEqual(self.client.stats()[self.url]["state"], CircuitBreaker.CLOSED)
+
+    def test_too_many_requests_in_flight_is_not_a_host_failure(self):
+        in_flight = self.client._get_host_state(self.url)[2]
+        for _ in range(self.client.max_requests_per_host):
+            in_flight.acquire()
+        for _ in range(self.client.failure_threshold):
+            with self.assertRaises(ConnectionError):
+                self.client.get(self.url + "/v1/course")
+        self.assertEqual(self.client.stats()[self.url],
+                         {"state": CircuitBreaker.CLOSED, "consecutive_failures": 0})
+        self.assertEqual(self.server.request_count, 0)
+
+    def test_unexpected_error_in_trial_reopens_circuit(self):
+        self.server.responses["/v1/course"] = [(503, 0)] * 6
+        self.client.get(self.url + "/v1/course")
+        self.client.get(self.url + "/v1/course")
+
+        self.clock.now = 30
+        session = self.client._get_host_state(self.url)[0]
+        with mock.patch.object(session, "get", side_effect=ValueError("bad params")):
+            with self.assertRaises(ValueError):
+                self.client.get(self.url + "/v1/course")
+        self.assertEqual(self.client.stats()[self.url]["state"], CircuitBreaker.OPEN)
+
+        self.clock.now = 60
+        self.assertEqual(self.client.get(self.url + "/v1/professor").status_code, 200)
+        self.assertEqual(self.client.stats()[self.url]["state"], CircuitBreaker.CLOSED)
+
+    def test_request_proxy_sends_requests_through_client(self):
+        http_client, cache = RequestProxy.http_client, RequestProxy.cache
+        RequestProxy.http_client, RequestProxy.cache = self.client, ResponseCache()
+        try:
+            self.assertEqual(RequestProxy.get("planetterp_course", self.url + "/v1/course", {"name": "CMSC131"}),
+                             (200, {"path": "/v1/course?name=CMSC131"}))
+            self.server.responses["/v1/professor"] = [(503, 0)] * 3
+            self.assertEqual(RequestProxy.get("planetterp_professor", self.url + "/v1/professor", {}), (503, None))
+        finally:
+            RequestProxy.http_client, RequestProxy.cache = http_client, cache
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    """
+    Tests the circuit breaker state changes
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=self.clock)
+
+    def test_success_resets_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_only_one_trial_request_while_half_open(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.assertFalse(self.breaker.allow_request())
+        self.clock.now = 10
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_failed_trial_reopens_circuit(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 10
+        self.breaker.allow_request()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow_request())
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from flask_app.backend.cache import ResponseCache
+from flask_app.backend.courses import APIGet, RequestProxy
+from flask_app.backend.metrics import Metrics, MetricsRegistry, SamplingProfiler
+from tests.test_warmer import FakeHTTPClient
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    """
+    Tests rendering counters and histograms in the Prometheus text format
+    """
+
+    def test_render_counters_and_histograms(self):
+        registry = MetricsRegistry()
+        registry.describe("calls_total", "counter", "Calls")
+        registry.describe("call_seconds", "histogram", "Call durations")
+        registry.inc("calls_total", {"endpoint": "a"})
+        registry.inc("calls_total", {"endpoint": "a"}, 2)
+        registry.inc("calls_total", {"endpoint": 'say "hi"'})
+        registry.observe("call_seconds", {}, 0.003)
+        registry.observe("call_seconds", {}, 20)
+
+        lines = registry.render_prometheus().splitlines()
+        self.assertIn("# TYPE calls_total counter", lines)
+        self.assertIn('calls_total{endpoint="a"} 3.0', lines)
+        self.assertIn('calls_total{endpoint="say \\"hi\\""} 1.0', lines)
+        self.assertIn("# TYPE call_seconds histogram", lines)
+        self.assertIn('call_seconds_bucket{le="0.001"} 0', lines)
+        self.assertIn('call_seconds_bucket{le="0.005"} 1', lines)
+        self.assertIn('call_seconds_bucket{le="10"} 1', lines)
+        self.assertIn('call_seconds_bucket{le="+Inf"} 2', lines)
+        self.assertIn("call_seconds_sum 20.003", lines)
+        self.assertIn("call_seconds_count 2", lines)
+        self.assertEqual(registry.get_counter("calls_total", {"endpoint": "a"}), 3)
+
+
+class RequestTraceTest(unittest.TestCase):
+    """
+    Tests that spans and upstream calls are added to the trace of the current request, also from fanned out calls
+    """
+
+    def setUp(self):
+        self.http_client, self.cache = RequestProxy.http_client, RequestProxy.cache
+        RequestProxy.http_client, RequestProxy.cache = FakeHTTPClient(), ResponseCache()
+
+    def tearDown(self):
+        RequestProxy.http_client, RequestProxy.cache = self.http_client, self.cache
+        Metrics.current_trace.set(None)
+
+    def test_spans_are_added_to_trace(self):
+        trace = Metrics.start_trace()
+        with Metrics.span("render", "index.html"):
+            pass
+        APIGet.fan_out([(Metrics.record_span, ("parse", "json", 0.5))] * 2)
+
+        summary = trace.get_summary()
+        self.assertEqual(summary["spans"]["render:index.html"]["count"], 1)
+        self.assertEqual(summary["spans"]["parse:json"], {"count": 2, "ms": 1000.0})
+        self.assertGreaterEqual(summary["category_ms"]["parse"], 1000.0)
+
+    def test_upstream_calls_are_counted_by_source(self):
+        labels = {"endpoint": "planetterp_course", "source": "network"}
+        network_calls = Metrics.registry.get_counter(Metrics.prefix + "upstream_calls_total", labels)
+        trace = Metrics.start_trace()
+        RequestProxy.get("planetterp_course", "https://example.com", {})
+        RequestProxy.get("planetterp_course", "https://example.com", {})
+
+        self.assertEqual(Metrics.registry.get_counter(Metrics.prefix + "upstream_calls_total", labels),
+                         network_calls + 1)
+        summary = trace.get_summary()
+        self.assertEqual((summary["upstream_calls"], summary["upstream_cache_hits"]), (2, 1))
+        self.assertEqual(summary["spans"]["upstream:planetterp_course"]["count"], 1)
+
+
+class SamplingProfilerTest(unittest.TestCase):
+    """
+    Tests that only sampled requests are profiled and their profiles are saved
+    """
+
+    def test_sampled_request_is_saved(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            profiler = SamplingProfiler(0.5, output_dir, sample=lambda: 0.25)
+            path = profiler.stop(profiler.start(), "view/sections")
+            self.assertTrue(path.endswith("-view_sections.prof"))
+            self.assertEqual(os.listdir(output_dir), [os.path.basename(path)])
+
+    def test_request_is_not_sampled(self):
+        profiler = SamplingProfiler(0.5, "unused", sample=lambda: 0.75)
+        self.assertIsNone(profiler.start())
+        self.assertIsNone(profiler.stop(None, "index"))
+        self.assertIsNone(SamplingProfiler(0, "unused", sample=lambda: 0).start())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import random
+import time
+import unittest
+from flask_app.backend.courses import APIParse, Course
+from flask_app.backend.generator import ScheduleGenerator
+from flask_app.backend.optimizer import ScheduleOptimizer
+from tests.utils import TestUtils
+
+test_util_instance = TestUtils()
+
+
+def format_minutes(minutes: int) -> str:
+    hours, minutes = divmod(minutes, 60)
+    return "%d:%02d%s" % ((hours - 1) % 12 + 1, minutes, "am" if hours < 12 else "pm")
+
+
+def make_synthetic_course(course_code: str, section_count: int, generator: random.Random) -> Course:
+    """
+    A course with section_count sections, each meeting once on random days at a random time
+    """
+    sections_raw = []
+    for number in range(section_count):
+        start_minute = generator.randrange(8 * 60, 18 * 60, 30)
+        sections_raw.append({
+            "course": course_code, "section_id": course_code + "-" + str(number).zfill(4),
+            "number": str(number).zfill(4), "seats": "30", "open_seats": "5", "instructors": ["Jon Snow"],
+            "meetings": [{"days": generator.choice(["MWF", "TuTh", "MW", "F"]), "room": "", "building": "",
+                          "classtype": "", "start_time": format_minutes(start_minute),
+                          "end_time": format_minutes(start_minute + generator.choice([50, 75]))}]})
+    course = Course(course_code, "Synthetic", 3, {}, {}, {})
+    course.sections, course.professor_to_sections = APIParse.umd_io_sections_raw_to_section_list(sections_raw,
+                                                                                                 course)
+    return course
+
+
+class ScheduleOptimizerTest(unittest.TestCase):
+    """
+    Tests ranking schedules by weighted objectives
+    """
+
+    def setUp(self):
+        self.courses = [test_util_instance.courses["CMSC250"], test_util_instance.courses["CHEM271"],
+                        test_util_instance.courses["ANTH221"]]
+        self.weights = {"gpa": 1, "rating": 1, "days": 2, "gaps": 3, "early": 1}
+
+    def brute_force_scores(self, optimizer: ScheduleOptimizer) -> list:
+        scores = []
+        for sections in ScheduleGenerator(self.courses).iter_schedules(max_results=None,
+                                                                       allowed_bits=optimizer.allowed_bits):
+            objectives = optimizer._objectives(sections)
+            scores.append(sum(optimizer.weights[name] * value for name, value in objectives.items()))
+        return sorted(scores, reverse=True)
+
+    def test_top_schedules_match_brute_force(self):
+        optimizer = ScheduleOptimizer(self.courses, self.weights)
+        top_schedules = optimizer.get_top_schedules(top_k=5)
+        self.assertEqual([schedule.score for schedule in top_schedules], self.brute_force_scores(optimizer)[:5])
+
+    def test_top_schedules_are_sorted_best_first(self):
+        top_schedules = ScheduleOptimizer(self.courses, self.weights).get_top_schedules(top_k=10)
+        scores = [schedule.score for schedule in top_schedules]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(len(top_schedules), 10)
+
+    def test_required_section_is_in_every_schedule(self):
+        optimizer = ScheduleOptimizer(self.courses, self.weights, required_section_ids=["CMSC250-0101"])
+        for schedule in optimizer.get_top_schedules(top_k=5):
+            self.assertIn("CMSC250-0101", [section.section_id for section in schedule.sections])
+
+    def test_open_seats_only_skips_full_sections(self):
+        optimizer = ScheduleOptimizer(self.courses, self.weights, open_seats_only=True)
+        for schedule in optimizer.get_top_schedules(top_k=5):
+            for section in schedule.sections:
+                self.assertGreater(section.open_seats, 0)
+
+    def test_days_objective_prefers_fewer_days(self):
+        top_schedule = ScheduleOptimizer(self.courses, {"days": 1}).get_top_schedules(top_k=1)[0]
+        self.assertEqual(top_schedule.objectives["days"], max(
+            ScheduleOptimizer(self.courses)._objectives(sections)["days"]
+            for sections in ScheduleGenerator(self.courses).iter_schedules(max_results=None)))
+
+    def test_gaps_objective_matches_brute_force(self):
+        optimizer = ScheduleOptimizer(self.courses, {"gaps": 1})
+        self.assertEqual([schedule.score for schedule in optimizer.get_top_schedules(top_k=5)],
+                         self.brute_force_scores(optimizer)[:5])
+        self.assertTrue(optimizer.search_complete)
+
+    def test_large_search_stops_at_time_budget(self):
+        generator = random.Random(0)
+        courses = [make_synthetic_course("SYNT" + str(100 + number), 40, generator) for number in range(6)]
+        optimizer = ScheduleOptimizer(courses, {"gaps": 1})
+        started_at = time.monotonic()
+        top_schedules = optimizer.get_top_schedules(top_k=10, max_nodes=10 ** 9, time_budget=0.5)
+        self.assertLess(time.monotonic() - started_at, 2)
+        self.assertFalse(optimizer.search_complete)
+        self.assertEqual(len(top_schedules), 10)
+
+    def test_large_search_stops_at_node_budget(self):
+        generator = random.Random(0)
+        courses = [make_synthetic_course("SYNT" + str(100 + number), 40, generator) for number in range(7)]
+        optimizer = ScheduleOptimizer(courses, {"gpa": 1, "rating": 1, "days": 1, "gaps": 1, "early": 1})
+        top_schedules = optimizer.get_top_schedules(top_k=10, max_nodes=5000, time_budget=60)
+        self.assertFalse(optimizer.search_complete)
+        self.assertEqual(len(top_schedules), 10)
+        scores = [schedule.score for schedule in top_schedules]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_serialized_schedule_lists_section_ids(self):
+        top_schedule = ScheduleOptimizer(self.courses, self.weights).get_top_schedules(top_k=1)[0]
+        self.assertEqual(top_schedule.get_serialized_schedule().split(","),
+                         [section.section_id for section in top_schedule.sections])
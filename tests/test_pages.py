@@ -0,0 +1,169 @@
+import threading
+import unittest
+from unittest import mock
+from flask_app.backend.courses import APIGet, RequestProxy
+from flask_app.backend.pages import CoursePages
+from flask_app.backend.search import CourseIndex
+from tests.test_cache import FakeClock
+
+
+def make_courses_raw(course_count: int) -> list:
+    """
+    planetterp responses of course_count courses, in no particular order
+    """
+    return [{"department": "CMSC", "course_number": str(100 + (number * 7) % course_count), "title": "Course",
+             "credits": 3, "professors": [], "average_gpa": 3.0} for number in range(course_count)]
+
+
+class FakePlanetterpCourses(object):
+    """
+    Stands in for RequestProxy.planetterp_get_courses_by_page, recording every page asked for.
+    Downloads of the whole course list wait for list_allowed to be set.
+    """
+
+    def __init__(self, courses_raw: list):
+        self.courses_raw = courses_raw
+        self.requested_pages = []
+        self.list_allowed = threading.Event()
+        self.list_allowed.set()
+        # Pages that fail, like planetterp answering with an error
+        self.failing_pages = set()
+
+    def __call__(self, page_num: int, limit: int = 30) -> list:
+        if limit != 30:
+            self.list_allowed.wait(timeout=5)
+        self.requested_pages.append((page_num, limit))
+        if page_num in self.failing_pages:
+            raise ConnectionError("Error retrieving the list of courses")
+        start = (page_num - 1) * limit
+        return self.courses_raw[start:start + limit]
+
+
+class CoursePagesTest(unittest.TestCase):
+    """
+    Tests the all courses pages, with planetterp replaced by a fake and sections from the emulated API
+    """
+
+    def setUp(self):
+        RequestProxy.test_mode = True
+        RequestProxy.bad_request = False
+        self.planetterp_courses = FakePlanetterpCourses(make_courses_raw(75))
+        self.sections_requested = []
+
+        def get_sections(course_code: str) -> list:
+            self.sections_requested.append(course_code)
+            return []
+
+        self.patches = [mock.patch.object(RequestProxy, "planetterp_get_courses_by_page", self.planetterp_courses),
+                        mock.patch.object(RequestProxy, "umdio_get_sections_by_course_code", get_sections)]
+        for patch in self.patches:
+            patch.start()
+        self.clock = FakeClock()
+        self.pages = CoursePages(clock=self.clock)
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.pages._executor.shutdown(wait=True)
+        RequestProxy.test_mode = False
+        APIGet.course_index = CourseIndex()
+
+    def wait_for_background_work(self):
+        self.pages._executor.shutdown(wait=True)
+
+    def test_course_list_is_sorted_and_paged(self):
+        self.pages.load_course_list()
+        self.assertEqual(self.planetterp_courses.requested_pages, [(1, 100)])
+        self.assertEqual(self.pages.get_page_count(), 3)
+
+        first_page = self.pages.get_page(1)
+        self.assertEqual(list(first_page), ["CMSC" + str(number) for number in range(100, 130)])
+        self.assertEqual(list(self.pages.get_page(3)), ["CMSC" + str(number) for number in range(160, 175)])
+
+    def test_course_list_builds_search_index(self):
+        self.assertFalse(APIGet.course_index.complete)
+        self.pages.load_course_list()
+        with mock.patch.object(RequestProxy, "planetterp_search_by_query", side_effect=AssertionError):
+            self.assertEqual(APIGet.get_course_codes_by_query("cmsc10"),
+                             ["CMSC" + str(number) for number in range(100, 110)])
+
+    def test_failed_page_never_saves_partial_course_list(self):
+        self.planetterp_courses.failing_pages = {1}
+        with self.assertRaises(ConnectionError):
+            self.pages.load_course_list()
+        self.assertIsNone(self.pages.get_page_count())
+
+        self.planetterp_courses.failing_pages = set()
+        self.pages.load_course_list()
+        self.planetterp_courses.courses_raw = make_courses_raw(250)
+        self.planetterp_courses.failing_pages = {2}
+        with self.assertRaises(ConnectionError):
+            self.pages.load_course_list()
+        # The previous complete list is still served
+        self.assertEqual(self.pages.get_page_count(), 3)
+
+    def test_empty_course_list_is_not_saved(self):
+        self.planetterp_courses.courses_raw = []
+        with self.assertRaises(ConnectionError):
+            self.pages.load_course_list()
+        self.assertIsNone(self.pages.get_page_count())
+
+    def test_pages_are_fetched_one_at_a_time_until_course_list_is_ready(self):
+        self.planetterp_courses.list_allowed.clear()
+        first_page = self.pages.get_page(1)
+        self.assertEqual(len(first_page), 30)
+        self.assertEqual(self.planetterp_courses.requested_pages[0], (1, 30))
+
+        self.planetterp_courses.list_allowed.set()
+        self.wait_for_background_work()
+        self.assertIn((1, 100), self.planetterp_courses.requested_pages)
+        self.assertEqual(self.pages.get_page_count(), 3)
+
+    def test_adjacent_pages_are_prefetched(self):
+        self.pages.load_course_list()
+        self.pages.get_page(2)
+        self.wait_for_background_work()
+
+        self.assertIn(1, self.pages.pages)
+        self.assertIn(3, self.pages.pages)
+        self.assertEqual(len(self.sections_requested), 75)
+
+    def test_cached_pages_cost_upstream_nothing(self):
+        self.pages.load_course_list()
+        first_page = self.pages.get_page(1)
+        self.wait_for_background_work()
+        requested_pages, sections_requested = list(self.planetterp_courses.requested_pages), \
+            list(self.sections_requested)
+
+        self.assertIs(self.pages.get_page(1), first_page)
+        self.assertEqual(self.planetterp_courses.requested_pages, requested_pages)
+        self.assertEqual(self.sections_requested, sections_requested)
+
+    def test_course_list_is_downloaded_again_after_ttl(self):
+        self.pages.load_course_list()
+        self.clock.now = self.pages.course_list_ttl
+        self.pages.get_page(1)
+        self.wait_for_background_work()
+        self.assertEqual(self.planetterp_courses.requested_pages, [(1, 100), (1, 100)])
+
+
+class PlanetterpCoursesOffsetTest(unittest.TestCase):
+    """
+    Tests that pages of planetterp's course list start after the courses of the pages before them
+    """
+
+    def test_error_response_raises_connection_error(self):
+        with mock.patch.object(RequestProxy, "get", return_value=(503, None)):
+            with self.assertRaises(ConnectionError):
+                RequestProxy.planetterp_get_courses_by_page(1, 100)
+
+    def test_page_offset_skips_previous_pages(self):
+        with mock.patch.object(RequestProxy, "get", return_value=(200, [])) as get:
+            RequestProxy.planetterp_get_courses_by_page(1)
+            RequestProxy.planetterp_get_courses_by_page(3, 100)
+        self.assertEqual([call.args[2] for call in get.call_args_list],
+                         [{"limit": 30, "offset": 0}, {"limit": 100, "offset": 200}])
+
+
+if __name__ == '__main__':
+    unittest.main()
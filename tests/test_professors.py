@@ -0,0 +1,130 @@
+import unittest
+from unittest import mock
+from flask_app.backend.courses import RequestProxy
+from flask_app.backend.professors import ProfessorDirectory, ProfessorIndex
+from tests.test_cache import FakeClock
+
+
+def make_professor_raw(name: str, rating, courses: list) -> dict:
+    return {"name": name, "slug": name.lower().replace(" ", "_"), "type": "professor", "courses": courses,
+            "average_rating": rating}
+
+
+class ProfessorIndexTest(unittest.TestCase):
+    """
+    Tests searching, sorting and filtering the professor index
+    """
+
+    def setUp(self):
+        self.index = ProfessorIndex([
+            make_professor_raw("Tyrion Lannister", 3.5, ["MATH140", "MATH141"]),
+            make_professor_raw("Jon Snow", 4.125, ["MATH140", "CMSC131"]),
+            make_professor_raw("Arya Stark", None, ["CMSC216"]),
+            make_professor_raw("Sansa Stark", 4.5, ["ENGL101"]),
+            make_professor_raw("Jon Snow", 4.125, ["MATH140", "CMSC131"]),
+        ])
+
+    def names(self, *args, **kwargs) -> list:
+        return [professor.name for professor in self.index.search(*args, **kwargs)[0]]
+
+    def test_professors_are_sorted_by_name_without_duplicates(self):
+        self.assertEqual(self.names(), ["Arya Stark", "Jon Snow", "Sansa Stark", "Tyrion Lannister"])
+        self.assertEqual(len(self.index), 4)
+
+    def test_search_matches_prefix_of_any_name_word(self):
+        self.assertEqual(self.names("sta"), ["Arya Stark", "Sansa Stark"])
+        self.assertEqual(self.names(" Jo"), ["Jon Snow"])
+        self.assertEqual(self.names("nobody"), [])
+
+    def test_sort_by_rating_puts_unrated_professors_last(self):
+        self.assertEqual(self.names(sort="rating"), ["Sansa Stark", "Jon Snow", "Tyrion Lannister", "Arya Stark"])
+        self.assertIsNone(self.index.search(sort="rating")[0][-1].rating)
+
+    def test_filter_by_department(self):
+        self.assertEqual(self.names(department="cmsc"), ["Arya Stark", "Jon Snow"])
+        self.assertEqual(self.names("stark", "rating", "CMSC"), ["Arya Stark"])
+        self.assertEqual(self.names(department="BMGT"), [])
+
+    def test_search_pages_and_counts_matches(self):
+        professors, match_count = self.index.search("", "rating", "", offset=1, limit=2)
+        self.assertEqual([professor.name for professor in professors], ["Jon Snow", "Tyrion Lannister"])
+        self.assertEqual(match_count, 4)
+        self.assertEqual(self.index.search("stark", offset=1, limit=1)[1], 2)
+        self.assertEqual(professors[0].courses, ("MATH140", "CMSC131"))
+
+
+class ProfessorDirectoryTest(unittest.TestCase):
+    """
+    Tests downloading the directory, with planetterp replaced by 250 made up professors
+    """
+
+    def setUp(self):
+        self.requested_pages = []
+        # Pages that fail, like planetterp answering with an error
+        self.failing_pages = set()
+        self.professors_raw = [make_professor_raw("Professor P" + str(number), number % 5, ["MATH140"])
+                               for number in range(250)]
+
+        def get_professors(page_num: int) -> list:
+            self.requested_pages.append(page_num)
+            if page_num in self.failing_pages:
+                raise ConnectionError("Error retrieving the list of professors")
+            return self.professors_raw[(page_num - 1) * 100:page_num * 100]
+
+        self.patch = mock.patch.object(RequestProxy, "planetterp_get_professors_by_page", get_professors)
+        self.patch.start()
+        self.clock = FakeClock()
+        self.directory = ProfessorDirectory(ttl=60, clock=self.clock)
+
+    def tearDown(self):
+        self.patch.stop()
+        self.directory._executor.shutdown(wait=True)
+
+    def test_directory_loads_every_page_in_background(self):
+        self.assertIsNone(self.directory.get_index())
+        self.directory._executor.shutdown(wait=True)
+        self.assertEqual(self.requested_pages, [1, 2, 3])
+        self.assertEqual(len(self.directory.get_index()), 250)
+
+    def test_directory_is_only_downloaded_again_after_ttl(self):
+        self.directory.load()
+        self.directory.get_index()
+        self.clock.now = 59
+        self.directory.get_index()
+        self.clock.now = 60
+        self.assertIsNotNone(self.directory.get_index())
+        self.directory._executor.shutdown(wait=True)
+        self.assertEqual(self.requested_pages, [1, 2, 3, 1, 2, 3])
+
+    def test_failed_page_keeps_previous_index(self):
+        self.failing_pages = {2}
+        with self.assertRaises(ConnectionError):
+            self.directory.load()
+        self.assertIsNone(self.directory.index)
+
+        self.failing_pages = set()
+        self.directory.load()
+        self.professors_raw = self.professors_raw[:150]
+        self.failing_pages = {1}
+        with self.assertRaises(ConnectionError):
+            self.directory.load()
+        self.assertEqual(len(self.directory.index), 250)
+
+    def test_empty_directory_is_not_used(self):
+        self.professors_raw = []
+        with self.assertRaises(ConnectionError):
+            self.directory.load()
+        self.assertIsNone(self.directory.index)
+
+    def test_error_response_raises_connection_error(self):
+        self.patch.stop()
+        try:
+            with mock.patch.object(RequestProxy, "get", return_value=(503, None)):
+                with self.assertRaises(ConnectionError):
+                    RequestProxy.planetterp_get_professors_by_page(1)
+        finally:
+            self.patch.start()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,55 @@
+import random
 import unittest
+from flask_app.backend.courses import Course, CourseList, Section
 from flask_app.backend.schedule import MySchedule
 from tests.utils import TestUtils
 
 test_util_instance = TestUtils()
 
 
+def linear_scan_no_time_conflicts(schedule_days: dict, class_to_add: Section) -> bool:
+    """
+    The original linear scan of MySchedule.check_section_no_time_conflicts,
+    kept as a reference for the bitmask conflict engine
+    """
+    for day, class_meeting in class_to_add.class_meetings.items():
+        for class_time in class_meeting:
+            for class_index in range(len(schedule_days[day])):
+                single_class = schedule_days[day][class_index]
+                if single_class.start_time > class_time.start_time:
+                    if class_time.end_time >= single_class.start_time:
+                        return False
+                    if class_index > 0 and schedule_days[day][class_index - 1].end_time >= class_time.start_time:
+                        return False
+                    break
+                elif class_index == len(schedule_days[day]) - 1:
+                    if class_time.start_time <= single_class.end_time:
+                        return False
+                    break
+    return True
+
+
+def make_random_section(rng: random.Random, section_number: int) -> Section:
+    """
+    Makes a section meeting at a random time (to the minute) on random days
+    """
+    def format_time(minutes):
+        return str((minutes // 60 - 1) % 12 + 1) + ":" + str(minutes % 60).zfill(2) + \
+            ("am" if minutes < 12 * 60 else "pm")
+
+    course = Course("TEST" + str(section_number), "Test", 3, {}, {}, {})
+    section_id = course.course_code + "-0101"
+    meetings = []
+    for _ in range(rng.randint(1, 2)):
+        start_minute = rng.randint(8 * 60, 20 * 60)
+        meetings.append({"days": "".join(day for day in ["M", "Tu", "W", "Th", "F"] if rng.random() < 0.5) or "M",
+                         "room": "", "building": "", "classtype": "",
+                         "start_time": format_time(start_minute),
+                         "end_time": format_time(start_minute + rng.randint(0, 150))})
+    return Section(course.course_code, section_id, 10, 10, CourseList.make_meeting_dict(meetings, section_id, course),
+                   [], course, True)
+
+
 class ScheduleTest(unittest.TestCase):
     """
     Tests for the add_class and remove_class functions of MySchedule.
@@ -296,6 +341,50 @@ class ScheduleWarningTest(unittest.TestCase):
         self.assertNotIn("section full", [warning.warning_type for warning in schedule.warnings_list])
 
 
+class ConflictEngineTest(unittest.TestCase):
+    """
+    Tests that the bitmask conflict engine gives the same results as the original linear scan
+    """
+
+    def test_engine_matches_linear_scan_on_random_schedules(self):
+        rng = random.Random(435)
+        for _ in range(200):
+            schedule = MySchedule()
+            for section_number in range(12):
+                section = make_random_section(rng, section_number)
+                expected = linear_scan_no_time_conflicts(schedule.schedule, section)
+                self.assertEqual(schedule.check_section_no_time_conflicts(section), expected)
+                schedule.add_section(section)
+                if section_number % 4 == 3 and schedule.sections_list:
+                    schedule.remove_section(rng.choice(schedule.sections_list))
+
+            for day, meeting_times in schedule.schedule.items():
+                start_times = [meeting_time.start_time for meeting_time in meeting_times]
+                self.assertEqual(start_times, sorted(start_times))
+
+    def test_end_time_boundary_is_inclusive(self):
+        cmsc250 = test_util_instance.courses["CMSC250"].sections["0307"]  # MW 8:00am-8:50am
+        course = Course("TEST100", "Test", 3, {}, {}, {})
+        starts_at_end = Section("TEST100", "TEST100-0101", 10, 10, CourseList.make_meeting_dict(
+            [{"days": "M", "room": "", "building": "", "classtype": "", "start_time": "8:50am",
+              "end_time": "9:40am"}], "TEST100-0101", course), [], course, True)
+        starts_after_end = Section("TEST100", "TEST100-0102", 10, 10, CourseList.make_meeting_dict(
+            [{"days": "M", "room": "", "building": "", "classtype": "", "start_time": "8:51am",
+              "end_time": "9:40am"}], "TEST100-0102", course), [], course, True)
+        schedule = MySchedule()
+        schedule.add_section(cmsc250)
+        self.assertFalse(schedule.check_section_no_time_conflicts(starts_at_end))
+        self.assertTrue(schedule.check_section_no_time_conflicts(starts_after_end))
+
+    def test_removed_section_frees_its_minutes(self):
+        cmsc250 = test_util_instance.courses["CMSC250"].sections["0306"]
+        comm107 = test_util_instance.courses["COMM107"].sections["FC04"]
+        schedule = MySchedule()
+        schedule.add_section(cmsc250)
+        schedule.remove_section(cmsc250)
+        self.assertTrue(schedule.check_section_no_time_conflicts(comm107))
+
+
 class ScheduleGPA(unittest.TestCase):
     """
     Tests to ensure Average GPA schedule method is correct
@@ -0,0 +1,46 @@
+import unittest
+from flask_app.backend.search import CourseIndex
+
+
+class CourseIndexTest(unittest.TestCase):
+    """
+    Tests for the local prefix index over course codes and titles
+    """
+
+    def setUp(self):
+        self.index = CourseIndex()
+        self.index.build([("CMSC131", "Object-Oriented Programming I"),
+                          ("CMSC132", "Object-Oriented Programming II"),
+                          ("CMSC250", "Discrete Structures"),
+                          ("MATH140", "Calculus I"),
+                          ("MATH141", "Calculus II")])
+
+    def test_build_marks_index_complete(self):
+        self.assertTrue(self.index.complete)
+        self.assertFalse(CourseIndex().complete)
+
+    def test_search_course_code_prefix_in_order(self):
+        self.assertEqual(self.index.search("cmsc13"), ["CMSC131", "CMSC132"])
+        self.assertEqual(self.index.search("CMSC"), ["CMSC131", "CMSC132", "CMSC250"])
+
+    def test_search_title_word_prefix(self):
+        self.assertEqual(self.index.search("calc"), ["MATH140", "MATH141"])
+        self.assertEqual(self.index.search("discrete"), ["CMSC250"])
+
+    def test_search_respects_limit(self):
+        self.assertEqual(self.index.search("CMSC", limit=2), ["CMSC131", "CMSC132"])
+
+    def test_search_empty_or_unmatched_query(self):
+        self.assertEqual(self.index.search(""), [])
+        self.assertEqual(self.index.search("ENGL"), [])
+
+    def test_add_new_course_incrementally(self):
+        self.index.add("cmsc133", "Object-Oriented Programming III")
+        self.assertEqual(self.index.search("CMSC13"), ["CMSC131", "CMSC132", "CMSC133"])
+        self.assertEqual(len(self.index), 6)
+
+    def test_add_existing_course_updates_title(self):
+        self.index.add("CMSC250", "Discrete Math")
+        self.assertEqual(self.index.search("structures"), [])
+        self.assertEqual(self.index.search("math"), ["MATH140", "MATH141", "CMSC250"])
+        self.assertEqual(self.index.get_title("CMSC250"), "Discrete Math")
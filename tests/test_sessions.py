@@ -0,0 +1,206 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from flask_app.backend.courses import APIGet, Course, RequestProxy
+from flask_app.backend.sessions import MemorySessionStore, SessionSerializer, SessionStore, SQLiteSessionStore
+from tests.test_cache import FakeClock
+
+
+def make_session_data() -> dict:
+    """
+    Session data with MATH140 (the course of the emulated API) and its one section in the schedule
+    """
+    session_data = SessionStore.new_session_data()
+    math140 = APIGet.get_complete_course_by_course_code("MATH140")
+    session_data["schedule"].add_section(math140.sections[0])
+    session_data["courses_to_display"] = [Course("CMSC131", "Object-Oriented Programming I", 4, {}, {}, {}, 2.9,
+                                                 ["FSMA"])]
+    session_data["expanded_course_to_display"] = math140
+    return session_data
+
+
+class MemorySessionStoreTest(unittest.TestCase):
+    """
+    Tests the in-process session store
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = MemorySessionStore(max_sessions=2, ttl=60, clock=self.clock)
+
+    def test_new_sessions_get_different_ids_and_empty_data(self):
+        first_id, second_id = self.store.new_session(), self.store.new_session()
+        self.assertNotEqual(first_id, second_id)
+        self.assertEqual(self.store.get(first_id)["courses_to_display"], [])
+
+    def test_least_recently_used_session_is_evicted(self):
+        first_id, second_id = self.store.new_session(), self.store.new_session()
+        self.store.get(first_id)
+        third_id = self.store.new_session()
+        self.assertIsNone(self.store.get(second_id))
+        self.assertIsNotNone(self.store.get(first_id))
+        self.assertIsNotNone(self.store.get(third_id))
+
+    def test_session_expires_after_ttl(self):
+        session_id = self.store.new_session()
+        self.clock.now = 60
+        self.assertIsNone(self.store.get(session_id))
+
+    def test_delete_forgets_session(self):
+        session_id = self.store.new_session()
+        self.store.delete(session_id)
+        self.assertIsNone(self.store.get(session_id))
+
+    def test_concurrent_new_sessions_get_unique_random_ids(self):
+        store = MemorySessionStore()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            session_ids = list(executor.map(lambda _: store.new_session(), range(200)))
+        self.assertEqual(len(set(session_ids)), 200)
+        self.assertTrue(all(len(session_id) >= 20 for session_id in session_ids))
+
+    def test_session_lock_serializes_changes_to_one_session(self):
+        session_id = self.store.new_session()
+        self.store.get(session_id)["changes"] = []
+
+        def change_session(change: int):
+            with self.store.lock(session_id):
+                changes = list(self.store.get(session_id)["changes"])
+                time.sleep(0.01)  # without the lock, the other threads would read the same list meanwhile
+                self.store.get(session_id)["changes"] = changes + [change]
+
+        threads = [threading.Thread(target=change_session, args=(change,)) for change in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(self.store.get(session_id)["changes"]), list(range(5)))
+        self.assertEqual(self.store._session_locks, {})
+
+    def test_different_sessions_do_not_wait_for_each_other(self):
+        first_id, second_id = self.store.new_session(), self.store.new_session()
+        with self.store.lock(first_id):
+            acquired = threading.Event()
+
+            def lock_second_session():
+                with self.store.lock(second_id):
+                    acquired.set()
+
+            threading.Thread(target=lock_second_session).start()
+            self.assertTrue(acquired.wait(timeout=1))
+
+
+class SQLiteSessionStoreTest(unittest.TestCase):
+    """
+    Tests the session store shared by every worker, using the emulated API to fetch courses again
+    """
+
+    def setUp(self):
+        RequestProxy.test_mode = True
+        RequestProxy.bad_request = False
+        self.database_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.database_dir.name, "sessions.db")
+        self.clock = FakeClock()
+        self.store = SQLiteSessionStore(self.path, ttl=60, clock=self.clock)
+
+    def tearDown(self):
+        RequestProxy.test_mode = False
+        self.store.connection().close()
+        self.database_dir.cleanup()
+
+    def test_session_data_survives_round_trip(self):
+        session_id = self.store.new_session()
+        self.store.put(session_id, make_session_data())
+        session_data = SQLiteSessionStore(self.path, ttl=60, clock=self.clock).get(session_id)
+
+        schedule = session_data["schedule"]
+        self.assertEqual([course.course_code for course in schedule.courses_list], ["MATH140"])
+        self.assertEqual(schedule.get_serialized_schedule(), "ENGL101-0101")
+        self.assertEqual(len(schedule.schedule["M"]), 1)
+        self.assertEqual([(course.course_code, course.avg_gpa, course.gen_eds)
+                          for course in session_data["courses_to_display"]], [("CMSC131", 2.9, ["FSMA"])])
+        self.assertIs(session_data["expanded_course_to_display"], schedule.courses_list[0])
+
+    def test_sessions_are_shared_between_stores_on_the_same_database(self):
+        session_id = self.store.new_session()
+        self.store.put(session_id, make_session_data())
+        other_worker_store = SQLiteSessionStore(self.path, ttl=60, clock=self.clock)
+        self.assertNotEqual(other_worker_store.new_session(), session_id)
+        self.assertEqual(other_worker_store.get(session_id)["schedule"].get_serialized_schedule(), "ENGL101-0101")
+
+    def test_session_expires_after_ttl(self):
+        session_id = self.store.new_session()
+        self.clock.now = 60
+        self.assertIsNone(self.store.get(session_id))
+        self.assertIsNone(self.store.get("not a session"))
+
+    def test_expired_sessions_are_purged(self):
+        self.store.purge_interval = 2
+        expired_id = self.store.new_session()
+        self.clock.now = 60
+        session_id = self.store.new_session()
+        self.store.put(session_id, SessionStore.new_session_data())
+        self.store.put(session_id, SessionStore.new_session_data())
+        self.assertEqual(self.store.connection().execute("SELECT COUNT(*) FROM user_sessions").fetchone()[0], 1)
+        self.assertIsNone(self.store.get(expired_id))
+
+    def test_courses_that_cannot_be_fetched_are_kept_until_they_can(self):
+        session_id = self.store.new_session()
+        self.store.put(session_id, make_session_data())
+        other_worker_store = SQLiteSessionStore(self.path, ttl=60, clock=self.clock)
+
+        with mock.patch.object(APIGet, "get_complete_course_by_course_code",
+                               side_effect=ConnectionError("Course Code Not Found")):
+            session_data = other_worker_store.get(session_id)
+            self.assertEqual(session_data["schedule"].courses_list, [])
+            self.assertEqual(session_data["unresolved_course_codes"], ["MATH140"])
+            self.assertEqual(session_data["unresolved_section_ids"], ["ENGL101-0101"])
+            other_worker_store.put(session_id, session_data)
+
+        schedule = other_worker_store.get(session_id)["schedule"]
+        self.assertEqual([course.course_code for course in schedule.courses_list], ["MATH140"])
+        self.assertEqual(schedule.get_serialized_schedule(), "ENGL101-0101")
+
+    def test_saved_session_is_not_loaded_again_by_the_same_worker(self):
+        session_id = self.store.new_session()
+        session_data = make_session_data()
+        self.store.put(session_id, session_data)
+
+        with mock.patch.object(APIGet, "get_complete_course_by_course_code") as get_complete_course:
+            self.assertIs(self.store.get(session_id), session_data)
+            get_complete_course.assert_not_called()
+
+    def test_session_changed_by_another_worker_is_loaded_again(self):
+        session_id = self.store.new_session()
+        self.store.put(session_id, make_session_data())
+        other_worker_store = SQLiteSessionStore(self.path, ttl=60, clock=self.clock)
+        other_worker_store.put(session_id, SessionStore.new_session_data())
+
+        self.assertEqual(self.store.get(session_id)["schedule"].courses_list, [])
+
+    def test_session_that_was_not_saved_back_is_loaded_again(self):
+        session_id = self.store.new_session()
+        self.store.put(session_id, make_session_data())
+        # e.g. the request failed before saving its changes
+        self.store.get(session_id)["schedule"].remove_all_classes()
+
+        schedule = self.store.get(session_id)["schedule"]
+        self.assertEqual([course.course_code for course in schedule.courses_list], ["MATH140"])
+
+    def test_session_store_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            SessionStore()
+
+    def test_serialized_session_only_stores_codes_and_displayed_fields(self):
+        self.assertEqual(SessionSerializer.dumps(make_session_data()),
+                         '{"courses":["MATH140"],"sections":["ENGL101-0101"],'
+                         '"display":[["CMSC131","Object-Oriented Programming I",4,2.9,["FSMA"]]],'
+                         '"expanded":"MATH140"}')
+
+    def test_unknown_backend_raises_value_error(self):
+        self.assertIsInstance(SessionStore.create("memory"), MemorySessionStore)
+        with self.assertRaises(ValueError):
+            SessionStore.create("redis")
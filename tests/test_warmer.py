@@ -0,0 +1,155 @@
+import time
+import unittest
+from collections import Counter
+from unittest import mock
+from flask_app.backend.cache import ResponseCache
+from flask_app.backend.courses import APIGet, CourseList, RequestProxy
+from flask_app.backend.warmer import CatalogWarmer
+from tests.test_cache import FakeClock
+
+
+class FakeResponse(object):
+    status_code = 200
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+class FakeHTTPClient(object):
+    """
+    Answers every request with the number of requests sent so far
+    """
+
+    def __init__(self):
+        self.requests_sent = 0
+
+    def get(self, url: str, params: dict = None, headers: dict = None) -> FakeResponse:
+        self.requests_sent += 1
+        return FakeResponse(self.requests_sent)
+
+
+class ForceRefreshTest(unittest.TestCase):
+    """
+    Tests that RequestProxy.force_refresh skips the cached responses, also in fanned out calls
+    """
+
+    def setUp(self):
+        self.http_client, self.cache = RequestProxy.http_client, RequestProxy.cache
+        RequestProxy.http_client, RequestProxy.cache = FakeHTTPClient(), ResponseCache()
+
+    def tearDown(self):
+        RequestProxy.http_client, RequestProxy.cache = self.http_client, self.cache
+
+    def test_force_refresh_replaces_cached_response(self):
+        self.assertEqual(RequestProxy.get("planetterp_course", "https://example.com", {}), (200, 1))
+        self.assertEqual(RequestProxy.get("planetterp_course", "https://example.com", {}), (200, 1))
+        with RequestProxy.force_refresh():
+            self.assertEqual(RequestProxy.get("planetterp_course", "https://example.com", {}), (200, 2))
+        self.assertEqual(RequestProxy.get("planetterp_course", "https://example.com", {}), (200, 2))
+
+    def test_force_refresh_only_replaces_responses_about_to_expire(self):
+        clock = FakeClock()
+        RequestProxy.cache = ResponseCache(clock=clock)
+        self.assertEqual(RequestProxy.get("umdio_sections", "https://example.com/sections", {}), (200, 1))
+        self.assertEqual(RequestProxy.get("planetterp_grades", "https://example.com/grades", {}), (200, 2))
+        clock.now = 30
+        with RequestProxy.force_refresh(expiring_within=60):
+            self.assertEqual(RequestProxy.get("umdio_sections", "https://example.com/sections", {}), (200, 3))
+            self.assertEqual(RequestProxy.get("planetterp_grades", "https://example.com/grades", {}), (200, 2))
+        self.assertEqual(RequestProxy.http_client.requests_sent, 3)
+
+    def test_fanned_out_calls_see_force_refresh(self):
+        calls = [(RequestProxy.refreshing.get, ())] * 3
+        with RequestProxy.force_refresh(expiring_within=60):
+            self.assertEqual(APIGet.fan_out(calls), [60] * 3)
+            self.assertEqual(sorted(result for _, result in APIGet.fan_out_as_completed(calls)), [60] * 3)
+        self.assertEqual(APIGet.fan_out(calls), [None] * 3)
+
+
+class CatalogWarmerTest(unittest.TestCase):
+    """
+    Tests the background warmer, with courses fetched by a fake that records every refresh
+    """
+
+    def setUp(self):
+        self.refreshed = []
+
+        def get_complete_course(course_code: str):
+            self.refreshed.append((course_code, RequestProxy.refreshing.get(), time.monotonic()))
+            if course_code == "BAD100":
+                raise ConnectionError("Course not found")
+
+        self.patch = mock.patch.object(APIGet, "get_complete_course_by_course_code", get_complete_course)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+
+    def test_hot_courses_are_configured_then_most_viewed(self):
+        warmer = CatalogWarmer([" cmsc131", "MATH140", ""], max_learned_courses=2)
+        warmer.course_views.update({"ENGL101": 5, "MATH140": 3, "CMSC216": 1})
+        self.assertEqual(warmer.get_hot_course_codes(), ["CMSC131", "MATH140", "ENGL101"])
+
+    def test_round_refreshes_each_course_and_records_failures(self):
+        warmer = CatalogWarmer(["CMSC131", "BAD100", "MATH140"], interval=0.003, max_refreshes_per_second=1000)
+        warmer.run_round()
+
+        # Only the responses expiring before the next round (or the one after, if it starts late) are refreshed
+        self.assertEqual([(course_code, refreshing) for course_code, refreshing, _ in self.refreshed],
+                         [("CMSC131", 0.006), ("BAD100", 0.006), ("MATH140", 0.006)])
+        status = warmer.status()
+        self.assertEqual((status["refreshes"], status["failures"], status["queue_depth"]), (2, 1, 0))
+        self.assertEqual(list(status["failing_courses"]), ["BAD100"])
+        self.assertIsNotNone(status["last_refresh_at"])
+        self.assertFalse(status["running"])
+
+    def test_refreshes_are_spread_over_interval(self):
+        warmer = CatalogWarmer(["CMSC131", "CMSC132", "MATH140"], interval=0.3, max_refreshes_per_second=1000)
+        warmer.run_round()
+        refresh_times = [refresh_time for _, _, refresh_time in self.refreshed]
+        self.assertGreaterEqual(refresh_times[2] - refresh_times[0], 0.15)
+
+    def test_refreshes_are_rate_limited(self):
+        warmer = CatalogWarmer(["CMSC131", "CMSC132"], interval=0, max_refreshes_per_second=10)
+        warmer.run_round()
+        self.assertGreaterEqual(self.refreshed[1][2] - self.refreshed[0][2], 0.09)
+
+    def test_started_warmer_refreshes_until_stopped(self):
+        warmer = CatalogWarmer(["MATH140"], interval=0.01, max_refreshes_per_second=1000)
+        warmer.start()
+        try:
+            deadline = time.monotonic() + 5
+            while len(self.refreshed) < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(warmer.status()["running"])
+        finally:
+            warmer.stop(timeout=5)
+        self.assertGreaterEqual(len(self.refreshed), 3)
+        self.assertFalse(warmer.status()["running"])
+
+
+class CourseViewsTest(unittest.TestCase):
+    """
+    Tests that courses opened by users are counted for the warmer
+    """
+
+    def setUp(self):
+        RequestProxy.test_mode = True
+        RequestProxy.bad_request = False
+        CourseList.course_views = Counter()
+
+    def tearDown(self):
+        RequestProxy.test_mode = False
+        CourseList.course_views = None
+
+    def test_opened_courses_are_counted(self):
+        CourseList.get_course_using_course_code("MATH140")
+        CourseList.get_course_using_course_code("MATH140")
+        self.assertEqual(CourseList.course_views, Counter({"MATH140": 2}))
+
+
+if __name__ == '__main__':
+    unittest.main()